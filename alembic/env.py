@@ -5,6 +5,9 @@ from app.core.config import settings
 from sqlalchemy.ext.asyncio import create_async_engine
 from app.db.base import Base
 from app.models.task import Task
+from app.models.task_tombstone import TaskTombstone
+from app.models.task_summary import TaskSummary
+from app.models.task_job import TaskJob
 from alembic import context
 
 config = context.config
@@ -0,0 +1,51 @@
+"""added tasks search indexes
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2025-10-20 19:12:40.114208
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, Sequence[str], None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # CONCURRENTLY can't run inside a transaction, but keeps writes flowing
+    # while the GIN indexes are built on a large table
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_tasks_title_trgm",
+            "tasks",
+            ["title"],
+            unique=False,
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"},
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_tasks_description_trgm",
+            "tasks",
+            ["description"],
+            unique=False,
+            postgresql_using="gin",
+            postgresql_ops={"description": "gin_trgm_ops"},
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # pg_trgm is left installed, other objects may depend on it
+    op.drop_index("ix_tasks_description_trgm", table_name="tasks")
+    op.drop_index("ix_tasks_title_trgm", table_name="tasks")
@@ -0,0 +1,61 @@
+"""added tasks query indexes
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2025-10-21 11:47:03.562190
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, Sequence[str], None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# name -> (columns, partial index predicate)
+INDEXES = {
+    "ix_tasks_priority_id": (["priority", "id"], None),
+    "ix_tasks_due_date_id": (["due_date", "id"], None),
+    "ix_tasks_done_id": (["done", "id"], None),
+    "ix_tasks_done_priority_id": (["done", "priority", "id"], None),
+    "ix_tasks_done_due_date_id": (["done", "due_date", "id"], None),
+    "ix_tasks_category_priority_id": (["category", "priority", "id"], None),
+    "ix_tasks_category_due_date_id": (["category", "due_date", "id"], None),
+    "ix_tasks_open_category_priority_id": (
+        ["category", "priority", "id"],
+        "NOT done",
+    ),
+    "ix_tasks_open_category_due_date_id": (
+        ["category", "due_date", "id"],
+        "NOT done",
+    ),
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        # Duplicates the primary key index
+        op.drop_index("ix_tasks_id", table_name="tasks", postgresql_concurrently=True)
+        for name, (columns, where) in INDEXES.items():
+            op.create_index(
+                name,
+                "tasks",
+                columns,
+                unique=False,
+                postgresql_where=sa.text(where) if where else None,
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name in reversed(INDEXES):
+        op.drop_index(name, table_name="tasks")
+    op.create_index(op.f("ix_tasks_id"), "tasks", ["id"], unique=False)
@@ -0,0 +1,50 @@
+"""added task tombstones
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2025-10-24 10:31:52.604117
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, Sequence[str], None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "task_tombstones",
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column("deleted_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_task_tombstones_deleted_at_id",
+        "task_tombstones",
+        ["deleted_at", "id"],
+        unique=False,
+    )
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_tasks_updated_at_id",
+            "tasks",
+            ["updated_at", "id"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_tasks_updated_at_id", table_name="tasks")
+    op.drop_index("ix_task_tombstones_deleted_at_id", table_name="task_tombstones")
+    op.drop_table("task_tombstones")
@@ -0,0 +1,90 @@
+"""added task summary
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2025-10-25 09:12:40.118203
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, Sequence[str], None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Net count change per key for one statement, from its transition tables.
+# Keys are applied in order so concurrent writers lock rows consistently.
+APPLY_DELTAS = """
+    INSERT INTO task_summary AS s (category, done, priority, count)
+    SELECT category, done, priority, sum(delta) FROM (
+        {rows}
+    ) AS deltas
+    GROUP BY category, done, priority
+    HAVING sum(delta) <> 0
+    ORDER BY category, done, priority
+    ON CONFLICT (category, done, priority)
+    DO UPDATE SET count = s.count + EXCLUDED.count;
+"""
+NEW_ROWS = "SELECT coalesce(category, '') AS category, done, priority, 1 AS delta FROM new_rows"
+OLD_ROWS = "SELECT coalesce(category, '') AS category, done, priority, -1 AS delta FROM old_rows"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "task_summary",
+        sa.Column("category", sa.String(length=255), nullable=False),
+        sa.Column("done", sa.Boolean(), nullable=False),
+        sa.Column("priority", sa.Integer(), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("category", "done", "priority"),
+    )
+    op.execute(f"""
+        CREATE FUNCTION task_summary_apply() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                {APPLY_DELTAS.format(rows=NEW_ROWS)}
+            ELSIF TG_OP = 'DELETE' THEN
+                {APPLY_DELTAS.format(rows=OLD_ROWS)}
+            ELSE
+                {APPLY_DELTAS.format(rows=NEW_ROWS + " UNION ALL " + OLD_ROWS)}
+            END IF;
+            RETURN NULL;
+        END
+        $$
+    """)
+    # Transition tables allow one event per trigger
+    for event, tables in (
+        ("INSERT", "NEW TABLE AS new_rows"),
+        ("UPDATE", "NEW TABLE AS new_rows OLD TABLE AS old_rows"),
+        ("DELETE", "OLD TABLE AS old_rows"),
+    ):
+        op.execute(f"""
+            CREATE TRIGGER tasks_summary_{event.lower()}
+            AFTER {event} ON tasks
+            REFERENCING {tables}
+            FOR EACH STATEMENT EXECUTE FUNCTION task_summary_apply()
+        """)
+    # Writes wait until the backfill commits, so none is counted twice or lost
+    op.execute("LOCK TABLE tasks IN SHARE MODE")
+    op.execute("""
+        INSERT INTO task_summary (category, done, priority, count)
+        SELECT coalesce(category, ''), done, priority, count(*)
+        FROM tasks
+        GROUP BY 1, 2, 3
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for event in ("insert", "update", "delete"):
+        op.execute(f"DROP TRIGGER tasks_summary_{event} ON tasks")
+    op.execute("DROP FUNCTION task_summary_apply()")
+    op.drop_table("task_summary")
@@ -0,0 +1,167 @@
+"""added tenant ownership
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2025-10-26 14:03:18.740562
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0007"
+down_revision: Union[str, Sequence[str], None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Existing rows are assigned to the default tenant (Settings.default_tenant)
+DEFAULT_TENANT = "default"
+
+# name -> (columns, partial index predicate)
+OLD_INDEXES = {
+    "ix_tasks_priority_id": (["priority", "id"], None),
+    "ix_tasks_due_date_id": (["due_date", "id"], None),
+    "ix_tasks_done_id": (["done", "id"], None),
+    "ix_tasks_done_priority_id": (["done", "priority", "id"], None),
+    "ix_tasks_done_due_date_id": (["done", "due_date", "id"], None),
+    "ix_tasks_category_priority_id": (["category", "priority", "id"], None),
+    "ix_tasks_category_due_date_id": (["category", "due_date", "id"], None),
+    "ix_tasks_updated_at_id": (["updated_at", "id"], None),
+    "ix_tasks_open_category_priority_id": (
+        ["category", "priority", "id"],
+        "NOT done",
+    ),
+    "ix_tasks_open_category_due_date_id": (
+        ["category", "due_date", "id"],
+        "NOT done",
+    ),
+}
+# Same shapes led by tenant_id, plus the plain per-tenant listing
+INDEXES = {
+    "ix_tasks_tenant_id": (["tenant_id", "id"], None),
+    **{
+        name.replace("ix_tasks_", "ix_tasks_tenant_"): (["tenant_id", *columns], where)
+        for name, (columns, where) in OLD_INDEXES.items()
+    },
+}
+
+
+def summary_function(keys: str) -> str:
+    """task_summary_apply() counting per `keys`, as introduced in 0006."""
+    # Net count change per key for one statement, from its transition tables
+    apply = f"""
+        INSERT INTO task_summary AS s ({keys}, count)
+        SELECT {keys}, sum(delta) FROM ({{rows}}) AS deltas
+        GROUP BY {keys}
+        HAVING sum(delta) <> 0
+        ORDER BY {keys}
+        ON CONFLICT ({keys}) DO UPDATE SET count = s.count + EXCLUDED.count;
+    """
+    rows = f"SELECT {keys.replace('category', "coalesce(category, '') AS category")}, {{delta}} AS delta FROM {{table}}"
+    new_rows = rows.format(delta=1, table="new_rows")
+    old_rows = rows.format(delta=-1, table="old_rows")
+    return f"""
+        CREATE OR REPLACE FUNCTION task_summary_apply() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                {apply.format(rows=new_rows)}
+            ELSIF TG_OP = 'DELETE' THEN
+                {apply.format(rows=old_rows)}
+            ELSE
+                {apply.format(rows=new_rows + " UNION ALL " + old_rows)}
+            END IF;
+            RETURN NULL;
+        END
+        $$
+    """
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in ("tasks", "task_tombstones", "task_summary"):
+        # A constant default is a catalog-only change, no table rewrite
+        op.add_column(
+            table,
+            sa.Column(
+                "tenant_id",
+                sa.String(length=64),
+                server_default=DEFAULT_TENANT,
+                nullable=False,
+            ),
+        )
+        op.alter_column(table, "tenant_id", server_default=None)
+
+    op.drop_constraint("task_summary_pkey", "task_summary", type_="primary")
+    op.create_primary_key(
+        "task_summary_pkey",
+        "task_summary",
+        ["tenant_id", "category", "done", "priority"],
+    )
+    op.execute(summary_function("tenant_id, category, done, priority"))
+
+    op.drop_index("ix_task_tombstones_deleted_at_id", table_name="task_tombstones")
+    op.create_index(
+        "ix_task_tombstones_tenant_deleted_at_id",
+        "task_tombstones",
+        ["tenant_id", "deleted_at", "id"],
+        unique=False,
+    )
+    with op.get_context().autocommit_block():
+        for name, (columns, where) in INDEXES.items():
+            op.create_index(
+                name,
+                "tasks",
+                columns,
+                unique=False,
+                postgresql_where=sa.text(where) if where else None,
+                postgresql_concurrently=True,
+            )
+        # Every query now filters on tenant_id, the old indexes are unused
+        for name in OLD_INDEXES:
+            op.drop_index(name, table_name="tasks", postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, (columns, where) in OLD_INDEXES.items():
+        op.create_index(
+            name,
+            "tasks",
+            columns,
+            unique=False,
+            postgresql_where=sa.text(where) if where else None,
+        )
+    for name in reversed(INDEXES):
+        op.drop_index(name, table_name="tasks")
+    op.drop_index(
+        "ix_task_tombstones_tenant_deleted_at_id", table_name="task_tombstones"
+    )
+    op.create_index(
+        "ix_task_tombstones_deleted_at_id",
+        "task_tombstones",
+        ["deleted_at", "id"],
+        unique=False,
+    )
+
+    # Fold the tenants' counters into one set per key, writes held off
+    op.execute("LOCK TABLE tasks IN SHARE MODE")
+    op.drop_constraint("task_summary_pkey", "task_summary", type_="primary")
+    op.drop_column("task_summary", "tenant_id")
+    op.execute("DELETE FROM task_summary")
+    op.create_primary_key(
+        "task_summary_pkey", "task_summary", ["category", "done", "priority"]
+    )
+    op.execute(summary_function("category, done, priority"))
+    op.execute("""
+        INSERT INTO task_summary (category, done, priority, count)
+        SELECT coalesce(category, ''), done, priority, count(*)
+        FROM tasks
+        GROUP BY 1, 2, 3
+    """)
+    op.drop_column("task_tombstones", "tenant_id")
+    op.drop_column("tasks", "tenant_id")
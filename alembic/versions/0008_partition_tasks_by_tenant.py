@@ -0,0 +1,109 @@
+"""partition tasks by tenant
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2025-10-26 16:40:55.291734
+
+Opt-in: only applied when run with the partition count, e.g.
+
+    alembic -x tenant_partitions=16 upgrade head
+
+and a no-op otherwise. tasks becomes a hash-partitioned table on tenant_id,
+so a tenant-scoped query is pruned to the single partition holding it. The
+primary key becomes (tenant_id, id), as a partitioned table's unique keys
+must contain the partition key. Ids are still unique across tenants: new ones
+are UUIDv4s and imports skip any id found in the plain ix_tasks_id index
+(see TaskRepository.import_batch), as the tombstones and sync rely on it.
+
+The table is rewritten under an ACCESS EXCLUSIVE lock: plan a maintenance
+window for large tables.
+"""
+
+from typing import Optional, Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0008"
+down_revision: Union[str, Sequence[str], None] = "0007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def is_partitioned() -> bool:
+    return bool(
+        op.get_bind().scalar(
+            sa.text(
+                "SELECT count(*) FROM pg_partitioned_table "
+                "WHERE partrelid = 'tasks'::regclass"
+            )
+        )
+    )
+
+
+def rebuild_tasks(partitions: Optional[int]):
+    """Copies tasks into a new table, hash-partitioned when `partitions` is set.
+
+    Secondary indexes and triggers are read from the catalog and recreated on
+    the new table under their own names, except ix_tasks_id: only the
+    partitioned table needs it.
+    """
+    bind = op.get_bind()
+    op.execute("LOCK TABLE tasks IN ACCESS EXCLUSIVE MODE")
+    indexes = bind.scalars(
+        sa.text(
+            "SELECT pg_get_indexdef(indexrelid) FROM pg_index "
+            "WHERE indrelid = 'tasks'::regclass AND NOT indisprimary "
+            "AND indexrelid IS DISTINCT FROM to_regclass('ix_tasks_id')"
+        )
+    ).all()
+    triggers = bind.scalars(
+        sa.text(
+            "SELECT pg_get_triggerdef(oid) FROM pg_trigger "
+            "WHERE tgrelid = 'tasks'::regclass AND NOT tgisinternal"
+        )
+    ).all()
+
+    if partitions:
+        op.execute("""
+            CREATE TABLE tasks_new (LIKE tasks INCLUDING DEFAULTS INCLUDING CONSTRAINTS)
+            PARTITION BY HASH (tenant_id)
+        """)
+        op.execute("ALTER TABLE tasks_new ADD PRIMARY KEY (tenant_id, id)")
+        # Looks an id up in every partition; unpartitioned, the key does this
+        op.execute("CREATE INDEX ix_tasks_id ON tasks_new (id)")
+        for remainder in range(partitions):
+            op.execute(f"""
+                CREATE TABLE tasks_p{remainder} PARTITION OF tasks_new
+                FOR VALUES WITH (MODULUS {partitions}, REMAINDER {remainder})
+            """)
+    else:
+        op.execute("""
+            CREATE TABLE tasks_new (LIKE tasks INCLUDING DEFAULTS INCLUDING CONSTRAINTS)
+        """)
+        op.execute("ALTER TABLE tasks_new ADD PRIMARY KEY (id)")
+
+    op.execute("INSERT INTO tasks_new SELECT * FROM tasks")
+    op.execute("DROP TABLE tasks")
+    op.execute("ALTER TABLE tasks_new RENAME TO tasks")
+    op.execute("ALTER TABLE tasks RENAME CONSTRAINT tasks_new_pkey TO tasks_pkey")
+    # The definitions name "tasks", which is now the new table
+    for statement in (*indexes, *triggers):
+        op.execute(statement)
+    op.execute("ANALYZE tasks")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    partitions = context.get_x_argument(as_dictionary=True).get("tenant_partitions")
+    if not partitions or is_partitioned():
+        return
+    rebuild_tasks(int(partitions))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if is_partitioned():
+        rebuild_tasks(None)
@@ -0,0 +1,62 @@
+"""added change xids
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2025-11-02 09:47:31.208416
+
+The changes feed pages by the id of the transaction that last wrote a row
+instead of by updated_at: a transaction can commit well after its clock
+reading, behind a sync token already handed out. Existing rows all get the
+migration's own id. Adding the columns rewrites both tables under an ACCESS
+EXCLUSIVE lock.
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0010"
+down_revision: Union[str, Sequence[str], None] = "0009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Also covers COPY and raw SQL inserts; the ORM sets it on update
+CURRENT_XID = sa.text("(pg_current_xact_id()::text::bigint)")
+
+# table -> (old sync index, old order column)
+TABLES = {
+    "tasks": ("ix_tasks_tenant_updated_at_id", "updated_at"),
+    "task_tombstones": ("ix_task_tombstones_tenant_deleted_at_id", "deleted_at"),
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table, (old_index, _) in TABLES.items():
+        op.add_column(
+            table,
+            sa.Column(
+                "change_xid",
+                sa.BigInteger(),
+                server_default=CURRENT_XID,
+                nullable=False,
+            ),
+        )
+        op.create_index(
+            f"ix_{table}_tenant_change_xid_id",
+            table,
+            ["tenant_id", "change_xid", "id"],
+            unique=False,
+        )
+        op.drop_index(old_index, table_name=table)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, (old_index, column) in TABLES.items():
+        op.create_index(old_index, table, ["tenant_id", column, "id"], unique=False)
+        op.drop_index(f"ix_{table}_tenant_change_xid_id", table_name=table)
+        op.drop_column(table, "change_xid")
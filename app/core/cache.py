@@ -0,0 +1,58 @@
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+
+class InMemoryCache:
+    """Per-process LRU cache with TTLs.
+
+    Implements the subset of the redis.asyncio client API used by the app
+    (get, set with ex, delete, incr), so a Redis client can replace it.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, Tuple[Optional[float], str]] = OrderedDict()
+        # Counters live outside the LRU so they are never evicted
+        self._counters: dict[str, int] = {}
+
+    async def get(self, key: str) -> Optional[str]:
+        if key in self._counters:
+            return str(self._counters[key])
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: str, ex: Optional[int] = None):
+        expires_at = time.monotonic() + ex if ex else None
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def delete(self, *keys: str) -> int:
+        removed = 0
+        for key in keys:
+            removed += self._entries.pop(key, None) is not None
+            removed += self._counters.pop(key, None) is not None
+        return removed
+
+    async def incr(self, key: str) -> int:
+        self._counters[key] = self._counters.get(key, 0) + 1
+        return self._counters[key]
+
+
+def create_cache_backend(backend: str, url: str, max_entries: int):
+    if backend == "redis":
+        try:
+            from redis import asyncio as redis
+        except ImportError as e:
+            raise RuntimeError("CACHE_BACKEND=redis requires the redis package") from e
+        return redis.from_url(url)
+    return InMemoryCache(max_entries)
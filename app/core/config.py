@@ -1,4 +1,4 @@
-from pydantic import Field
+from pydantic import Field, model_validator
 from .base_config import BaseAppSettings
 from .db_settings import DatabaseSettings
 
@@ -13,8 +13,165 @@ class Settings(BaseAppSettings):
     debug: bool = Field(default=True, description="Enable debug mode")
     app_version: str = Field(default="1.0.0", description="Application version")
 
+    # Server (python -m app.server)
+    host: str = Field(default="0.0.0.0", description="Interface to bind")
+    port: int = Field(default=8000, description="Port to bind")
+    workers: int = Field(
+        default=1,
+        ge=1,
+        description="Worker processes, each with its own DB pool; about one per core",
+    )
+    keepalive_seconds: int = Field(
+        default=5, description="How long idle keep-alive connections stay open"
+    )
+    graceful_shutdown_seconds: int = Field(
+        default=30,
+        description="Time in-flight requests get to finish on shutdown",
+    )
+
+    # Tenancy
+    default_tenant: str = Field(
+        default="default",
+        description="Tenant used when a request sends no X-Tenant-ID header",
+    )
+    tenant_required: bool = Field(
+        default=False, description="Reject requests without an X-Tenant-ID header"
+    )
+
+    # Logging
+    log_level: str = Field(default="INFO", description="Level of the app logger")
+    log_json: bool = Field(default=False, description="Write logs as JSON lines")
+    log_file_enabled: bool = Field(
+        default=True, description="Also write logs to app/logs/app.log"
+    )
+    log_sample_rate: float = Field(
+        default=1.0,
+        ge=0,
+        le=1,
+        description="Fraction of requests whose INFO and DEBUG logs are kept",
+    )
+
+    # Pagination
+    page_size_default: int = Field(
+        default=50, description="Number of tasks returned per page by default"
+    )
+    page_size_max: int = Field(
+        default=200, description="Upper bound for the requested page size"
+    )
+
+    # Top-N (GET /tasks/top)
+    top_max_items: int = Field(
+        default=100, description="Upper bound for tasks returned per top-N group"
+    )
+
+    # Export
+    export_batch_size: int = Field(
+        default=1000, description="Rows fetched per round trip when streaming exports"
+    )
+    import_batch_size: int = Field(
+        default=5000,
+        description="Rows validated and copied per transaction by streamed imports",
+    )
+    import_max_reported_errors: int = Field(
+        default=100, description="Rejected rows described in an import's result"
+    )
+
+    # Bulk endpoints
+    bulk_max_items: int = Field(
+        default=1000, description="Maximum number of tasks in one bulk request"
+    )
+
+    # Response cache
+    cache_enabled: bool = Field(default=True, description="Cache task reads")
+    cache_backend: str = Field(
+        default="memory",
+        description="'memory' for a per-process LRU, 'redis' to share between workers",
+    )
+    cache_url: str = Field(
+        default="redis://localhost:6379/0", description="Redis URL for the cache"
+    )
+    cache_ttl_seconds: int = Field(
+        default=30, description="How long cached task reads are served"
+    )
+    cache_max_entries: int = Field(
+        default=1024, description="Entries kept by the in-memory cache"
+    )
+
+    # Request coalescing
+    singleflight_enabled: bool = Field(
+        default=True,
+        description="Concurrent identical task reads share one DB query",
+    )
+
+    # Write-behind for PATCH /tasks/{id}/done and /priority
+    write_behind_enabled: bool = Field(
+        default=False,
+        description="Batch done/priority updates into shared transactions",
+    )
+    write_behind_delay_ms: int = Field(
+        default=20, description="Longest an update waits for its batch"
+    )
+    write_behind_max_items: int = Field(
+        default=200, description="Tasks per batch before it is flushed early"
+    )
+
+    # Background jobs (POST /jobs)
+    jobs_enabled: bool = Field(
+        default=True, description="Run background jobs in this process"
+    )
+    job_workers: int = Field(
+        default=2, ge=1, description="Jobs run concurrently by each worker process"
+    )
+    job_chunk_size: int = Field(
+        default=500, ge=1, description="Tasks handled per job transaction"
+    )
+    job_poll_seconds: float = Field(
+        default=2.0, description="How often idle job workers look for new jobs"
+    )
+    job_stale_seconds: float = Field(
+        default=60.0,
+        description="A running job without progress for this long is taken over; "
+        "must exceed the time one chunk takes",
+    )
+    job_max_attempts: int = Field(
+        default=3, ge=1, description="Claims of a job before it is marked failed"
+    )
+    job_import_max_items: int = Field(
+        default=100_000, description="Maximum number of tasks in one import job"
+    )
+
+    # Live task events (GET /tasks/events)
+    events_enabled: bool = Field(default=True, description="Serve task events")
+    events_backend: str = Field(
+        default="postgres",
+        description="'postgres' to LISTEN/NOTIFY across workers, 'memory' for "
+        "this worker's own writes only",
+    )
+    events_queue_size: int = Field(
+        default=100,
+        ge=1,
+        description="Events buffered per client before it is told to resync",
+    )
+    events_heartbeat_seconds: float = Field(
+        default=15, description="Idle time before a keep-alive comment is sent"
+    )
+
     # Compose databases
     db: DatabaseSettings = Field(default_factory=DatabaseSettings)
 
+    @model_validator(mode="after")
+    def check_cache_is_shared(self):
+        # Each process would only invalidate its own copy: the others would
+        # serve stale pages and ETags until the TTL runs out. Replicas mean a
+        # scaled-out deployment; other containers are beyond what this sees
+        scaled_out = self.workers > 1 or bool(self.db.replica_urls)
+        if scaled_out and self.cache_enabled and self.cache_backend == "memory":
+            raise ValueError(
+                "WORKERS > 1 or DB_REPLICA_URLS needs CACHE_BACKEND=redis (or "
+                "CACHE_ENABLED=False): the memory cache isn't invalidated "
+                "across processes"
+            )
+        return self
+
 
 settings = Settings()
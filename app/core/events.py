@@ -0,0 +1,206 @@
+import asyncio
+import asyncpg
+import json
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.logger import AppLogger
+
+logger = AppLogger().get_logger()
+
+CHANNEL = "task_events"
+# NOTIFY payloads are capped at 8000 bytes; this many UUIDs stay well below
+MAX_IDS_PER_EVENT = 100
+# Sent instead of events a subscriber missed; clients should refetch
+RESYNC = "resync"
+
+
+def task_events(tenant_id: str, type: str, ids: Iterable[Any]) -> List[dict]:
+    """Events for a change to `ids`, split to fit into NOTIFY payloads."""
+    ids = [str(task_id) for task_id in ids]
+    return [
+        {"tenant_id": tenant_id, "type": type, "ids": ids[i : i + MAX_IDS_PER_EVENT]}
+        for i in range(0, len(ids), MAX_IDS_PER_EVENT)
+    ]
+
+
+def format_sse(event: dict) -> bytes:
+    """One server-sent event; the tenant is implied by the subscription."""
+    data = {key: value for key, value in event.items() if key != "tenant_id"}
+    return f"event: {event['type']}\ndata: {json.dumps(data)}\n\n".encode()
+
+
+class Subscription:
+    def __init__(self, tenant_id: str, queue_size: int):
+        self.tenant_id = tenant_id
+        self.queue: asyncio.Queue = asyncio.Queue(queue_size)
+
+    def put(self, event: dict) -> int:
+        """Queues the event; returns how many queued events were dropped."""
+        try:
+            self.queue.put_nowait(event)
+            return 0
+        except asyncio.QueueFull:
+            # Never block the publisher on a slow client: drop its backlog
+            # and tell it to resync instead
+            dropped = self.queue.qsize()
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait({"type": RESYNC})
+            return dropped
+
+    async def get(self, timeout: float) -> Optional[dict]:
+        """The next event, or None if none arrived within `timeout` seconds."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class Broadcaster:
+    """Fans events out to this worker's subscribers of the event's tenant.
+
+    Each subscriber has a bounded queue; one that falls behind loses its
+    backlog and gets a single resync event, so publishing never waits.
+    """
+
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self._subscribers: Dict[str, Set[Subscription]] = defaultdict(set)
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+
+    def subscribe(self, tenant_id: str) -> Subscription:
+        subscription = Subscription(tenant_id, self.queue_size)
+        self._subscribers[tenant_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        subscribers = self._subscribers.get(subscription.tenant_id)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.tenant_id]
+
+    def publish(self, event: dict):
+        self.published += 1
+        for subscription in self._subscribers.get(event["tenant_id"], ()):
+            self.dropped += subscription.put(event)
+            self.delivered += 1
+
+    def resync(self):
+        """Tells every subscriber it may have missed events."""
+        for subscribers in self._subscribers.values():
+            for subscription in subscribers:
+                self.dropped += subscription.put({"type": RESYNC})
+
+    def stats(self) -> dict:
+        return {
+            "subscribers": sum(len(s) for s in self._subscribers.values()),
+            "published": self.published,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+        }
+
+
+class InMemoryBroker:
+    """Delivers events to this worker's subscribers once they are committed.
+
+    Stand-in for PostgresBroker in tests and single-worker setups; other
+    workers never see the events.
+    """
+
+    def __init__(self, broadcaster: Broadcaster):
+        self.broadcaster = broadcaster
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    async def before_commit(self, session: AsyncSession, events: List[dict]):
+        pass
+
+    def after_commit(self, events: List[dict]):
+        for event in events:
+            self.broadcaster.publish(event)
+
+
+class PostgresBroker(InMemoryBroker):
+    """NOTIFY inside the writing transaction, one LISTEN connection per worker.
+
+    Postgres delivers notifications only if the transaction commits, to every
+    listening worker (this one included), so after_commit has nothing to do.
+    """
+
+    def __init__(self, broadcaster: Broadcaster, dsn: str, retry_seconds: float = 1):
+        super().__init__(broadcaster)
+        self.dsn = dsn
+        self.retry_seconds = retry_seconds
+        self._listener: Optional[asyncio.Task] = None
+
+    async def before_commit(self, session: AsyncSession, events: List[dict]):
+        for event in events:
+            await session.execute(
+                select(
+                    func.pg_notify(CHANNEL, json.dumps(event, separators=(",", ":")))
+                )
+            )
+
+    def after_commit(self, events: List[dict]):
+        pass
+
+    def _on_notify(self, connection, pid, channel, payload: str):
+        try:
+            self.broadcaster.publish(json.loads(payload))
+        except (ValueError, KeyError, TypeError):
+            logger.warning("Ignoring malformed %s payload: %r", channel, payload)
+
+    async def _listen(self):
+        connected_before = False
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(self.dsn)
+                closed = asyncio.Event()
+                connection.add_termination_listener(lambda _: closed.set())
+                await connection.add_listener(CHANNEL, self._on_notify)
+                if connected_before:
+                    # Whatever was sent while we were away is lost
+                    self.broadcaster.resync()
+                connected_before = True
+                logger.info("Listening for %s notifications", CHANNEL)
+                await closed.wait()
+                logger.warning("Lost the %s listener connection", CHANNEL)
+            except (OSError, asyncpg.PostgresError) as e:
+                logger.warning("Cannot listen for %s: %s", CHANNEL, e)
+            finally:
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
+            await asyncio.sleep(self.retry_seconds)
+
+    async def start(self):
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+
+def create_event_broker(backend: str, url: str, queue_size: int) -> InMemoryBroker:
+    broadcaster = Broadcaster(queue_size)
+    if backend == "postgres":
+        # asyncpg takes a plain libpq URL, without SQLAlchemy's driver suffix
+        return PostgresBroker(broadcaster, url.replace("+asyncpg", "", 1))
+    return InMemoryBroker(broadcaster)
@@ -1,6 +1,63 @@
+import atexit
+import json
 import os
 import logging
-from logging.handlers import RotatingFileHandler
+import queue
+import random
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Optional
+
+from app.core.config import settings
+
+# Per-request sampling decision, None outside of a request
+log_sampled: ContextVar[Optional[bool]] = ContextVar("log_sampled", default=None)
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps a fraction of records below WARNING, all of a request or none."""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or self.rate >= 1:
+            return True
+        sampled = log_sampled.get()
+        if sampled is None:
+            return random.random() < self.rate
+        return sampled
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry)
+
+
+class LogSamplingMiddleware:
+    """Makes one sampling decision per request for SamplingFilter."""
+
+    def __init__(self, app, rate: float):
+        self.app = app
+        self.rate = rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self.rate >= 1:
+            return await self.app(scope, receive, send)
+        token = log_sampled.set(random.random() < self.rate)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            log_sampled.reset(token)
 
 
 class AppLogger:
@@ -14,31 +71,47 @@ class AppLogger:
 
     def _setup(self):
         self.logger = logging.getLogger("app")
-        self.logger.setLevel(logging.INFO)
-
-        # [2025-10-01 18:45:12,346] [WARNING] [app] - Like that
-        formatter = logging.Formatter(
-            "[%(asctime)s] [%(levelname)s] [%(name)s] - %(message)s"
-        )
-
-        # File
-        logs_dir = os.path.join(os.getcwd(), "app", "logs")
-        os.makedirs(logs_dir, exist_ok=True)
+        self.logger.setLevel(settings.log_level.upper())
 
-        file_handler = RotatingFileHandler(
-            # Max size 5 MB and max 5 old files
-            os.path.join(logs_dir, "app.log"),
-            maxBytes=5 * 1024 * 1024,
-            backupCount=5,
-        )
-        file_handler.setFormatter(formatter)
+        if settings.log_json:
+            formatter = JsonFormatter()
+        else:
+            # [2025-10-01 18:45:12,346] [WARNING] [app] - Like that
+            formatter = logging.Formatter(
+                "[%(asctime)s] [%(levelname)s] [%(name)s] - %(message)s"
+            )
 
         # Console
         stream_handler = logging.StreamHandler()
         stream_handler.setFormatter(formatter)
+        handlers = [stream_handler]
+
+        # File
+        if settings.log_file_enabled:
+            logs_dir = os.path.join(os.getcwd(), "app", "logs")
+            os.makedirs(logs_dir, exist_ok=True)
+
+            file_handler = RotatingFileHandler(
+                # Max size 5 MB and max 5 old files
+                os.path.join(logs_dir, "app.log"),
+                maxBytes=5 * 1024 * 1024,
+                backupCount=5,
+            )
+            file_handler.setFormatter(formatter)
+            handlers.append(file_handler)
+
+        # Request code only formats and enqueues records (QueueHandler.prepare
+        # runs on the calling thread); a background thread does the writing
+        # and rotation off the event loop
+        log_queue = queue.SimpleQueue()
+        queue_handler = QueueHandler(log_queue)
+        queue_handler.addFilter(SamplingFilter(settings.log_sample_rate))
+        self.logger.addHandler(queue_handler)
 
-        self.logger.addHandler(file_handler)
-        self.logger.addHandler(stream_handler)
+        self.listener = QueueListener(log_queue, *handlers)
+        self.listener.start()
+        # Flush whatever is still queued on interpreter exit
+        atexit.register(self.listener.stop)
 
     def get_logger(self):
         return self.logger
@@ -0,0 +1,209 @@
+import functools
+import inspect
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextvars import ContextVar
+from typing import Callable, Dict, Optional, Tuple
+
+from fastapi.routing import APIRoute
+
+LabelValues = Tuple[Tuple[str, str], ...]
+
+
+def _labels(values: LabelValues, extra: str = "") -> str:
+    parts = [f'{key}="{value}"' for key, value in values]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class CallbackMetric:
+    """Counter or gauge whose values are read from a callback at scrape time."""
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        read: Callable[[], Dict[str, float]],
+        type: str = "gauge",
+        label: str = "kind",
+    ):
+        self.name = name
+        self.description = description
+        # read() returns {label value: metric value}
+        self.read = read
+        self.type = type
+        self.label = label
+
+    def samples(self):
+        for value_label, value in self.read().items():
+            yield f'{self.name}{{{self.label}="{value_label}"}} {value}'
+
+
+class Histogram:
+    type = "histogram"
+    BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+    def __init__(self, name: str, description: str, buckets=BUCKETS):
+        self.name = name
+        self.description = description
+        self.buckets = tuple(buckets)
+        self._counts: Dict[LabelValues, list] = {}
+        self._sums: Dict[LabelValues, float] = defaultdict(float)
+
+    def observe(self, value: float, **labels: str):
+        key = tuple(sorted(labels.items()))
+        counts = self._counts.setdefault(key, [0] * (len(self.buckets) + 1))
+        counts[bisect_left(self.buckets, value)] += 1
+        self._sums[key] += value
+
+    def totals(self) -> Tuple[int, float]:
+        """Observation count and sum across all label sets."""
+        count = sum(sum(counts) for counts in self._counts.values())
+        return count, sum(self._sums.values())
+
+    def samples(self):
+        for labels, counts in self._counts.items():
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += count
+                bucket = _labels(labels, f'le="{bound}"')
+                yield f"{self.name}_bucket{bucket} {cumulative}"
+            yield f"{self.name}_sum{_labels(labels)} {self._sums[labels]}"
+            yield f"{self.name}_count{_labels(labels)} {cumulative}"
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        # Prometheus text exposition format 0.0.4
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.description}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_request_duration = registry.register(
+    Histogram("http_request_duration_seconds", "HTTP request latency by route")
+)
+db_query_duration = registry.register(
+    Histogram("db_query_duration_seconds", "Duration of single SQL statements")
+)
+db_queries_per_request = registry.register(
+    Histogram(
+        "db_queries_per_request",
+        "SQL statements executed per HTTP request",
+        buckets=(0, 1, 2, 3, 5, 10, 25, 50, 100),
+    )
+)
+
+
+class RequestTimings:
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.db_time = 0.0
+        self.db_queries = 0
+        self.endpoint_done: Optional[float] = None
+
+
+request_timings: ContextVar[Optional[RequestTimings]] = ContextVar(
+    "request_timings", default=None
+)
+
+
+def record_query(duration: float):
+    db_query_duration.observe(duration)
+    timings = request_timings.get()
+    if timings is not None:
+        timings.db_time += duration
+        timings.db_queries += 1
+
+
+class MetricsMiddleware:
+    """Records per-route latency and adds a Server-Timing header."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        timings = RequestTimings()
+        token = request_timings.set(timings)
+        status_code = 500
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", server_timing(timings).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            request_timings.reset(token)
+            route = scope.get("route")
+            labels = {
+                "method": scope["method"],
+                # The route template keeps label cardinality bounded
+                "route": route.path if route else "unmatched",
+                "status": str(status_code),
+            }
+            http_request_duration.observe(time.perf_counter() - timings.start, **labels)
+            db_queries_per_request.observe(timings.db_queries)
+
+
+def server_timing(timings: RequestTimings) -> str:
+    now = time.perf_counter()
+    metrics = [f"db;dur={timings.db_time * 1000:.2f}"]
+    if timings.endpoint_done is not None:
+        # Response model validation and JSON encoding after the endpoint
+        metrics.append(f"serialize;dur={(now - timings.endpoint_done) * 1000:.2f}")
+    metrics.append(f"total;dur={(now - timings.start) * 1000:.2f}")
+    return ", ".join(metrics)
+
+
+def _mark_endpoint_done():
+    timings = request_timings.get()
+    if timings is not None:
+        timings.endpoint_done = time.perf_counter()
+
+
+class TimedRoute(APIRoute):
+    """APIRoute that notes when the endpoint returns, for serialize timing."""
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        if inspect.iscoroutinefunction(endpoint):
+
+            @functools.wraps(endpoint)
+            async def timed_endpoint(*args, **kw):
+                try:
+                    return await endpoint(*args, **kw)
+                finally:
+                    _mark_endpoint_done()
+
+        else:
+
+            @functools.wraps(endpoint)
+            def timed_endpoint(*args, **kw):
+                try:
+                    return endpoint(*args, **kw)
+                finally:
+                    _mark_endpoint_done()
+
+        super().__init__(path, timed_endpoint, **kwargs)
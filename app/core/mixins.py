@@ -1,19 +1,96 @@
 from datetime import datetime, timezone
-from sqlalchemy import DateTime
+from sqlalchemy import BigInteger, DateTime, Integer, String, func, literal_column
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql.functions import FunctionElement
 import uuid
 from sqlalchemy.dialects.postgresql import UUID
 
 
 class IdMixin:
     id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
     )
 
 
+class TenantMixin:
+    # Owner of the row; leads every index so per-tenant queries stay narrow
+    tenant_id: Mapped[str] = mapped_column(String(64), nullable=False)
+
+
 class DueDateMixin:
     due_date: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         default=lambda: datetime.now(timezone.utc),
         nullable=False,
     )
+
+
+class VersionMixin:
+    # Bumped by every UPDATE, including bulk Core statements, via onupdate
+    version: Mapped[int] = mapped_column(
+        Integer,
+        default=1,
+        server_default="1",
+        onupdate=literal_column("version") + 1,
+        nullable=False,
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        server_default=func.now(),
+        onupdate=lambda: datetime.now(timezone.utc),
+        nullable=False,
+    )
+
+
+class current_change_xid(FunctionElement):
+    """Orders writes by commit: the writing transaction's id on Postgres."""
+
+    type = BigInteger()
+    inherit_cache = True
+
+
+class change_horizon(FunctionElement):
+    """Every change_xid below this belongs to a finished transaction."""
+
+    type = BigInteger()
+    inherit_cache = True
+
+
+# SQLite runs one writer at a time, so a counter shared by the change tables
+# is in commit order and its next value is the horizon
+_NEXT_CHANGE = (
+    "(SELECT coalesce(max(xid), 0) + 1 FROM ("
+    "SELECT max(change_xid) AS xid FROM tasks "
+    "UNION ALL SELECT max(change_xid) FROM task_tombstones))"
+)
+
+
+@compiles(current_change_xid)
+@compiles(change_horizon)
+def _compile_next_change(element, compiler, **kw):
+    return _NEXT_CHANGE
+
+
+@compiles(current_change_xid, "postgresql")
+def _compile_current_xid(element, compiler, **kw):
+    return "pg_current_xact_id()::text::bigint"
+
+
+@compiles(change_horizon, "postgresql")
+def _compile_snapshot_xmin(element, compiler, **kw):
+    # Transactions still running when the snapshot was taken are >= xmin
+    return "pg_snapshot_xmin(pg_current_snapshot())::text::bigint"
+
+
+class ChangeMixin:
+    # Set by every write, including bulk Core statements, like version. The
+    # changes feed pages by it instead of by clock, as a transaction can
+    # commit long after its updated_at
+    change_xid: Mapped[int] = mapped_column(
+        BigInteger,
+        default=current_change_xid(),
+        onupdate=current_change_xid(),
+        nullable=False,
+    )
@@ -0,0 +1,21 @@
+from typing import Optional
+from fastapi import Header, HTTPException, status
+
+from app.core.config import settings
+
+TENANT_HEADER = "X-Tenant-ID"
+
+
+def get_tenant_id(
+    x_tenant_id: Optional[str] = Header(
+        None, min_length=1, max_length=64, pattern=r"^[A-Za-z0-9_.:-]+$"
+    ),
+) -> str:
+    if x_tenant_id is not None:
+        return x_tenant_id
+    if settings.tenant_required:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"{TENANT_HEADER} header is required",
+        )
+    return settings.default_tenant
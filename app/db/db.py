@@ -1,13 +1,117 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+import asyncio
+from typing import Awaitable, Callable
+from fastapi import Depends, Request
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.core.logger import AppLogger
+from app.db.instrumentation import instrument_engine
+from app.db.pool import InstrumentedPool, pool_stats
+from app.db.replicas import AUTOCOMMIT, ReplicaSet
 
-engine = create_async_engine(settings.db.url, echo="debug")
+logger = AppLogger().get_logger()
+
+# Reads go to the primary when a request sends this header with any value
+READ_YOUR_WRITES_HEADER = "X-Read-Your-Writes"
+
+engine = instrument_engine(
+    create_async_engine(
+        settings.db.url, poolclass=InstrumentedPool, **settings.db.engine_options
+    )
+)
 async_session = sessionmaker(
     engine, class_=AsyncSession, expire_on_commit=False, autoflush=False
 )
 
+replica_engines = [
+    instrument_engine(
+        create_async_engine(
+            url, poolclass=InstrumentedPool, **settings.db.engine_options
+        )
+    )
+    for url in settings.db.replica_urls
+]
+replicas = ReplicaSet(
+    [
+        sessionmaker(
+            replica, class_=AsyncSession, expire_on_commit=False, autoflush=False
+        )
+        for replica in replica_engines
+    ],
+    settings.db.replica_eject_seconds,
+)
+
+
+# Opens a session; autocommit=True is for reads, saving their BEGIN/COMMIT
+SessionFactory = Callable[..., Awaitable[AsyncSession]]
+
 
 async def get_session():
     async with async_session() as session:
         yield session
+
+
+def session_opener(make_session: sessionmaker) -> SessionFactory:
+    # SQLite doesn't open a transaction for a SELECT, only Postgres gains
+    bind = make_session.kw.get("bind")
+    use_autocommit = bind is not None and bind.dialect.name == "postgresql"
+
+    async def open_session(autocommit: bool = False) -> AsyncSession:
+        session = make_session()
+        if autocommit and use_autocommit:
+            # Checked out now, so the option applies to its connection
+            await session.connection(execution_options=AUTOCOMMIT)
+        return session
+
+    return open_session
+
+
+open_session = session_opener(async_session)
+
+
+def get_session_factory() -> SessionFactory:
+    # Sessions are opened by each unit of work, so a request holds a pooled
+    # connection only while it talks to the DB
+    return open_session
+
+
+def get_read_session_factory(
+    request: Request, primary: SessionFactory = Depends(get_session_factory)
+) -> SessionFactory:
+    if READ_YOUR_WRITES_HEADER in request.headers or not len(replicas):
+        return primary
+
+    async def open_read_session(autocommit: bool = False) -> AsyncSession:
+        session = await replicas.connect(autocommit)
+        return session if session is not None else await primary(autocommit)
+
+    return open_read_session
+
+
+def get_pool_stats() -> dict:
+    return pool_stats(engine.pool)
+
+
+async def warm_up(target: AsyncEngine, connections: int):
+    # Held open together, so each is a distinct connection left in the pool
+    results = await asyncio.gather(
+        *(target.connect() for _ in range(connections)), return_exceptions=True
+    )
+    failures = [result for result in results if isinstance(result, Exception)]
+    for conn in results:
+        if not isinstance(conn, Exception):
+            await conn.close()
+    if failures:
+        # Not fatal: the pool still connects on demand once the DB is back
+        logger.warning("Pool warm-up failed: %s", failures[0])
+
+
+async def startup():
+    if settings.db.pool_warmup:
+        for target in (engine, *replica_engines):
+            await warm_up(target, settings.db.pool_size)
+
+
+async def shutdown():
+    for target in (engine, *replica_engines):
+        await target.dispose()
@@ -0,0 +1,28 @@
+import time
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.metrics import record_query
+
+
+def instrument_engine(engine: AsyncEngine):
+    # Cursor events fire on the sync engine underneath the async facade
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, many):
+        record_query(time.perf_counter() - conn.info["query_start"].pop())
+
+    # Statements that raise never reach after_cursor_execute
+    @event.listens_for(sync_engine, "handle_error")
+    def handle_error(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_start"):
+            record_query(time.perf_counter() - conn.info["query_start"].pop())
+
+    return engine
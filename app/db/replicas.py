@@ -0,0 +1,51 @@
+import itertools
+import time
+from typing import Callable, List, Optional
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.logger import AppLogger
+
+logger = AppLogger().get_logger()
+
+AUTOCOMMIT = {"isolation_level": "AUTOCOMMIT"}
+
+
+class ReplicaSet:
+    """Round-robin over read replicas, skipping ones that recently failed."""
+
+    def __init__(
+        self, factories: List[Callable[[], AsyncSession]], eject_seconds: float
+    ):
+        self._factories = factories
+        self._eject_seconds = eject_seconds
+        self._ejected_until = [0.0] * len(factories)
+        self._counter = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._factories)
+
+    def eject(self, index: int):
+        self._ejected_until[index] = time.monotonic() + self._eject_seconds
+
+    def healthy(self) -> List[int]:
+        if not self._factories:
+            return []
+        now = time.monotonic()
+        start = next(self._counter)
+        indexes = [(start + offset) % len(self) for offset in range(len(self))]
+        return [index for index in indexes if self._ejected_until[index] <= now]
+
+    async def connect(self, autocommit: bool = False) -> Optional[AsyncSession]:
+        # Check out eagerly so a dead replica is found before the query runs
+        for index in self.healthy():
+            session = self._factories[index]()
+            try:
+                await session.connection(
+                    execution_options=AUTOCOMMIT if autocommit else None
+                )
+                return session
+            except (OSError, SQLAlchemyError) as e:
+                await session.close()
+                self.eject(index)
+                logger.warning("Read replica %d ejected: %s", index, e)
+        return None
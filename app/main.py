@@ -1,9 +1,37 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
-from app.routers import health, task
+from app.core.logger import LogSamplingMiddleware
+from app.core.metrics import MetricsMiddleware
+from app.db import db
+from app.routers import health, job, metrics, task
+from app.services.task_events import task_events
+from app.services.task_jobs import task_jobs
+from app.services.task_writes import task_writes
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await db.startup()
+    if task_events:
+        await task_events.start()
+    if task_jobs:
+        await task_jobs.start()
+    yield
+    # Runs after uvicorn has drained in-flight requests; running jobs are
+    # put back in the queue for another process
+    if task_jobs:
+        await task_jobs.stop()
+    if task_writes:
+        await task_writes.stop()
+    if task_events:
+        await task_events.stop()
+    await db.shutdown()
+
 
 app = FastAPI(
+    lifespan=lifespan,
     title="ToDo App Backend",
     description="API for ToDo App",
     version=settings.app_version,
@@ -19,6 +47,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Sample INFO logs per request rather than per line
+app.add_middleware(LogSamplingMiddleware, rate=settings.log_sample_rate)
+
+# Outermost, so latency covers the whole middleware stack
+app.add_middleware(MetricsMiddleware)
+
 # Routers
 app.include_router(health.router, tags=["Health"])
 app.include_router(task.router, tags=["Task"])
+app.include_router(job.router, tags=["Jobs"])
+app.include_router(metrics.router, tags=["Metrics"])
@@ -0,0 +1,50 @@
+import argparse
+import asyncio
+from pathlib import Path
+from typing import List
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.core.config import settings
+from app.core.logger import AppLogger
+
+logger = AppLogger().get_logger()
+
+ALEMBIC_INI = Path(__file__).resolve().parent.parent / "alembic.ini"
+# Any constant shared by every replica; pg_advisory_lock takes a bigint
+MIGRATION_LOCK_ID = 0x746F646F
+
+
+async def migrate(revision: str = "head", x_args: List[str] = ()):
+    """Upgrades the schema once, even if several containers start together."""
+    # -x values, as on the alembic command line (e.g. tenant_partitions=16)
+    config = Config(str(ALEMBIC_INI), cmd_opts=argparse.Namespace(x=list(x_args)))
+    engine = create_async_engine(settings.db.url, poolclass=NullPool)
+    try:
+        async with engine.connect() as conn:
+            logger.info("Waiting for the migration lock")
+            await conn.execute(
+                text("SELECT pg_advisory_lock(:id)"), {"id": MIGRATION_LOCK_ID}
+            )
+            try:
+                logger.info("Upgrading the schema to %s", revision)
+                # Alembic's env.py runs its own event loop, so not on this one
+                await asyncio.to_thread(command.upgrade, config, revision)
+            finally:
+                await conn.execute(
+                    text("SELECT pg_advisory_unlock(:id)"), {"id": MIGRATION_LOCK_ID}
+                )
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m app.migrate")
+    parser.add_argument("revision", nargs="?", default="head")
+    parser.add_argument("-x", action="append", default=[], help="alembic -x value")
+    args = parser.parse_args()
+    asyncio.run(migrate(args.revision, args.x))
@@ -1,12 +1,80 @@
-from datetime import datetime
-from sqlalchemy import Integer, String, Boolean
+from sqlalchemy import Index, Integer, String, Boolean, text
 from app.db.base import Base
 from sqlalchemy.orm import mapped_column, Mapped
-from app.core.mixins import IdMixin, DueDateMixin
+from app.core.mixins import (
+    ChangeMixin,
+    DueDateMixin,
+    IdMixin,
+    TenantMixin,
+    VersionMixin,
+)
 
 
-class Task(Base, IdMixin, DueDateMixin):
+class Task(Base, IdMixin, TenantMixin, DueDateMixin, VersionMixin, ChangeMixin):
     __tablename__ = "tasks"
+    __table_args__ = (
+        # pg_trgm GIN indexes serve ILIKE '%term%' and similarity ranking
+        Index(
+            "ix_tasks_title_trgm",
+            "title",
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_tasks_description_trgm",
+            "description",
+            postgresql_using="gin",
+            postgresql_ops={"description": "gin_trgm_ops"},
+        ),
+        # One index per filter/sort shape of TaskRepository.build_query,
+        # all led by tenant_id since every query is tenant-scoped.
+        # id is the keyset tie-breaker, so it closes every sort index.
+        Index("ix_tasks_tenant_id", "tenant_id", "id"),
+        Index("ix_tasks_tenant_priority_id", "tenant_id", "priority", "id"),
+        Index("ix_tasks_tenant_due_date_id", "tenant_id", "due_date", "id"),
+        Index("ix_tasks_tenant_done_id", "tenant_id", "done", "id"),
+        Index(
+            "ix_tasks_tenant_done_priority_id", "tenant_id", "done", "priority", "id"
+        ),
+        Index(
+            "ix_tasks_tenant_done_due_date_id", "tenant_id", "done", "due_date", "id"
+        ),
+        Index(
+            "ix_tasks_tenant_category_priority_id",
+            "tenant_id",
+            "category",
+            "priority",
+            "id",
+        ),
+        Index(
+            "ix_tasks_tenant_category_due_date_id",
+            "tenant_id",
+            "category",
+            "due_date",
+            "id",
+        ),
+        # Incremental sync walks changes in (change_xid, id) order
+        Index("ix_tasks_tenant_change_xid_id", "tenant_id", "change_xid", "id"),
+        # SQLite's change counter reads max(change_xid), see ChangeMixin
+        Index("ix_tasks_change_xid", "change_xid").ddl_if(dialect="sqlite"),
+        # Open tasks per category is the dashboard's default view
+        Index(
+            "ix_tasks_tenant_open_category_priority_id",
+            "tenant_id",
+            "category",
+            "priority",
+            "id",
+            postgresql_where=text("NOT done"),
+        ),
+        Index(
+            "ix_tasks_tenant_open_category_due_date_id",
+            "tenant_id",
+            "category",
+            "due_date",
+            "id",
+            postgresql_where=text("NOT done"),
+        ),
+    )
 
     title: Mapped[str] = mapped_column(String(255), nullable=False)
     description: Mapped[str] = mapped_column(String(1024), nullable=True)
@@ -0,0 +1,59 @@
+from datetime import datetime, timezone
+from typing import Any, Optional
+from sqlalchemy import JSON, DateTime, Index, Integer, String, Text, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import mapped_column, Mapped
+from app.db.base import Base
+from app.core.mixins import IdMixin, TenantMixin
+
+JSONVariant = JSON().with_variant(JSONB(), "postgresql")
+
+
+class TaskJob(Base, IdMixin, TenantMixin):
+    """A long task operation, run in chunks by the background workers.
+
+    `progress` is saved in the same transaction as each chunk, so a job that
+    is picked up again (after a crash or shutdown) resumes where it stopped.
+    """
+
+    __tablename__ = "task_jobs"
+    __table_args__ = (
+        # Workers claim the oldest queued job
+        Index(
+            "ix_task_jobs_queued_created_at",
+            "created_at",
+            postgresql_where=text("status = 'queued'"),
+        ),
+        # ...or a running one whose worker stopped sending heartbeats
+        Index(
+            "ix_task_jobs_running_heartbeat_at",
+            "heartbeat_at",
+            postgresql_where=text("status = 'running'"),
+        ),
+        Index("ix_task_jobs_tenant_created_at", "tenant_id", "created_at"),
+    )
+
+    kind: Mapped[str] = mapped_column(String(32), nullable=False)
+    # queued -> running -> succeeded | failed
+    status: Mapped[str] = mapped_column(String(16), nullable=False, default="queued")
+    params: Mapped[dict[str, Any]] = mapped_column(JSONVariant, nullable=False)
+    progress: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    total: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    result: Mapped[Optional[dict[str, Any]]] = mapped_column(JSONVariant, nullable=True)
+    error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    # Bumped on every claim; a worker whose claim was taken over can't save
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False,
+    )
+    started_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    heartbeat_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    finished_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
@@ -0,0 +1,20 @@
+from sqlalchemy import Boolean, Integer, String
+from app.db.base import Base
+from sqlalchemy.orm import mapped_column, Mapped
+
+
+class TaskSummary(Base):
+    """Task counts per (tenant, category, done, priority).
+
+    Maintained on PostgreSQL by statement-level triggers on tasks (migrations
+    0006/0007), so every write path, bulk Core statements included, keeps it exact.
+    """
+
+    __tablename__ = "task_summary"
+
+    tenant_id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    # '' stands for tasks without a category, NULL can't be part of the key
+    category: Mapped[str] = mapped_column(String(255), primary_key=True)
+    done: Mapped[bool] = mapped_column(Boolean, primary_key=True)
+    priority: Mapped[int] = mapped_column(Integer, primary_key=True)
+    count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
@@ -0,0 +1,23 @@
+from datetime import datetime, timezone
+from sqlalchemy import DateTime, Index
+from app.db.base import Base
+from sqlalchemy.orm import mapped_column, Mapped
+from app.core.mixins import ChangeMixin, IdMixin, TenantMixin
+
+
+class TaskTombstone(Base, IdMixin, TenantMixin, ChangeMixin):
+    """Marks a deleted task so incremental sync can report the deletion."""
+
+    __tablename__ = "task_tombstones"
+    __table_args__ = (
+        Index(
+            "ix_task_tombstones_tenant_change_xid_id", "tenant_id", "change_xid", "id"
+        ),
+        Index("ix_task_tombstones_change_xid", "change_xid").ddl_if(dialect="sqlite"),
+    )
+
+    deleted_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False,
+    )
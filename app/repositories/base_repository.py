@@ -10,6 +10,10 @@ class AsyncRepository(Generic[T]):
         self.model = model
         self.session = session
 
+    @property
+    def dialect_name(self) -> str:
+        return self.session.bind.dialect.name
+
     async def get_all(self) -> list[T]:
         result = await self.session.execute(select(self.model))
         return result.scalars().all()
@@ -22,3 +26,23 @@ class AsyncRepository(Generic[T]):
 
     async def delete(self, obj: T):
         await self.session.delete(obj)
+
+
+class TenantRepository(AsyncRepository[T]):
+    """Repository whose every query is limited to one tenant's rows."""
+
+    def __init__(self, model: Type[T], session: AsyncSession, tenant_id: str):
+        super().__init__(model, session)
+        self.tenant_id = tenant_id
+
+    def scoped(self, query):
+        return query.where(self.model.tenant_id == self.tenant_id)
+
+    async def get_all(self) -> list[T]:
+        result = await self.session.execute(self.scoped(select(self.model)))
+        return result.scalars().all()
+
+    async def get_by_id(self, id) -> Optional[T]:
+        query = self.scoped(select(self.model).where(self.model.id == id))
+        result = await self.session.execute(query)
+        return result.scalar_one_or_none()
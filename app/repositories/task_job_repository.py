@@ -0,0 +1,146 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.task_job import TaskJob
+from app.repositories.base_repository import AsyncRepository, TenantRepository
+
+
+class JobLost(Exception):
+    """The job was claimed again by another worker; this one must stop."""
+
+
+class TaskJobRepository(TenantRepository[TaskJob]):
+    def __init__(self, session: AsyncSession, tenant_id: str):
+        super().__init__(TaskJob, session, tenant_id)
+
+    async def create(
+        self, kind: str, params: Dict[str, Any], total: Optional[int] = None
+    ) -> TaskJob:
+        job = TaskJob(
+            tenant_id=self.tenant_id,
+            kind=kind,
+            status="queued",
+            params=params,
+            progress=0,
+            total=total,
+            attempts=0,
+        )
+        self.session.add(job)
+        return job
+
+    async def get_recent(self, limit: int) -> List[TaskJob]:
+        query = self.scoped(select(TaskJob)).order_by(
+            TaskJob.created_at.desc(), TaskJob.id.desc()
+        )
+        result = await self.session.execute(query.limit(limit))
+        return result.scalars().all()
+
+    async def save_progress(
+        self,
+        job: TaskJob,
+        progress: int,
+        result: Optional[Dict[str, Any]] = None,
+        total: Optional[int] = None,
+    ):
+        """Saves progress in the caller's transaction, which is rolled back
+        (raising JobLost) if the job was claimed again in the meantime."""
+        values = {
+            "progress": progress,
+            "heartbeat_at": datetime.now(timezone.utc),
+        }
+        if result is not None:
+            values["result"] = result
+        if total is not None:
+            values["total"] = total
+        saved = await self.session.execute(
+            self.scoped(update(TaskJob))
+            .where(
+                TaskJob.id == job.id,
+                TaskJob.status == "running",
+                TaskJob.attempts == job.attempts,
+            )
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        if saved.rowcount != 1:
+            raise JobLost(job.id)
+        job.progress = progress
+        job.result = values.get("result", job.result)
+        job.total = values.get("total", job.total)
+
+
+class TaskJobQueue(AsyncRepository[TaskJob]):
+    """Worker side of the job table, across tenants."""
+
+    def __init__(self, session: AsyncSession):
+        super().__init__(TaskJob, session)
+
+    async def claim(self, stale_seconds: float) -> Optional[TaskJob]:
+        """Marks the oldest runnable job as running and returns it.
+
+        Runnable: queued, or running without a heartbeat for `stale_seconds`
+        (its worker died). SKIP LOCKED lets concurrent workers each claim a
+        different job without waiting on one another.
+        """
+        now = datetime.now(timezone.utc)
+        stale = now - timedelta(seconds=stale_seconds)
+        candidate = (
+            select(TaskJob.id)
+            .where(
+                or_(
+                    TaskJob.status == "queued",
+                    and_(TaskJob.status == "running", TaskJob.heartbeat_at < stale),
+                )
+            )
+            .order_by(TaskJob.created_at)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        result = await self.session.execute(
+            update(TaskJob)
+            .where(TaskJob.id == candidate)
+            .values(
+                status="running",
+                attempts=TaskJob.attempts + 1,
+                started_at=now,
+                heartbeat_at=now,
+            )
+            .returning(TaskJob)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+        return result.scalar_one_or_none()
+
+    async def finish(
+        self,
+        job: TaskJob,
+        status: str,
+        error: Optional[str] = None,
+    ) -> bool:
+        result = await self.session.execute(
+            update(TaskJob)
+            .where(
+                TaskJob.id == job.id,
+                TaskJob.status == "running",
+                TaskJob.attempts == job.attempts,
+            )
+            .values(
+                status=status,
+                error=error,
+                finished_at=datetime.now(timezone.utc),
+                heartbeat_at=None,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount == 1
+
+    async def release(self, job: TaskJob):
+        """Puts an interrupted job back in the queue, keeping its progress."""
+        await self.session.execute(
+            update(TaskJob)
+            .where(TaskJob.id == job.id, TaskJob.attempts == job.attempts)
+            .values(status="queued", heartbeat_at=None)
+            .execution_options(synchronize_session=False)
+        )
@@ -1,25 +1,108 @@
-from typing import Optional, List
+import asyncio
+import csv
+import io
+from collections import defaultdict
+from contextlib import suppress
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, Optional, List, Set
+from uuid import UUID, uuid4
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import or_
+from sqlalchemy import (
+    DateTime,
+    Float,
+    Row,
+    Select,
+    any_,
+    bindparam,
+    column,
+    delete,
+    func,
+    insert,
+    literal,
+    or_,
+    table,
+    true,
+    tuple_,
+    union_all,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID, insert as pg_insert
 
+from app.core.mixins import change_horizon
 from app.models.task import Task
-from app.schemas.task import TaskCreate, TaskUpdate
-from app.repositories.base_repository import AsyncRepository
+from app.models.task_summary import TaskSummary
+from app.schemas.task import TaskCreate, TaskImport, TaskUpdate
+from app.repositories.base_repository import TenantRepository
+from app.utils.pagination import InvalidCursor
 
+# Selected as plain rows for list and export responses: no ORM identity map,
+# serialized straight to JSON (see app.schemas.task.TaskRow)
+TASK_COLUMNS = (
+    Task.title,
+    Task.description,
+    Task.priority,
+    Task.done,
+    Task.due_date,
+    Task.category,
+    Task.id,
+    Task.version,
+    Task.updated_at,
+)
 
-class TaskRepository(AsyncRepository[Task]):
-    def __init__(self, session: AsyncSession):
-        super().__init__(Task, session)
+# sort -> (column, descending). Task.id is always appended as a tie-breaker
+# so every row has a unique position for keyset pagination.
+SORT_KEYS = {
+    "priority_asc": (Task.priority, False),
+    "priority_desc": (Task.priority, True),
+    "due_date_asc": (Task.due_date, False),
+    "due_date_desc": (Task.due_date, True),
+}
+# Ranked by search match quality, best first
+RELEVANCE_SORT = "relevance"
 
-    async def get_tasks(
+# Written by import_batch in this order; version and updated_at take their
+# column defaults
+IMPORT_COLUMNS = (
+    "id",
+    "tenant_id",
+    "title",
+    "description",
+    "priority",
+    "done",
+    "due_date",
+    "category",
+)
+# COPY output chunks buffered ahead of a slow export client
+COPY_BUFFER_CHUNKS = 16
+# Imports are copied here first, so taken ids can be skipped row by row
+IMPORT_STAGING_TABLE = "task_import"
+# Held while an import batch checks and inserts its ids
+IMPORT_LOCK_KEY = 0x7461736B
+
+
+class TaskRepository(TenantRepository[Task]):
+    def __init__(self, session: AsyncSession, tenant_id: str):
+        super().__init__(Task, session, tenant_id)
+
+    def search_rank(self, search: Optional[str]):
+        if search and self.dialect_name == "postgresql":
+            # pg_trgm: how well the term matches any word run in the text
+            return func.greatest(
+                func.word_similarity(search, Task.title),
+                func.word_similarity(search, func.coalesce(Task.description, "")),
+            )
+        # Other backends can't rank, so every match scores the same
+        return literal(0.0, Float)
+
+    def filter(
         self,
+        query: Select,
         search: Optional[str] = None,
         status: Optional[str] = None,
-        sort: Optional[str] = None,
         category: Optional[str] = None,
-    ) -> List[Task]:
-        query = select(Task)
+    ) -> Select:
+        query = self.scoped(query)
 
         # Search by title or description
         if search:
@@ -31,52 +114,508 @@ class TaskRepository(AsyncRepository[Task]):
             )
 
         # Filter by status
+        # (plain boolean predicates match the partial "NOT done" indexes)
         if status == "done":
-            query = query.where(Task.done.is_(True))
+            query = query.where(Task.done)
         elif status == "undone":
-            query = query.where(Task.done.is_(False))
+            query = query.where(~Task.done)
 
         # Filter by category
         if category:
             query = query.where(Task.category == category)
 
+        return query
+
+    def build_query(
+        self,
+        search: Optional[str] = None,
+        status: Optional[str] = None,
+        sort: Optional[str] = None,
+        category: Optional[str] = None,
+        after: Optional[List[Any]] = None,
+    ) -> Select:
+        query = self.filter(select(*TASK_COLUMNS), search, status, category)
+
         # Sorting
-        if sort == "priority_asc":
-            query = query.order_by(Task.priority.asc())
-        elif sort == "priority_desc":
-            query = query.order_by(Task.priority.desc())
-        elif sort == "due_date_asc":
-            query = query.order_by(Task.due_date.asc())
-        elif sort == "due_date_desc":
-            query = query.order_by(Task.due_date.desc())
+        if sort == RELEVANCE_SORT:
+            column, descending = self.search_rank(search), True
+            # Extra key for page_key; TaskRow serialization drops it
+            query = query.add_columns(column.label("search_rank"))
+        else:
+            column, descending = SORT_KEYS.get(sort, (None, False))
+        keys = [Task.id] if column is None else [column, Task.id]
+
+        # Keyset: continue strictly after the last row of the previous page
+        if after is not None:
+            boundary = tuple_(*keys)
+            query = query.where(
+                boundary < tuple_(*after) if descending else boundary > tuple_(*after)
+            )
+
+        return query.order_by(
+            *(key.desc() if descending else key.asc() for key in keys)
+        )
+
+    async def get_tasks(
+        self,
+        search: Optional[str] = None,
+        status: Optional[str] = None,
+        sort: Optional[str] = None,
+        category: Optional[str] = None,
+        limit: Optional[int] = None,
+        after: Optional[List[Any]] = None,
+    ) -> List[Row]:
+        query = self.build_query(search, status, sort, category, after)
+        if limit is not None:
+            query = query.limit(limit)
 
         result = await self.session.execute(query)
-        return result.scalars().all()
+        return result.all()
+
+    @staticmethod
+    def top_order(sort: str) -> List[Any]:
+        column, descending = SORT_KEYS[sort]
+        return [key.desc() if descending else key.asc() for key in (column, Task.id)]
+
+    async def get_top_per_category(
+        self, sort: str, limit: int, status: Optional[str] = None
+    ) -> List[Row]:
+        """The first `limit` tasks of every category, grouped by category."""
+        if self.dialect_name == "postgresql":
+            ranked = self._top_per_category_lateral(sort, limit, status)
+        else:
+            ranked = self._top_per_category_window(sort, limit, status)
+        column, descending = SORT_KEYS[sort]
+        keys = (ranked.c[column.key], ranked.c.id)
+        query = select(
+            *(ranked.c[task_column.key] for task_column in TASK_COLUMNS)
+        ).order_by(
+            ranked.c.category.asc().nulls_last(),
+            *(key.desc() if descending else key.asc() for key in keys),
+        )
+        result = await self.session.execute(query)
+        return result.all()
+
+    def _top_per_category_window(self, sort: str, limit: int, status: Optional[str]):
+        rank = (
+            func.row_number()
+            .over(partition_by=Task.category, order_by=self.top_order(sort))
+            .label("rank")
+        )
+        numbered = self.filter(select(*TASK_COLUMNS, rank), status=status).subquery()
+        return select(numbered).where(numbered.c.rank <= limit).subquery("ranked")
 
-    async def get_by_id(self, task_id: int) -> Optional[Task]:
-        result = await self.session.execute(select(Task).where(Task.id == task_id))
+    def _top_per_category_lateral(self, sort: str, limit: int, status: Optional[str]):
+        # Categories come from the trigger-maintained summary, then each one
+        # reads only its first rows off the (tenant, category, key, id) index
+        categories = select(TaskSummary.category).where(
+            TaskSummary.tenant_id == self.tenant_id,
+            TaskSummary.count > 0,
+        )
+        if status in ("done", "undone"):
+            categories = categories.where(TaskSummary.done == (status == "done"))
+        categories = categories.distinct().subquery("categories")
+
+        def first(query: Select) -> Select:
+            return (
+                self.filter(query, status=status)
+                .order_by(*self.top_order(sort))
+                .limit(limit)
+            )
+
+        per_category = (
+            first(select(*TASK_COLUMNS).where(Task.category == categories.c.category))
+            .subquery()
+            .lateral("top")
+        )
+        # The summary folds NULL into '', so '' only finds literal '' tasks
+        # (as in the window's partitions) and IS NULL gets its own scan
+        uncategorized = first(
+            select(*TASK_COLUMNS).where(Task.category.is_(None))
+        ).subquery()
+        return union_all(
+            select(per_category).select_from(categories.join(per_category, true())),
+            select(uncategorized),
+        ).subquery("ranked")
+
+    async def get_version(self, task_id: UUID) -> Optional[int]:
+        result = await self.session.execute(
+            self.scoped(select(Task.version).where(Task.id == task_id))
+        )
         return result.scalar_one_or_none()
 
+    async def get_change_horizon(self) -> int:
+        return await self.session.scalar(select(change_horizon()))
+
+    async def get_changed(self, after: Optional[List[Any]], limit: int) -> List[Task]:
+        # Only writes whose transaction has finished: none can commit behind
+        # the position handed out
+        query = self.scoped(select(Task).where(Task.change_xid < change_horizon()))
+        if after is not None:
+            query = query.where(tuple_(Task.change_xid, Task.id) > tuple_(*after))
+        query = query.order_by(Task.change_xid, Task.id).limit(limit)
+        result = await self.session.execute(query)
+        return result.scalars().all()
+
+    async def stream_tasks(
+        self,
+        search: Optional[str] = None,
+        status: Optional[str] = None,
+        sort: Optional[str] = None,
+        category: Optional[str] = None,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[Row]:
+        # Server-side cursor: rows are fetched batch_size at a time
+        query = self.build_query(search, status, sort, category)
+        result = await self.session.stream(
+            query.execution_options(yield_per=batch_size)
+        )
+        async for row in result:
+            yield row
+
+    @staticmethod
+    def page_key(task: Row, sort: Optional[str]) -> List[Any]:
+        if sort == RELEVANCE_SORT:
+            return [task.search_rank, task.id]
+        column, _ = SORT_KEYS.get(sort, (None, False))
+        if column is None:
+            return [task.id]
+        return [getattr(task, column.key), task.id]
+
+    @staticmethod
+    def parse_page_key(values: List[Any], sort: Optional[str]) -> List[Any]:
+        if sort == RELEVANCE_SORT:
+            key_type = float
+        else:
+            column, _ = SORT_KEYS.get(sort, (None, False))
+            key_type = None if column is None else column.type.python_type
+        expected = 1 if key_type is None else 2
+        if len(values) != expected:
+            raise InvalidCursor("Cursor does not match the requested sort")
+        try:
+            *key, task_id = values
+            if key_type is datetime:
+                key = [datetime.fromisoformat(key[0])]
+            elif key_type is not None:
+                key = [key_type(key[0])]
+            return [*key, UUID(task_id)]
+        except (TypeError, ValueError) as e:
+            raise InvalidCursor("Malformed cursor") from e
+
+    def id_in(self, ids: List[UUID]):
+        if self.dialect_name == "postgresql":
+            # One array parameter instead of an IN list keeps a single
+            # prepared statement for every batch size
+            return Task.id == any_(
+                bindparam("ids", ids, type_=ARRAY(PG_UUID(as_uuid=True)))
+            )
+        return Task.id.in_(ids)
+
+    async def get_many(self, ids: List[UUID]) -> List[Task]:
+        query = self.scoped(select(Task).where(self.id_in(ids))).execution_options(
+            populate_existing=True
+        )
+        result = await self.session.execute(query)
+        return result.scalars().all()
+
+    async def bulk_create(self, items: List[TaskCreate]) -> List[Task]:
+        if not items:
+            return []
+        now = datetime.now(timezone.utc)
+        rows = [_task_row(item, self.tenant_id, now) for item in items]
+        # executemany, batched into multi-row INSERTs; rows come back in order
+        query = insert(Task).returning(Task, sort_by_parameter_order=True)
+        result = await self.session.scalars(query, rows)
+        return result.all()
+
+    async def import_batch(self, items: List[TaskImport]) -> List[int]:
+        """Inserts without returning rows: COPY on Postgres, one executemany
+        INSERT elsewhere. Memory stays bounded by the batch.
+
+        Ids are unique across tenants, so an item whose id is taken, or
+        repeats an earlier item's, is skipped; their positions are returned.
+        """
+        if not items:
+            return []
+        now = datetime.now(timezone.utc)
+        records = [
+            tuple(_task_row(item, self.tenant_id, now)[name] for name in IMPORT_COLUMNS)
+            for item in items
+        ]
+        first: Dict[UUID, tuple] = {}
+        for record in records:
+            first.setdefault(record[0], record)
+        if self.dialect_name == "postgresql":
+            written = await self._copy_new(list(first.values()))
+        else:
+            written = await self._insert_new(list(first.values()))
+        return [
+            position
+            for position, record in enumerate(records)
+            if record[0] not in written or first[record[0]] is not record
+        ]
+
+    async def _copy_new(self, records: List[tuple]) -> Set[UUID]:
+        # Also begins the session's transaction, which the staging table and
+        # the lock last for. Without it, imports into two tenants could both
+        # pass the check when the primary key is (tenant_id, id)
+        await self.session.execute(select(func.pg_advisory_xact_lock(IMPORT_LOCK_KEY)))
+        raw = await self._driver_connection()
+        await raw.execute(
+            f"CREATE TEMP TABLE {IMPORT_STAGING_TABLE} ON COMMIT DROP AS "
+            f"SELECT {', '.join(IMPORT_COLUMNS)} FROM {Task.__tablename__} "
+            "WITH NO DATA"
+        )
+        await raw.copy_records_to_table(
+            IMPORT_STAGING_TABLE, records=records, columns=IMPORT_COLUMNS
+        )
+        staged = table(IMPORT_STAGING_TABLE, *map(column, IMPORT_COLUMNS))
+        # Not scoped: the id may be taken by any tenant
+        taken = select(Task.id).where(Task.id == staged.c.id).exists()
+        query = (
+            pg_insert(Task)
+            .from_select(IMPORT_COLUMNS, select(staged).where(~taken))
+            .on_conflict_do_nothing()
+            .returning(Task.id)
+        )
+        written = set((await self.session.execute(query)).scalars())
+        # Free the name for a further batch in the same transaction
+        await raw.execute(f"DROP TABLE {IMPORT_STAGING_TABLE}")
+        return written
+
+    async def _insert_new(self, records: List[tuple]) -> Set[UUID]:
+        ids = [record[0] for record in records]
+        # Not scoped: the id may be taken by any tenant
+        taken = set(await self.session.scalars(select(Task.id).where(Task.id.in_(ids))))
+        new = [record for record in records if record[0] not in taken]
+        if new:
+            await self.session.execute(
+                insert(Task), [dict(zip(IMPORT_COLUMNS, row)) for row in new]
+            )
+        return {record[0] for record in new}
+
+    async def export_csv(
+        self,
+        search: Optional[str] = None,
+        status: Optional[str] = None,
+        sort: Optional[str] = None,
+        category: Optional[str] = None,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[bytes]:
+        """CSV with a header row, readable by app.utils.records.read_csv.
+
+        Postgres encodes it server-side with COPY ... TO STDOUT; elsewhere
+        rows are streamed and encoded here, batch_size rows per chunk.
+        """
+        query = self.build_query(search, status, sort, category)
+        if self.dialect_name == "postgresql":
+            async for chunk in self._copy_out(query):
+                yield chunk
+            return
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        writer.writerow(column.key for column in TASK_COLUMNS)
+        result = await self.session.stream(
+            query.execution_options(yield_per=batch_size)
+        )
+        async for rows in result.partitions():
+            for row in rows:
+                writer.writerow(_csv_value(value) for value in row[: len(TASK_COLUMNS)])
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode()
+
+    async def _driver_connection(self):
+        connection = await self.session.connection()
+        return (await connection.get_raw_connection()).driver_connection
+
+    async def _copy_out(self, query: Select) -> AsyncIterator[bytes]:
+        # Timestamps as ISO 8601, which read_csv's validation parses back
+        columns = [
+            func.to_char(
+                column.op("AT TIME ZONE")("UTC"), 'YYYY-MM-DD"T"HH24:MI:SS.US"Z"'
+            ).label(column.key)
+            if isinstance(column.type, DateTime)
+            else column
+            for column in TASK_COLUMNS
+        ]
+        compiled = query.with_only_columns(*columns).compile(
+            dialect=self.session.bind.dialect
+        )
+        args = [compiled.params[name] for name in compiled.positiontup]
+        raw = await self._driver_connection()
+
+        # COPY pushes chunks into a callback; a bounded queue turns that into
+        # an iterator that holds COPY back while the client catches up
+        queue: asyncio.Queue = asyncio.Queue(maxsize=COPY_BUFFER_CHUNKS)
+        copy = asyncio.create_task(
+            raw.copy_from_query(
+                str(compiled), *args, output=queue.put, format="csv", header=True
+            )
+        )
+        try:
+            while True:
+                get = asyncio.ensure_future(queue.get())
+                await asyncio.wait({get, copy}, return_when=asyncio.FIRST_COMPLETED)
+                if not get.done():
+                    get.cancel()
+                    break
+                yield get.result()
+            copy.result()
+            while not queue.empty():
+                yield queue.get_nowait()
+        finally:
+            if not copy.done():
+                copy.cancel()
+                with suppress(asyncio.CancelledError):
+                    await copy
+
+    async def bulk_update(self, items: List[Dict[str, Any]]) -> List[Task]:
+        # Rows changing the same set of columns share one executemany UPDATE
+        groups = defaultdict(list)
+        for item in items:
+            fields = tuple(sorted(key for key in item if key != "id"))
+            groups[fields].append(item)
+
+        table = Task.__table__
+        for fields, group in groups.items():
+            if not fields:
+                continue
+            stmt = (
+                update(table)
+                .where(table.c.id == bindparam("b_id"))
+                .where(table.c.tenant_id == self.tenant_id)
+                .values({field: bindparam(f"b_{field}") for field in fields})
+            )
+            params = [
+                {f"b_{key}": value for key, value in item.items()} for item in group
+            ]
+            await self.session.execute(stmt, params)
+
+        return await self.get_many([item["id"] for item in items])
+
+    async def bulk_delete(self, ids: List[UUID]) -> List[UUID]:
+        stmt = (
+            self.scoped(delete(Task).where(self.id_in(ids)))
+            .returning(Task.id)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.execute(stmt)
+        return result.scalars().all()
+
+    def _batch(
+        self, limit: int, status: Optional[str], category: Optional[str], *where
+    ):
+        # Ids of the next `limit` matching tasks, for chunked UPDATE/DELETE:
+        # each chunk is a short transaction instead of one over every row
+        return (
+            self.filter(select(Task.id), status=status, category=category)
+            .where(*where)
+            .order_by(Task.id)
+            .limit(limit)
+        )
+
+    async def count(
+        self, *where, status: Optional[str] = None, category: Optional[str] = None
+    ) -> int:
+        query = self.filter(
+            select(func.count()), status=status, category=category
+        ).where(*where)
+        return (await self.session.execute(query)).scalar_one()
+
+    async def reprioritize_batch(
+        self,
+        priority: int,
+        limit: int,
+        status: Optional[str] = None,
+        category: Optional[str] = None,
+    ) -> List[UUID]:
+        """Sets `priority` on up to `limit` tasks that don't have it yet."""
+        batch = self._batch(limit, status, category, Task.priority != priority)
+        stmt = (
+            self.scoped(update(Task).where(Task.id.in_(batch.scalar_subquery())))
+            .values(priority=priority)
+            .returning(Task.id)
+            .execution_options(synchronize_session=False)
+        )
+        return (await self.session.execute(stmt)).scalars().all()
+
+    async def purge_done_batch(
+        self, limit: int, category: Optional[str] = None
+    ) -> List[UUID]:
+        batch = self._batch(limit, "done", category)
+        stmt = (
+            self.scoped(delete(Task).where(Task.id.in_(batch.scalar_subquery())))
+            .returning(Task.id)
+            .execution_options(synchronize_session=False)
+        )
+        return (await self.session.execute(stmt)).scalars().all()
+
     async def create_task(self, task_data: TaskCreate) -> Task:
-        task = Task(**task_data.model_dump())
+        task = Task(**task_data.model_dump(), tenant_id=self.tenant_id)
         self.session.add(task)
         return task
 
-    async def update_task(self, task: Task, updates: TaskUpdate) -> Task:
-        for key, value in updates.model_dump(exclude_unset=True).items():
-            setattr(task, key, value)
-        self.session.add(task)
-        return task
+    async def update_fields(
+        self, task_id: UUID, values: Dict[str, Any]
+    ) -> Optional[Task]:
+        # Single round trip: UPDATE ... RETURNING, no SELECT beforehand
+        stmt = (
+            self.scoped(update(Task).where(Task.id == task_id))
+            .values(**values)
+            .returning(Task)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+        result = await self.session.execute(stmt)
+        return result.scalar_one_or_none()
 
-    async def delete_task(self, task: Task) -> None:
-        await self.session.delete(task)
+    async def update_task(self, task_id: UUID, updates: TaskUpdate) -> Optional[Task]:
+        values = updates.model_dump(exclude_unset=True)
+        if not values:
+            return await self.get_by_id(task_id)
+        return await self.update_fields(task_id, values)
 
-    async def mark_done(self, task: Task, done: bool = True) -> Task:
-        task.done = done
-        self.session.add(task)
-        return task
+    async def delete_task(self, task_id: UUID) -> bool:
+        stmt = (
+            self.scoped(delete(Task).where(Task.id == task_id))
+            .returning(Task.id)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.execute(stmt)
+        return result.scalar_one_or_none() is not None
 
-    async def update_priority(self, task: Task, priority: int) -> Task:
-        task.priority = priority
-        self.session.add(task)
-        return task
+    async def mark_done(self, task_id: UUID, done: bool = True) -> Optional[Task]:
+        return await self.update_fields(task_id, {"done": done})
+
+    async def update_priority(self, task_id: UUID, priority: int) -> Optional[Task]:
+        return await self.update_fields(task_id, {"priority": priority})
+
+
+def _task_row(item: TaskCreate, tenant_id: str, now: datetime) -> Dict[str, Any]:
+    """Every IMPORT_COLUMNS value of a new task, the model's defaults filled
+    in: a multi-row INSERT takes its columns from the first row, so all rows
+    need the same keys."""
+    return {
+        "id": getattr(item, "id", None) or uuid4(),
+        "tenant_id": tenant_id,
+        "title": item.title,
+        "description": item.description,
+        "priority": 5 if item.priority is None else item.priority,
+        "done": bool(item.done),
+        "due_date": item.due_date or now,
+        "category": item.category,
+    }
+
+
+def _csv_value(value: Any) -> Any:
+    # Same text as Postgres' COPY ... CSV for the same row
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+    return value
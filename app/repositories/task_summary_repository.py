@@ -0,0 +1,51 @@
+from datetime import datetime
+from typing import List, Tuple
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.models.task import Task
+from app.models.task_summary import TaskSummary
+from app.repositories.base_repository import TenantRepository
+
+
+class TaskSummaryRepository(TenantRepository[TaskSummary]):
+    def __init__(self, session: AsyncSession, tenant_id: str):
+        super().__init__(TaskSummary, session, tenant_id)
+
+    async def get_counts(self) -> List[Tuple[str, bool, int, int]]:
+        """(category, done, priority, count) rows, '' for no category."""
+        if self.dialect_name == "postgresql":
+            # A few rows per category, kept current by triggers
+            query = self.scoped(
+                select(
+                    TaskSummary.category,
+                    TaskSummary.done,
+                    TaskSummary.priority,
+                    TaskSummary.count,
+                ).where(TaskSummary.count > 0)
+            )
+        else:
+            # No triggers elsewhere: aggregate the tasks table itself
+            category = func.coalesce(Task.category, "")
+            query = (
+                select(category, Task.done, Task.priority, func.count())
+                .where(Task.tenant_id == self.tenant_id)
+                .group_by(category, Task.done, Task.priority)
+            )
+        result = await self.session.execute(query)
+        return [tuple(row) for row in result]
+
+    def build_overdue_query(self, now: datetime):
+        # Depends on the clock, so it can't be a counter. Reads only overdue
+        # open tasks: a range of the (tenant_id, done, due_date) index
+        category = func.coalesce(Task.category, "")
+        return (
+            select(category, func.count())
+            .where(Task.tenant_id == self.tenant_id, ~Task.done, Task.due_date < now)
+            .group_by(category)
+        )
+
+    async def get_overdue(self, now: datetime) -> List[Tuple[str, int]]:
+        result = await self.session.execute(self.build_overdue_query(now))
+        return [tuple(row) for row in result]
@@ -0,0 +1,57 @@
+from datetime import datetime, timezone
+from typing import Any, List, Optional
+from uuid import UUID
+from sqlalchemy import tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.core.mixins import change_horizon, current_change_xid
+from app.models.task_tombstone import TaskTombstone
+from app.repositories.base_repository import TenantRepository
+
+
+class TaskTombstoneRepository(TenantRepository[TaskTombstone]):
+    def __init__(self, session: AsyncSession, tenant_id: str):
+        super().__init__(TaskTombstone, session, tenant_id)
+
+    async def record(self, ids: List[UUID]) -> None:
+        if not ids:
+            return
+        deleted_at = datetime.now(timezone.utc)
+        dialect = postgresql if self.dialect_name == "postgresql" else sqlite
+        statement = dialect.insert(TaskTombstone).values(
+            [
+                {"id": task_id, "tenant_id": self.tenant_id, "deleted_at": deleted_at}
+                for task_id in ids
+            ]
+        )
+        # An imported task can reuse a deleted id: deleting it again only
+        # moves its tombstone forward
+        await self.session.execute(
+            statement.on_conflict_do_update(
+                index_elements=[TaskTombstone.id],
+                set_={
+                    "deleted_at": statement.excluded.deleted_at,
+                    "tenant_id": statement.excluded.tenant_id,
+                    # onupdate doesn't apply to ON CONFLICT DO UPDATE
+                    "change_xid": current_change_xid(),
+                },
+            )
+        )
+
+    async def get_since(
+        self, after: Optional[List[Any]], limit: int
+    ) -> List[TaskTombstone]:
+        # Only deletions whose transaction has finished: none can commit
+        # behind the position handed out
+        query = self.scoped(
+            select(TaskTombstone).where(TaskTombstone.change_xid < change_horizon())
+        )
+        if after is not None:
+            query = query.where(
+                tuple_(TaskTombstone.change_xid, TaskTombstone.id) > tuple_(*after)
+            )
+        query = query.order_by(TaskTombstone.change_xid, TaskTombstone.id).limit(limit)
+        result = await self.session.execute(query)
+        return result.scalars().all()
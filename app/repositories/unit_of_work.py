@@ -1,25 +1,77 @@
-from typing import AsyncContextManager, Dict, Type
+from typing import AsyncContextManager, Dict, List, Optional, Type
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.events import InMemoryBroker
+from app.db.db import SessionFactory
+
 
 class UnitOfWork(AsyncContextManager):
-    def __init__(self, session: AsyncSession, repos: Dict[str, Type]):
-        self.session = session
-        self._repos: Dict[str, Type] = {}
-        for name, repo_class in repos.items():
-            self._repos[name] = repo_class(session)
+    """One session per `async with` block, opened on entry, closed on exit.
+
+    Repositories are built on first access within a block. Writes commit on
+    a clean exit; blocks entered through read() never commit.
+    """
+
+    def __init__(
+        self,
+        session_factory: SessionFactory,
+        repos: Dict[str, Type],
+        events: Optional[InMemoryBroker] = None,
+        **repo_kwargs,
+    ):
+        self.session_factory = session_factory
+        self.session: Optional[AsyncSession] = None
+        self.events = events
+        self._pending_events: List[dict] = []
+        self._repo_classes = repos
+        # repo_kwargs (e.g. tenant_id) are passed to every repository
+        self._repo_kwargs = repo_kwargs
+        self._read_only = False
+        self._snapshot = False
 
     def __getattr__(self, item):
-        if item in self._repos:
-            return self._repos[item]
-        raise AttributeError(f"Repository {item} not found in this UnitOfWork")
+        # Only reached for repositories not built yet in this block
+        repo_class = self.__dict__.get("_repo_classes", {}).get(item)
+        if repo_class is None:
+            raise AttributeError(f"Repository {item} not found in this UnitOfWork")
+        if self.session is None:
+            raise RuntimeError(f"Repository {item} used outside of its UnitOfWork")
+        repo = self.__dict__[item] = repo_class(self.session, **self._repo_kwargs)
+        return repo
+
+    def read(self, snapshot: bool = False) -> "UnitOfWork":
+        """Read-only block. Statements autocommit unless `snapshot` is set,
+        which keeps one transaction (server-side cursors need it)."""
+        self._read_only, self._snapshot = True, snapshot
+        return self
+
+    def publish(self, events: List[dict]):
+        """Queues events that are sent only if this unit of work commits."""
+        if self.events:
+            self._pending_events.extend(events)
 
     async def __aenter__(self):
+        # Reads run each statement on its own, without BEGIN/COMMIT round trips
+        self.session = await self.session_factory(
+            autocommit=self._read_only and not self._snapshot
+        )
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if exc_type:
-            await self.session.rollback()
-        else:
-            await self.session.commit()
-        await self.session.close()
+        events, self._pending_events = self._pending_events, []
+        try:
+            if exc_type:
+                await self.session.rollback()
+            elif not self._read_only:
+                if events:
+                    await self.events.before_commit(self.session, events)
+                await self.session.commit()
+                if events:
+                    self.events.after_commit(events)
+        finally:
+            # A snapshot read's transaction ends here, on close
+            await self.session.close()
+            self.session = None
+            self._read_only = self._snapshot = False
+            for name in self._repo_classes:
+                self.__dict__.pop(name, None)
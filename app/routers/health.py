@@ -1,13 +1,20 @@
+from typing import Optional
 from fastapi import APIRouter, status, Depends, HTTPException
-from app.schemas.health import HealthCheckResponse
+from app.schemas.health import (
+    CacheStatsResponse,
+    HealthCheckResponse,
+    PoolStatsResponse,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.utils.health_checks import check_postgres
 from app.db import db
 from app.core.logger import AppLogger
+from app.core.metrics import TimedRoute
+from app.services.task_cache import TaskCache, get_task_cache
 
 logger = AppLogger().get_logger()
 
-router = APIRouter(prefix="/healthcheck")
+router = APIRouter(prefix="/healthcheck", route_class=TimedRoute)
 
 
 @router.get(
@@ -33,3 +40,15 @@ async def postgres_health_check(session: AsyncSession = Depends(db.get_session))
     raise HTTPException(
         status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Postgres unavailable"
     )
+
+
+@router.get("/db/pool", response_model=PoolStatsResponse)
+def postgres_pool_stats():
+    return PoolStatsResponse(**db.get_pool_stats())
+
+
+@router.get("/cache", response_model=CacheStatsResponse)
+def cache_stats(cache: Optional[TaskCache] = Depends(get_task_cache)):
+    if cache is None:
+        return CacheStatsResponse(enabled=False)
+    return CacheStatsResponse(**cache.stats())
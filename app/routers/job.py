@@ -0,0 +1,52 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from typing import List, Optional
+from uuid import UUID
+
+from app.core.config import settings
+from app.core.metrics import TimedRoute
+from app.core.tenancy import get_tenant_id
+from app.db.db import SessionFactory, get_session_factory
+from app.schemas.task_job import TaskJobCreate, TaskJobOut
+from app.services.job_worker import JobWorkerPool
+from app.services.task_job_service import TaskJobService
+from app.services.task_jobs import get_task_jobs
+
+router = APIRouter(prefix="/jobs", route_class=TimedRoute)
+
+
+def get_job_service(
+    session_factory: SessionFactory = Depends(get_session_factory),
+    tenant_id: str = Depends(get_tenant_id),
+    workers: Optional[JobWorkerPool] = Depends(get_task_jobs),
+):
+    return TaskJobService(session_factory, tenant_id, workers)
+
+
+@router.post("/", response_model=TaskJobOut, status_code=status.HTTP_202_ACCEPTED)
+async def submit_job(
+    data: TaskJobCreate,
+    response: Response,
+    service: TaskJobService = Depends(get_job_service),
+):
+    # Runs in the background; poll the Location for status and progress
+    job = await service.submit(data)
+    response.headers["Location"] = f"{router.prefix}/{job.id}"
+    return job
+
+
+@router.get("/", response_model=List[TaskJobOut])
+async def list_jobs(
+    limit: int = Query(settings.page_size_default, ge=1, le=settings.page_size_max),
+    service: TaskJobService = Depends(get_job_service),
+):
+    return await service.list_jobs(limit)
+
+
+@router.get("/{job_id}", response_model=TaskJobOut)
+async def get_job(job_id: UUID, service: TaskJobService = Depends(get_job_service)):
+    job = await service.get_job(job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Job not found"
+        )
+    return job
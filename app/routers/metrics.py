@@ -0,0 +1,112 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.core.metrics import CallbackMetric, registry
+from app.db import db
+from app.services.task_cache import get_task_cache
+from app.services.task_events import get_task_events
+from app.services.task_jobs import get_task_jobs
+from app.services.task_flights import get_task_flights
+from app.services.task_writes import get_task_writes
+
+router = APIRouter()
+
+
+def _cache_lookups() -> dict:
+    cache = get_task_cache()
+    if cache is None:
+        return {}
+    return {"hit": cache.hits, "miss": cache.misses}
+
+
+registry.register(
+    CallbackMetric(
+        "db_pool_connections",
+        "Primary pool connections by state",
+        lambda: {
+            key: value
+            for key, value in db.get_pool_stats().items()
+            if key in ("size", "checked_in", "checked_out", "overflow")
+        },
+    )
+)
+registry.register(
+    CallbackMetric(
+        "db_pool_wait_seconds_total",
+        "Time spent waiting for a pooled connection",
+        lambda: {"primary": db.get_pool_stats()["wait_seconds_total"]},
+        type="counter",
+        label="pool",
+    )
+)
+registry.register(
+    CallbackMetric(
+        "task_cache_lookups_total",
+        "Task cache lookups by result",
+        _cache_lookups,
+        type="counter",
+        label="result",
+    )
+)
+registry.register(
+    CallbackMetric(
+        "task_reads_total",
+        "Task reads that ran a query (leader) or shared one in flight (coalesced)",
+        lambda: get_task_flights().stats() if get_task_flights() else {},
+        type="counter",
+        label="role",
+    )
+)
+registry.register(
+    CallbackMetric(
+        "task_write_behind_total",
+        "Queued done/priority updates, distinct rows written and batch commits",
+        lambda: get_task_writes().stats() if get_task_writes() else {},
+        type="counter",
+        label="kind",
+    )
+)
+
+registry.register(
+    CallbackMetric(
+        "task_event_subscribers",
+        "Open /tasks/events streams on this worker",
+        lambda: (
+            {"open": get_task_events().broadcaster.stats()["subscribers"]}
+            if get_task_events()
+            else {}
+        ),
+        label="state",
+    )
+)
+registry.register(
+    CallbackMetric(
+        "task_events_total",
+        "Task events received, queued for subscribers and dropped for slow ones",
+        lambda: (
+            {
+                key: value
+                for key, value in get_task_events().broadcaster.stats().items()
+                if key != "subscribers"
+            }
+            if get_task_events()
+            else {}
+        ),
+        type="counter",
+    )
+)
+
+registry.register(
+    CallbackMetric(
+        "task_jobs_total",
+        "Background jobs claimed by this worker, and how they ended",
+        lambda: get_task_jobs().stats() if get_task_jobs() else {},
+        type="counter",
+        label="result",
+    )
+)
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
@@ -1,43 +1,267 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List, Optional
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import (
+    APIRouter,
+    Body,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from fastapi.responses import StreamingResponse
+from typing import Any, Dict, List, Optional
 from uuid import UUID
 
-from app.db.db import get_session
+from app.core.config import settings
+from app.core.events import InMemoryBroker, format_sse
+from app.core.metrics import TimedRoute
+from app.core.singleflight import SingleFlight
+from app.core.tenancy import get_tenant_id
+from app.db.db import (
+    READ_YOUR_WRITES_HEADER,
+    SessionFactory,
+    get_read_session_factory,
+    get_session_factory,
+)
 from app.schemas.task import (
     TaskCreate,
     TaskUpdate,
     TaskOut,
+    TaskList,
+    TaskChanges,
+    TaskStats,
+    TaskTop,
     TaskMarkDone,
     TaskPriorityUpdate,
+    TaskBulkDelete,
+    TaskBulkResult,
+    TaskImportResult,
 )
+from app.services.task_cache import TaskCache, get_task_cache
+from app.services.task_events import get_task_events
+from app.services.task_flights import get_task_flights
+from app.services.task_writes import get_task_writes
+from app.services.write_behind import WriteBehindQueue
 from app.services.task_service import TaskService
+from app.utils.etag import body_etag, etag_matches
+from app.utils.pagination import InvalidCursor
+from app.utils.records import read_csv, read_ndjson
 
-router = APIRouter(prefix="/tasks")
+router = APIRouter(prefix="/tasks", route_class=TimedRoute)
 
 
-def get_service(session: AsyncSession = Depends(get_session)):
-    return TaskService(session)
+def get_service(
+    session_factory: SessionFactory = Depends(get_session_factory),
+    tenant_id: str = Depends(get_tenant_id),
+    cache: Optional[TaskCache] = Depends(get_task_cache),
+    flights: Optional[SingleFlight] = Depends(get_task_flights),
+    writes: Optional[WriteBehindQueue] = Depends(get_task_writes),
+    events: Optional[InMemoryBroker] = Depends(get_task_events),
+):
+    return TaskService(session_factory, tenant_id, cache, flights, writes, events)
 
 
-@router.get("/", response_model=List[TaskOut])
+def get_read_service(
+    request: Request,
+    session_factory: SessionFactory = Depends(get_read_session_factory),
+    tenant_id: str = Depends(get_tenant_id),
+    cache: Optional[TaskCache] = Depends(get_task_cache),
+    flights: Optional[SingleFlight] = Depends(get_task_flights),
+):
+    # Read-only endpoints, served by a replica when one is configured
+    if READ_YOUR_WRITES_HEADER in request.headers:
+        # Straight from the primary: a lagging replica read may have cached,
+        # or be loading, a page from before the caller's own write
+        cache, flights = None, None
+    return TaskService(session_factory, tenant_id, cache, flights)
+
+
+@router.get("/", response_model=TaskList)
 async def list_tasks(
     search: Optional[str] = None,
     status_: Optional[str] = None,
     sort: Optional[str] = None,
     category: Optional[str] = None,
+    limit: int = Query(settings.page_size_default, ge=1, le=settings.page_size_max),
+    cursor: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None),
+    service: TaskService = Depends(get_read_service),
+):
+    try:
+        body = await service.list_tasks(search, status_, sort, category, limit, cursor)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    # Derived from the page itself, so it costs no query over the whole
+    # filtered set; a 304 still saves sending the body
+    etag = body_etag(body)
+    if etag_matches(if_none_match, etag):
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag}
+        )
+    # Already serialized: a Response skips response_model validation and
+    # jsonable_encoder, TaskList only documents the schema
+    return Response(body, media_type="application/json", headers={"ETag": etag})
+
+
+@router.get("/changes", response_model=TaskChanges)
+async def list_changes(
+    since: Optional[str] = None,
+    limit: int = Query(settings.page_size_default, ge=1, le=settings.page_size_max),
+    # The primary: a lagging replica's horizon could pass writes it hasn't
+    # replayed yet, and the token would then skip them
     service: TaskService = Depends(get_service),
 ):
-    return await service.list_tasks(search, status_, sort, category)
+    try:
+        return await service.list_changes(since, limit)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.get("/stats", response_model=TaskStats)
+async def task_stats(service: TaskService = Depends(get_read_service)):
+    return await service.get_stats()
+
+
+@router.get("/top", response_model=TaskTop)
+async def top_tasks(
+    sort: str = Query("due_date_asc", pattern=r"^(priority|due_date)_(asc|desc)$"),
+    limit: int = Query(10, ge=1, le=settings.top_max_items),
+    status_: Optional[str] = None,
+    category: Optional[str] = None,
+    per_category: bool = Query(
+        False,
+        description="Top `limit` tasks of every category instead of overall "
+        "(only `category`'s when that is given)",
+    ),
+    service: TaskService = Depends(get_read_service),
+):
+    body = await service.top_tasks(sort, limit, status_, category, per_category)
+    return Response(body, media_type="application/json")
+
+
+@router.get("/export")
+async def export_tasks(
+    search: Optional[str] = None,
+    status_: Optional[str] = None,
+    sort: Optional[str] = None,
+    category: Optional[str] = None,
+    format: str = Query("ndjson", pattern=r"^(ndjson|csv)$"),
+    service: TaskService = Depends(get_read_service),
+):
+    if format == "csv":
+        # Header row first; the format POST /tasks/import?format=csv reads
+        return StreamingResponse(
+            service.export_csv(search, status_, sort, category),
+            media_type="text/csv",
+        )
+
+    # One JSON object per line, written as rows arrive from the DB cursor
+    async def ndjson():
+        async for task in service.export_tasks(search, status_, sort, category):
+            yield task + b"\n"
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+
+@router.post("/import", response_model=TaskImportResult)
+async def import_tasks(
+    request: Request,
+    format: str = Query("ndjson", pattern=r"^(ndjson|csv)$"),
+    service: TaskService = Depends(get_service),
+):
+    """Imports the request body as it's received, without a size limit:
+    NDJSON (one task per line, as for POST /tasks/) or CSV with a header row,
+    as from GET /tasks/export. An `id` column keeps the exported ids."""
+    read = read_csv if format == "csv" else read_ndjson
+    return await service.import_tasks(
+        read(request.stream()), settings.import_batch_size
+    )
+
+
+@router.get("/events")
+async def task_events(
+    tenant_id: str = Depends(get_tenant_id),
+    events: Optional[InMemoryBroker] = Depends(get_task_events),
+):
+    """Server-sent events for the tenant's task changes, without a DB session.
+
+    Each event names the changed task ids; on `resync` the client missed
+    events and should refetch.
+    """
+    if events is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Task events are disabled"
+        )
+
+    async def stream():
+        # Subscribed inside the generator, so a client that leaves before
+        # the stream starts leaves no subscription behind
+        subscription = events.broadcaster.subscribe(tenant_id)
+        try:
+            yield b": subscribed\n\n"
+            while True:
+                event = await subscription.get(settings.events_heartbeat_seconds)
+                # Comments keep proxies from closing an idle stream
+                yield b": keep-alive\n\n" if event is None else format_sse(event)
+        finally:
+            events.broadcaster.unsubscribe(subscription)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# Bulk routes are declared before /{task_id} so "bulk" isn't parsed as an id.
+# Items are validated one by one so a bad item doesn't reject the batch.
+BulkItems = Body(..., min_length=1, max_length=settings.bulk_max_items)
+
+
+@router.post("/bulk", response_model=TaskBulkResult)
+async def bulk_create_tasks(
+    items: List[Dict[str, Any]] = BulkItems,
+    service: TaskService = Depends(get_service),
+):
+    return await service.bulk_create(items)
+
+
+@router.patch("/bulk", response_model=TaskBulkResult)
+async def bulk_update_tasks(
+    items: List[Dict[str, Any]] = BulkItems,
+    service: TaskService = Depends(get_service),
+):
+    return await service.bulk_update(items)
+
+
+@router.delete("/bulk", response_model=TaskBulkResult)
+async def bulk_delete_tasks(
+    data: TaskBulkDelete, service: TaskService = Depends(get_service)
+):
+    return await service.bulk_delete(data.ids)
 
 
 @router.get("/{task_id}", response_model=TaskOut)
-async def get_task(task_id: UUID, service: TaskService = Depends(get_service)):
+async def get_task(
+    task_id: UUID,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    service: TaskService = Depends(get_read_service),
+):
+    # Only the version is read when the client already holds a copy
+    if if_none_match:
+        etag = await service.task_etag(task_id)
+        if etag and etag_matches(if_none_match, etag):
+            return Response(
+                status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag}
+            )
     task = await service.get_task(task_id)
     if not task:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Task not found"
         )
+    response.headers["ETag"] = service.etag(task.id, task.version)
     return task
 
 
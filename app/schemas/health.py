@@ -5,3 +5,21 @@ class HealthCheckResponse(BaseModel):
     status_code: int = Field(..., description="HTTP status code of the response")
     detail: str = Field(..., description="Short description of the status")
     result: str = Field(..., description="Result message, e.g. 'working'")
+
+
+class PoolStatsResponse(BaseModel):
+    size: int = Field(..., description="Configured number of pooled connections")
+    checked_in: int = Field(..., description="Idle connections in the pool")
+    checked_out: int = Field(..., description="Connections currently in use")
+    overflow: int = Field(..., description="Connections opened beyond pool size")
+    checkouts: int = Field(..., description="Checkouts since the pool was created")
+    timeouts: int = Field(..., description="Checkouts that gave up waiting")
+    wait_seconds_total: float = Field(..., description="Total time spent waiting")
+    wait_seconds_max: float = Field(..., description="Longest single wait")
+
+
+class CacheStatsResponse(BaseModel):
+    enabled: bool = Field(..., description="Whether task reads are cached")
+    hits: int = Field(0, description="Reads answered from the cache")
+    misses: int = Field(0, description="Reads that went to the database")
+    hit_ratio: float = Field(0.0, description="hits / (hits + misses)")
@@ -1,8 +1,10 @@
 from datetime import datetime
-from pydantic import BaseModel, ConfigDict
-from typing import Optional, List
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, field_validator
+from typing import Optional, List, TypedDict
 from uuid import UUID
 
+from app.core.config import settings
+
 
 class TaskBase(BaseModel):
     title: str
@@ -17,6 +19,11 @@ class TaskCreate(TaskBase):
     pass
 
 
+class TaskImport(TaskCreate):
+    # Kept when moving tasks between environments, generated when missing
+    id: Optional[UUID] = None
+
+
 class TaskUpdate(BaseModel):
     title: Optional[str]
     description: Optional[str]
@@ -36,10 +43,119 @@ class TaskPriorityUpdate(BaseModel):
 
 class TaskOut(TaskBase):
     id: UUID
+    version: int = 1
+    updated_at: Optional[datetime] = None
 
     model_config = ConfigDict(from_attributes=True)
 
 
 class TaskList(BaseModel):
     tasks: List[TaskOut]
+    # Opaque keyset cursor for the following page, None on the last page
+    next_cursor: Optional[str] = None
+
+
+class TaskTop(BaseModel):
+    tasks: List[TaskOut]
+
+
+# Same JSON as TaskOut / TaskList / TaskTop, dumped from already-typed DB rows without
+# building models or validating a second time
+class TaskRow(TypedDict):
+    title: str
+    description: Optional[str]
+    priority: Optional[int]
+    done: Optional[bool]
+    due_date: Optional[datetime]
+    category: Optional[str]
+    id: UUID
+    version: int
+    updated_at: Optional[datetime]
+
+
+class TaskListRows(TypedDict):
+    tasks: List[TaskRow]
+    next_cursor: Optional[str]
+
+
+class TaskTopRows(TypedDict):
+    tasks: List[TaskRow]
+
+
+task_row_adapter = TypeAdapter(TaskRow)
+task_list_adapter = TypeAdapter(TaskListRows)
+task_top_adapter = TypeAdapter(TaskTopRows)
+
+
+class TaskCategoryStats(BaseModel):
+    category: Optional[str]
     total: int
+    done: int
+    open: int
+    overdue: int
+
+
+class TaskPriorityStats(BaseModel):
+    priority: int
+    total: int
+    open: int
+
+
+class TaskStats(BaseModel):
+    total: int
+    done: int
+    open: int
+    done_ratio: float
+    # Open tasks whose due date has passed
+    overdue: int
+    categories: List[TaskCategoryStats]
+    priorities: List[TaskPriorityStats]
+
+
+class TaskBulkUpdateItem(BaseModel):
+    id: UUID
+    title: Optional[str] = None
+    description: Optional[str] = None
+    priority: Optional[int] = None
+    done: Optional[bool] = None
+    due_date: Optional[datetime] = None
+    category: Optional[str] = None
+
+    # Omitted means unchanged; an explicit null can't be stored in these
+    @field_validator("title", "priority", "done", "due_date")
+    @classmethod
+    def not_null(cls, value):
+        if value is None:
+            raise ValueError("may not be null")
+        return value
+
+
+class TaskBulkDelete(BaseModel):
+    ids: List[UUID] = Field(..., min_length=1, max_length=settings.bulk_max_items)
+
+
+class TaskBulkError(BaseModel):
+    index: int
+    id: Optional[UUID] = None
+    detail: str
+
+
+class TaskBulkResult(BaseModel):
+    tasks: List[TaskOut] = []
+    deleted: List[UUID] = []
+    errors: List[TaskBulkError] = []
+
+
+class TaskImportResult(BaseModel):
+    created: int
+    rejected: int
+    # The first settings.import_max_reported_errors only
+    errors: List[TaskBulkError] = []
+
+
+class TaskChanges(BaseModel):
+    changed: List[TaskOut]
+    deleted: List[UUID]
+    # Pass back as ?since= to receive only what changed after this response
+    next_token: str
+    has_more: bool
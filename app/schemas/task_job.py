@@ -0,0 +1,50 @@
+from datetime import datetime
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Annotated, Any, Dict, List, Literal, Optional, Union
+from uuid import UUID
+
+from app.core.config import settings
+
+
+class ImportJob(BaseModel):
+    kind: Literal["import"]
+    # Validated against TaskCreate one chunk at a time by the worker;
+    # invalid items are reported in the job result and skipped
+    items: List[Dict[str, Any]] = Field(
+        ..., min_length=1, max_length=settings.job_import_max_items
+    )
+
+
+class ReprioritizeJob(BaseModel):
+    kind: Literal["reprioritize"]
+    priority: int
+    # None for every category
+    category: Optional[str] = None
+    status: Optional[Literal["done", "undone"]] = None
+
+
+class PurgeDoneJob(BaseModel):
+    kind: Literal["purge_done"]
+    category: Optional[str] = None
+
+
+TaskJobCreate = Annotated[
+    Union[ImportJob, ReprioritizeJob, PurgeDoneJob], Field(discriminator="kind")
+]
+
+
+class TaskJobOut(BaseModel):
+    id: UUID
+    kind: str
+    status: str
+    # Items (import) or tasks (reprioritize, purge) processed so far
+    progress: int
+    total: Optional[int] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    attempts: int
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,21 @@
+import uvicorn
+
+from app.core.config import settings
+
+
+def main():
+    # Workers are separate processes: pools, caches and metrics are per worker
+    uvicorn.run(
+        "app.main:app",
+        host=settings.host,
+        port=settings.port,
+        workers=settings.workers,
+        timeout_keep_alive=settings.keepalive_seconds,
+        timeout_graceful_shutdown=settings.graceful_shutdown_seconds,
+        proxy_headers=True,
+        access_log=settings.debug,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+import asyncio
+from typing import Awaitable, Callable, List, Optional
+from uuid import UUID
+
+from app.core.events import InMemoryBroker, task_events
+from app.core.logger import AppLogger
+from app.core.singleflight import SingleFlight
+from app.db.db import SessionFactory
+from app.models.task import Task
+from app.models.task_job import TaskJob
+from app.repositories.task_job_repository import (
+    JobLost,
+    TaskJobQueue,
+    TaskJobRepository,
+)
+from app.repositories.task_repository import TaskRepository
+from app.repositories.task_tombstone_repository import TaskTombstoneRepository
+from app.repositories.unit_of_work import UnitOfWork
+from app.services.task_cache import TaskCache
+from app.services.task_service import validate_creates
+
+logger = AppLogger().get_logger()
+
+# Import errors kept in the job result; the rest are only counted
+MAX_REPORTED_ERRORS = 100
+
+
+class TaskJobRunner:
+    """Runs a claimed job chunk by chunk.
+
+    Every chunk commits together with the job's progress, so a job that is
+    resumed after an interruption neither repeats nor skips a chunk.
+    """
+
+    def __init__(
+        self,
+        session_factory: SessionFactory,
+        chunk_size: int,
+        cache: Optional[TaskCache] = None,
+        flights: Optional[SingleFlight] = None,
+        events: Optional[InMemoryBroker] = None,
+    ):
+        self.session_factory = session_factory
+        self.chunk_size = chunk_size
+        self.cache = cache
+        self.flights = flights
+        self.events = events
+
+    def _uow(self, job: TaskJob) -> UnitOfWork:
+        return UnitOfWork(
+            self.session_factory,
+            {
+                "tasks": TaskRepository,
+                "tombstones": TaskTombstoneRepository,
+                "jobs": TaskJobRepository,
+            },
+            events=self.events,
+            tenant_id=job.tenant_id,
+        )
+
+    async def _invalidate(self, tenant_id: str):
+        if self.cache:
+            await self.cache.invalidate(tenant_id)
+        if self.flights:
+            self.flights.forget(tenant_id)
+
+    async def run(self, job: TaskJob):
+        await getattr(self, f"_run_{job.kind}")(job)
+
+    async def _run_import(self, job: TaskJob):
+        items = job.params["items"]
+        result = job.result or {"created": 0, "rejected": 0, "errors": []}
+        for start in range(job.progress, len(items), self.chunk_size):
+            chunk = items[start : start + self.chunk_size]
+            valid, errors = validate_creates(chunk, offset=start)
+            uow = self._uow(job)
+            async with uow:
+                tasks = await uow.tasks.bulk_create(valid)
+                uow.publish(
+                    task_events(job.tenant_id, "created", [task.id for task in tasks])
+                )
+                reported = result["errors"] + [
+                    error.model_dump(mode="json") for error in errors
+                ]
+                result = {
+                    "created": result["created"] + len(tasks),
+                    "rejected": result["rejected"] + len(errors),
+                    "errors": reported[:MAX_REPORTED_ERRORS],
+                }
+                await uow.jobs.save_progress(job, start + len(chunk), result=result)
+            if tasks:
+                await self._invalidate(job.tenant_id)
+
+    async def _run_reprioritize(self, job: TaskJob):
+        priority = job.params["priority"]
+        status, category = job.params.get("status"), job.params.get("category")
+
+        async def count(uow: UnitOfWork) -> int:
+            return await uow.tasks.count(
+                Task.priority != priority, status=status, category=category
+            )
+
+        async def batch(uow: UnitOfWork) -> List[UUID]:
+            return await uow.tasks.reprioritize_batch(
+                priority, self.chunk_size, status, category
+            )
+
+        await self._run_batches(job, "updated", count, batch)
+
+    async def _run_purge_done(self, job: TaskJob):
+        category = job.params.get("category")
+
+        async def count(uow: UnitOfWork) -> int:
+            return await uow.tasks.count(status="done", category=category)
+
+        async def batch(uow: UnitOfWork) -> List[UUID]:
+            ids = await uow.tasks.purge_done_batch(self.chunk_size, category)
+            # Incremental sync still has to hear about the deletions
+            await uow.tombstones.record(ids)
+            return ids
+
+        await self._run_batches(job, "deleted", count, batch)
+
+    async def _run_batches(
+        self,
+        job: TaskJob,
+        event: str,
+        count: Callable[[UnitOfWork], Awaitable[int]],
+        batch: Callable[[UnitOfWork], Awaitable[List[UUID]]],
+    ):
+        """Applies `batch` until it comes back short; it must only pick
+        tasks it hasn't changed yet."""
+        uow = self._uow(job)
+        if job.total is None:
+            async with uow:
+                total = job.progress + await count(uow)
+                await uow.jobs.save_progress(job, job.progress, total=total)
+        while True:
+            async with uow:
+                ids = await batch(uow)
+                uow.publish(task_events(job.tenant_id, event, ids))
+                await uow.jobs.save_progress(job, job.progress + len(ids))
+            if ids:
+                await self._invalidate(job.tenant_id)
+            if len(ids) < self.chunk_size:
+                return
+
+
+class JobWorkerPool:
+    """Background workers that claim and run jobs from the task_jobs table.
+
+    Each worker process has its own pool; SKIP LOCKED spreads jobs over all
+    of them. Idle workers poll every `poll_seconds`, or wake right away when
+    a job is submitted through this process.
+    """
+
+    def __init__(
+        self,
+        session_factory: SessionFactory,
+        runner: TaskJobRunner,
+        concurrency: int,
+        poll_seconds: float,
+        stale_seconds: float,
+        max_attempts: int,
+    ):
+        self.session_factory = session_factory
+        self.runner = runner
+        self.concurrency = concurrency
+        self.poll_seconds = poll_seconds
+        self.stale_seconds = stale_seconds
+        self.max_attempts = max_attempts
+        self._wakeup = asyncio.Event()
+        self._workers: List[asyncio.Task] = []
+        self.claimed = 0
+        self.succeeded = 0
+        self.failed = 0
+
+    def wake(self):
+        self._wakeup.set()
+
+    async def _claim(self) -> Optional[TaskJob]:
+        async with await self.session_factory() as session:
+            job = await TaskJobQueue(session).claim(self.stale_seconds)
+            await session.commit()
+        return job
+
+    async def _finish(self, job: TaskJob, status: str, error: Optional[str] = None):
+        async with await self.session_factory() as session:
+            finished = await TaskJobQueue(session).finish(job, status, error)
+            await session.commit()
+        if finished:
+            if status == "succeeded":
+                self.succeeded += 1
+            else:
+                self.failed += 1
+
+    async def _release(self, job: TaskJob):
+        async with await self.session_factory() as session:
+            await TaskJobQueue(session).release(job)
+            await session.commit()
+
+    async def run_next(self) -> bool:
+        """Claims and runs one job; False when there was none to claim."""
+        job = await self._claim()
+        if job is None:
+            return False
+        self.claimed += 1
+        if job.attempts > self.max_attempts:
+            await self._finish(
+                job, "failed", f"Gave up after {self.max_attempts} attempts"
+            )
+            return True
+
+        logger.info("Running %s job %s (attempt %d)", job.kind, job.id, job.attempts)
+        try:
+            await self.runner.run(job)
+        except JobLost:
+            logger.warning("Job %s was taken over by another worker", job.id)
+            return True
+        except asyncio.CancelledError:
+            # Shutting down: hand the job to the next worker right away
+            # rather than after it goes stale
+            await asyncio.shield(self._release(job))
+            raise
+        except Exception as e:
+            logger.exception("Job %s failed", job.id)
+            await self._finish(job, "failed", str(e) or type(e).__name__)
+            return True
+        await self._finish(job, "succeeded")
+        return True
+
+    async def run_pending(self) -> int:
+        """Runs jobs until none is left to claim; returns how many ran."""
+        ran = 0
+        while await self.run_next():
+            ran += 1
+        return ran
+
+    async def _work(self):
+        while True:
+            try:
+                if await self.run_next():
+                    continue
+            except Exception as e:
+                # e.g. the database is unreachable; try again after a poll
+                logger.error("Job worker error: %s", e)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def start(self):
+        if not self._workers:
+            self._workers = [
+                asyncio.create_task(self._work()) for _ in range(self.concurrency)
+            ]
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def stats(self) -> dict:
+        return {
+            "claimed": self.claimed,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+        }
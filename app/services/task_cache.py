@@ -0,0 +1,64 @@
+import hashlib
+import json
+from typing import Any, Dict, Optional
+
+from app.core.cache import create_cache_backend
+from app.core.config import settings
+
+
+class TaskCache:
+    # Bumped by every write; keys embed it, so one INCR drops all cached reads
+    # of that tenant and leaves other tenants' entries alone
+    GENERATION_KEY = "tasks:{tenant_id}:generation"
+
+    def __init__(self, backend, ttl: int):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    async def key(self, tenant_id: str, kind: str, params: Dict[str, Any]) -> str:
+        generation_key = self.GENERATION_KEY.format(tenant_id=tenant_id)
+        generation = int(await self.backend.get(generation_key) or 0)
+        raw = json.dumps(params, sort_keys=True, default=str).encode()
+        digest = hashlib.sha1(raw).hexdigest()
+        return f"tasks:{tenant_id}:{generation}:{kind}:{digest}"
+
+    async def get(self, key: str) -> Optional[str]:
+        value = await self.backend.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value.decode() if isinstance(value, bytes) else value
+
+    async def set(self, key: str, value: str):
+        await self.backend.set(key, value, ex=self.ttl)
+
+    async def invalidate(self, tenant_id: str):
+        await self.backend.incr(self.GENERATION_KEY.format(tenant_id=tenant_id))
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": True,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+task_cache = (
+    TaskCache(
+        create_cache_backend(
+            settings.cache_backend, settings.cache_url, settings.cache_max_entries
+        ),
+        settings.cache_ttl_seconds,
+    )
+    if settings.cache_enabled
+    else None
+)
+
+
+def get_task_cache() -> Optional[TaskCache]:
+    return task_cache
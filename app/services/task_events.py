@@ -0,0 +1,17 @@
+from typing import Optional
+
+from app.core.config import settings
+from app.core.events import InMemoryBroker, create_event_broker
+
+# One per worker, holding its LISTEN connection and its subscribers
+task_events = (
+    create_event_broker(
+        settings.events_backend, settings.db.url, settings.events_queue_size
+    )
+    if settings.events_enabled
+    else None
+)
+
+
+def get_task_events() -> Optional[InMemoryBroker]:
+    return task_events
@@ -0,0 +1,11 @@
+from typing import Optional
+
+from app.core.config import settings
+from app.core.singleflight import SingleFlight
+
+# Shared by every request of this worker
+task_flights = SingleFlight() if settings.singleflight_enabled else None
+
+
+def get_task_flights() -> Optional[SingleFlight]:
+    return task_flights
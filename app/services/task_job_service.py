@@ -0,0 +1,45 @@
+from typing import List, Optional
+from uuid import UUID
+
+from app.core.logger import AppLogger
+from app.db.db import SessionFactory
+from app.repositories.task_job_repository import TaskJobRepository
+from app.repositories.unit_of_work import UnitOfWork
+from app.schemas.task_job import ImportJob, TaskJobCreate, TaskJobOut
+from app.services.job_worker import JobWorkerPool
+
+logger = AppLogger().get_logger()
+
+
+class TaskJobService:
+    def __init__(
+        self,
+        session_factory: SessionFactory,
+        tenant_id: str,
+        workers: Optional[JobWorkerPool] = None,
+    ):
+        self.uow = UnitOfWork(
+            session_factory, {"jobs": TaskJobRepository}, tenant_id=tenant_id
+        )
+        self.workers = workers
+
+    async def submit(self, data: TaskJobCreate) -> TaskJobOut:
+        total = len(data.items) if isinstance(data, ImportJob) else None
+        async with self.uow:
+            job = await self.uow.jobs.create(
+                data.kind, data.model_dump(mode="json", exclude={"kind"}), total
+            )
+        logger.info("Queued %s job %s", job.kind, job.id)
+        if self.workers:
+            self.workers.wake()
+        return TaskJobOut.model_validate(job)
+
+    async def get_job(self, job_id: UUID) -> Optional[TaskJobOut]:
+        async with self.uow.read():
+            job = await self.uow.jobs.get_by_id(job_id)
+        return None if job is None else TaskJobOut.model_validate(job)
+
+    async def list_jobs(self, limit: int) -> List[TaskJobOut]:
+        async with self.uow.read():
+            jobs = await self.uow.jobs.get_recent(limit)
+        return [TaskJobOut.model_validate(job) for job in jobs]
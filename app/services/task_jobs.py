@@ -0,0 +1,33 @@
+from typing import Optional
+
+from app.core.config import settings
+from app.db.db import open_session
+from app.services.job_worker import JobWorkerPool, TaskJobRunner
+from app.services.task_cache import task_cache
+from app.services.task_events import task_events
+from app.services.task_flights import task_flights
+
+# This process's job workers, started with the app; None to leave jobs to
+# other processes
+task_jobs = (
+    JobWorkerPool(
+        open_session,
+        TaskJobRunner(
+            open_session,
+            settings.job_chunk_size,
+            cache=task_cache,
+            flights=task_flights,
+            events=task_events,
+        ),
+        concurrency=settings.job_workers,
+        poll_seconds=settings.job_poll_seconds,
+        stale_seconds=settings.job_stale_seconds,
+        max_attempts=settings.job_max_attempts,
+    )
+    if settings.jobs_enabled
+    else None
+)
+
+
+def get_task_jobs() -> Optional[JobWorkerPool]:
+    return task_jobs
@@ -1,18 +1,122 @@
-from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime, timezone
 from uuid import UUID
-from typing import List, Optional
+import json
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+)
+from pydantic import ValidationError
 
 from app.repositories.unit_of_work import UnitOfWork
 from app.repositories.task_repository import TaskRepository
-from app.schemas.task import TaskCreate, TaskUpdate, TaskOut
+from app.repositories.task_tombstone_repository import TaskTombstoneRepository
+from app.repositories.task_summary_repository import TaskSummaryRepository
+from app.schemas.task import (
+    TaskCreate,
+    TaskImport,
+    TaskImportResult,
+    TaskUpdate,
+    TaskOut,
+    TaskChanges,
+    TaskStats,
+    TaskCategoryStats,
+    TaskPriorityStats,
+    TaskBulkUpdateItem,
+    TaskBulkError,
+    TaskBulkResult,
+    task_list_adapter,
+    task_row_adapter,
+    task_top_adapter,
+)
+from app.core.config import settings
+from app.core.events import RESYNC, InMemoryBroker, task_events
 from app.core.logger import AppLogger
+from app.core.singleflight import SingleFlight
+from app.db.db import SessionFactory
+from app.services.task_cache import TaskCache
+from app.services.write_behind import WriteBehindQueue
+from app.utils.etag import make_etag
+from app.utils.pagination import InvalidCursor, encode_cursor, decode_cursor
+from app.utils.records import Record, RecordError
 
 logger = AppLogger().get_logger()
 
 
 class TaskService:
-    def __init__(self, session: AsyncSession):
-        self.uow = UnitOfWork(session, {"tasks": TaskRepository})
+    def __init__(
+        self,
+        session_factory: SessionFactory,
+        tenant_id: str,
+        cache: Optional[TaskCache] = None,
+        flights: Optional[SingleFlight] = None,
+        writes: Optional[WriteBehindQueue] = None,
+        events: Optional[InMemoryBroker] = None,
+    ):
+        self.tenant_id = tenant_id
+        self.uow = UnitOfWork(
+            session_factory,
+            {
+                "tasks": TaskRepository,
+                "tombstones": TaskTombstoneRepository,
+                "summary": TaskSummaryRepository,
+            },
+            events=events,
+            tenant_id=tenant_id,
+        )
+        self.cache = cache
+        self.flights = flights
+        self.writes = writes
+
+    async def _cache_key(self, kind: str, params: Dict[str, Any]) -> Optional[str]:
+        if not self.cache:
+            return None
+        return await self.cache.key(self.tenant_id, kind, params)
+
+    async def _cache_get(self, key: Optional[str]) -> Optional[str]:
+        return await self.cache.get(key) if key else None
+
+    async def _cache_set(self, key: Optional[str], value: str):
+        if key:
+            await self.cache.set(key, value)
+
+    async def _invalidate(self):
+        # Called after the commit so readers can't re-cache the old state
+        if self.cache:
+            await self.cache.invalidate(self.tenant_id)
+        if self.flights:
+            self.flights.forget(self.tenant_id)
+
+    def _publish(self, type: str, ids: List[UUID]):
+        # Sent with the commit of the current unit of work
+        self.uow.publish(task_events(self.tenant_id, type, ids))
+
+    async def _read(
+        self,
+        kind: str,
+        params: Dict[str, Any],
+        load: Callable[[], Awaitable[Optional[str]]],
+    ) -> Optional[str]:
+        """Cached read whose load runs once for concurrent identical calls."""
+        key = await self._cache_key(kind, params)
+        if cached := await self._cache_get(key):
+            return cached
+
+        async def load_and_cache() -> Optional[str]:
+            value = await load()
+            if value is not None:
+                await self._cache_set(key, value)
+            return value
+
+        if not self.flights:
+            return await load_and_cache()
+        flight = (self.tenant_id, kind, json.dumps(params, sort_keys=True, default=str))
+        return await self.flights.do(flight, load_and_cache)
 
     async def list_tasks(
         self,
@@ -20,48 +124,407 @@ class TaskService:
         status: Optional[str],
         sort: Optional[str],
         category: Optional[str],
-    ) -> List[TaskOut]:
-        async with self.uow:
-            tasks = await self.uow.tasks.get_tasks(search, status, sort, category)
-            logger.info(f"Fetched {len(tasks)} tasks")
-            return tasks
+        limit: int,
+        cursor: Optional[str] = None,
+    ) -> bytes:
+        """The TaskList JSON body, serialized straight from the selected rows."""
+        after = self._parse_cursor(cursor, sort) if cursor else None
 
-    async def get_task(self, task_id: UUID) -> TaskOut:
-        async with self.uow:
-            task = await self.uow.tasks.get_by_id(task_id)
-            return task
+        async def load() -> str:
+            async with self.uow.read():
+                # One extra row tells us whether another page exists
+                tasks = await self.uow.tasks.get_tasks(
+                    search, status, sort, category, limit=limit + 1, after=after
+                )
+                page = tasks[:limit]
+                next_cursor = None
+                if len(tasks) > limit:
+                    next_cursor = encode_cursor(
+                        [sort, *self.uow.tasks.page_key(page[-1], sort)]
+                    )
+                logger.info("Fetched %d tasks", len(page))
+            return task_list_adapter.dump_json(
+                {"tasks": [row._asdict() for row in page], "next_cursor": next_cursor}
+            ).decode()
+
+        params = {
+            "search": search,
+            "status": status,
+            "sort": sort,
+            "category": category,
+            "limit": limit,
+            "cursor": cursor,
+        }
+        return (await self._read("list", params, load)).encode()
+
+    async def top_tasks(
+        self,
+        sort: str,
+        limit: int,
+        status: Optional[str],
+        category: Optional[str],
+        per_category: bool = False,
+    ) -> bytes:
+        """The TaskTop JSON body: the first `limit` tasks in `sort` order,
+        overall or per category."""
+
+        async def load() -> str:
+            async with self.uow.read():
+                # One category is a single group: its own top list
+                if per_category and not category:
+                    tasks = await self.uow.tasks.get_top_per_category(
+                        sort, limit, status
+                    )
+                else:
+                    # LIMIT in SQL, so the DB stops after the shown rows
+                    tasks = await self.uow.tasks.get_tasks(
+                        status=status, sort=sort, category=category, limit=limit
+                    )
+            return task_top_adapter.dump_json(
+                {"tasks": [row._asdict() for row in tasks]}
+            ).decode()
+
+        params = {
+            "sort": sort,
+            "limit": limit,
+            "status": status,
+            "category": category,
+            "per_category": per_category,
+        }
+        return (await self._read("top", params, load)).encode()
+
+    async def list_changes(self, since: Optional[str], limit: int) -> TaskChanges:
+        async with self.uow.read():
+            if since:
+                task_after, tombstone_after = self._parse_sync_token(since)
+            else:
+                # First sync: every task, then only deletions from now on
+                horizon = await self.uow.tasks.get_change_horizon()
+                task_after, tombstone_after = None, [horizon, UUID(int=0)]
+            tasks = await self.uow.tasks.get_changed(task_after, limit + 1)
+            tombstones = await self.uow.tombstones.get_since(tombstone_after, limit + 1)
+
+        has_more = len(tasks) > limit or len(tombstones) > limit
+        tasks, tombstones = tasks[:limit], tombstones[:limit]
+        if tasks:
+            task_after = [tasks[-1].change_xid, tasks[-1].id]
+        if tombstones:
+            tombstone_after = [tombstones[-1].change_xid, tombstones[-1].id]
+        logger.info("Sync: %d changed, %d deleted", len(tasks), len(tombstones))
+        return TaskChanges(
+            changed=[TaskOut.model_validate(task) for task in tasks],
+            deleted=[tombstone.id for tombstone in tombstones],
+            next_token=encode_cursor([task_after, tombstone_after]),
+            has_more=has_more,
+        )
+
+    async def get_stats(self) -> TaskStats:
+        # The overdue part ages with the clock, bounded by the cache TTL
+        return TaskStats.model_validate_json(
+            await self._read("stats", {}, self._load_stats)
+        )
+
+    async def _load_stats(self) -> str:
+        async with self.uow.read():
+            counts = await self.uow.summary.get_counts()
+            overdue = dict(
+                await self.uow.summary.get_overdue(datetime.now(timezone.utc))
+            )
+
+        categories, priorities = {}, {}
+        for category, done, priority, count in counts:
+            entry = categories.setdefault(category, {"total": 0, "done": 0, "open": 0})
+            histogram = priorities.setdefault(priority, {"total": 0, "open": 0})
+            entry["total"] += count
+            histogram["total"] += count
+            if done:
+                entry["done"] += count
+            else:
+                entry["open"] += count
+                histogram["open"] += count
+
+        total = sum(entry["total"] for entry in categories.values())
+        done = sum(entry["done"] for entry in categories.values())
+        return TaskStats(
+            total=total,
+            done=done,
+            open=total - done,
+            done_ratio=done / total if total else 0.0,
+            overdue=sum(overdue.values()),
+            categories=[
+                TaskCategoryStats(
+                    category=category or None,
+                    overdue=overdue.get(category, 0),
+                    **entry,
+                )
+                for category, entry in sorted(categories.items())
+            ],
+            priorities=[
+                TaskPriorityStats(priority=priority, **entry)
+                for priority, entry in sorted(priorities.items())
+            ],
+        ).model_dump_json()
+
+    @staticmethod
+    def _parse_sync_token(token: str) -> tuple:
+        values = decode_cursor(token)
+        if len(values) != 2:
+            raise InvalidCursor("Malformed sync token")
+        try:
+            return tuple(
+                None if position is None else [int(position[0]), UUID(position[1])]
+                for position in values
+            )
+        except (IndexError, TypeError, ValueError) as e:
+            raise InvalidCursor("Malformed sync token") from e
+
+    async def export_tasks(
+        self,
+        search: Optional[str],
+        status: Optional[str],
+        sort: Optional[str],
+        category: Optional[str],
+    ) -> AsyncIterator[bytes]:
+        """One JSON-encoded task per streamed row."""
+        # Streaming needs a transaction for the server-side cursor
+        async with self.uow.read(snapshot=True):
+            count = 0
+            async for row in self.uow.tasks.stream_tasks(
+                search, status, sort, category, batch_size=settings.export_batch_size
+            ):
+                count += 1
+                yield task_row_adapter.dump_json(row._asdict())
+            logger.info("Exported %d tasks", count)
+
+    async def export_csv(
+        self,
+        search: Optional[str],
+        status: Optional[str],
+        sort: Optional[str],
+        category: Optional[str],
+    ) -> AsyncIterator[bytes]:
+        """CSV chunks, encoded by Postgres' COPY where available."""
+        async with self.uow.read(snapshot=True):
+            async for chunk in self.uow.tasks.export_csv(
+                search, status, sort, category, batch_size=settings.export_batch_size
+            ):
+                yield chunk
+
+    async def import_tasks(
+        self, records: AsyncIterator[Record], batch_size: int
+    ) -> TaskImportResult:
+        """Validates records as they arrive and copies them batch_size at a
+        time, each batch in its own transaction. Rejected records are
+        reported by index and the rest of the import goes on."""
+        result = TaskImportResult(created=0, rejected=0)
+
+        def reject(index: int, detail: str, task_id: Optional[UUID] = None):
+            result.rejected += 1
+            if len(result.errors) < settings.import_max_reported_errors:
+                result.errors.append(
+                    TaskBulkError(index=index, id=task_id, detail=detail)
+                )
+
+        async def flush(batch: List[Tuple[int, TaskImport]]):
+            async with self.uow:
+                skipped = await self.uow.tasks.import_batch([item for _, item in batch])
+                if len(skipped) < len(batch):
+                    # Too many ids to name; subscribers refetch instead
+                    self.uow.publish([{"tenant_id": self.tenant_id, "type": RESYNC}])
+            result.created += len(batch) - len(skipped)
+            for position in skipped:
+                index, item = batch[position]
+                reject(index, "Task id already exists", item.id)
+            if len(skipped) < len(batch):
+                await self._invalidate()
+
+        batch: List[Tuple[int, TaskImport]] = []
+        async for index, record in _enumerate(records):
+            if isinstance(record, RecordError):
+                reject(index, record)
+                continue
+            try:
+                batch.append((index, TaskImport.model_validate(record)))
+            except ValidationError as e:
+                reject(index, _describe(e))
+                continue
+            if len(batch) >= batch_size:
+                await flush(batch)
+                batch = []
+        if batch:
+            await flush(batch)
+        logger.info("Imported %d tasks, rejected %d", result.created, result.rejected)
+        return result
+
+    @staticmethod
+    def _parse_cursor(cursor: str, sort: Optional[str]) -> List:
+        values = decode_cursor(cursor)
+        # The cursor remembers its sort so it can't be replayed against another
+        if not values or values[0] != sort:
+            raise InvalidCursor("Cursor does not match the requested sort")
+        return TaskRepository.parse_page_key(values[1:], sort)
+
+    async def get_task(self, task_id: UUID) -> TaskOut | None:
+        async def load() -> Optional[str]:
+            async with self.uow.read():
+                task = await self.uow.tasks.get_by_id(task_id)
+            return (
+                None if task is None else TaskOut.model_validate(task).model_dump_json()
+            )
+
+        cached = await self._read("task", {"id": task_id}, load)
+        return None if cached is None else TaskOut.model_validate_json(cached)
+
+    async def task_etag(self, task_id: UUID) -> Optional[str]:
+        async with self.uow.read():
+            version = await self.uow.tasks.get_version(task_id)
+        return None if version is None else self.etag(task_id, version)
+
+    def etag(self, task_id: UUID, version: int) -> str:
+        return make_etag(self.tenant_id, task_id, version)
 
     async def create_task(self, data: TaskCreate) -> TaskOut:
         async with self.uow:
             new_task = await self.uow.tasks.create_task(data)
-            logger.info(f"Created task {new_task.id}")
-            return new_task
+            # The id is assigned when the insert is flushed
+            await self.uow.session.flush()
+            self._publish("created", [new_task.id])
+        logger.info("Created task %s", new_task.id)
+        await self._invalidate()
+        return new_task
 
-    async def update_task(self, task_id: UUID, data: TaskUpdate) -> TaskOut:
+    async def update_task(self, task_id: UUID, data: TaskUpdate) -> TaskOut | None:
         async with self.uow:
-            task = await self.uow.tasks.get_by_id(task_id)
-            if not task:
-                return None
-            return await self.uow.tasks.update_task(task, data)
+            task = await self.uow.tasks.update_task(task_id, data)
+            if task:
+                self._publish("updated", [task_id])
+        if task:
+            await self._invalidate()
+        return task
 
     async def delete_task(self, task_id: UUID) -> bool:
         async with self.uow:
-            task = await self.uow.tasks.get_by_id(task_id)
-            if not task:
-                return False
-            await self.uow.tasks.delete(task)
-            return True
+            deleted = await self.uow.tasks.delete_task(task_id)
+            if deleted:
+                await self.uow.tombstones.record([task_id])
+                self._publish("deleted", [task_id])
+        if deleted:
+            await self._invalidate()
+        return deleted
 
     async def mark_done(self, task_id: UUID, done: bool) -> TaskOut | None:
-        async with self.uow:
-            task = await self.uow.tasks.get_by_id(task_id)
-            if not task:
-                return None
-            return await self.uow.tasks.mark_done(task, done)
+        if self.writes:
+            task = await self.writes.submit(self.tenant_id, task_id, {"done": done})
+        else:
+            async with self.uow:
+                task = await self.uow.tasks.mark_done(task_id, done)
+                if task:
+                    self._publish("updated", [task_id])
+        if task:
+            await self._invalidate()
+        return task
 
     async def update_priority(self, task_id: UUID, priority: int) -> TaskOut | None:
+        if self.writes:
+            task = await self.writes.submit(
+                self.tenant_id, task_id, {"priority": priority}
+            )
+        else:
+            async with self.uow:
+                task = await self.uow.tasks.update_priority(task_id, priority)
+                if task:
+                    self._publish("updated", [task_id])
+        if task:
+            await self._invalidate()
+        return task
+
+    async def bulk_create(self, items: List[Dict[str, Any]]) -> TaskBulkResult:
+        valid, errors = validate_creates(items)
         async with self.uow:
-            task = await self.uow.tasks.get_by_id(task_id)
-            if not task:
-                return None
-            return await self.uow.tasks.update_priority(task, priority)
+            tasks = await self.uow.tasks.bulk_create(valid)
+            self._publish("created", [task.id for task in tasks])
+            logger.info("Bulk created %d tasks, rejected %d", len(tasks), len(errors))
+        if tasks:
+            await self._invalidate()
+        return TaskBulkResult(
+            tasks=[TaskOut.model_validate(task) for task in tasks], errors=errors
+        )
+
+    async def bulk_update(self, items: List[Dict[str, Any]]) -> TaskBulkResult:
+        updates, positions, errors = [], {}, []
+        for index, item in enumerate(items):
+            try:
+                data = TaskBulkUpdateItem.model_validate(item)
+            except ValidationError as e:
+                errors.append(
+                    TaskBulkError(index=index, id=item.get("id"), detail=_describe(e))
+                )
+                continue
+            if data.id in positions:
+                errors.append(
+                    TaskBulkError(index=index, id=data.id, detail="Duplicate task id")
+                )
+                continue
+            positions[data.id] = index
+            updates.append(data.model_dump(exclude_unset=True))
+
+        async with self.uow:
+            tasks = await self.uow.tasks.bulk_update(updates) if updates else []
+            found = {task.id for task in tasks}
+            self._publish("updated", [task.id for task in tasks])
+            errors.extend(
+                TaskBulkError(index=index, id=task_id, detail="Task not found")
+                for task_id, index in positions.items()
+                if task_id not in found
+            )
+            logger.info("Bulk updated %d tasks, rejected %d", len(tasks), len(errors))
+        if tasks:
+            await self._invalidate()
+        return TaskBulkResult(
+            tasks=[TaskOut.model_validate(task) for task in tasks],
+            errors=sorted(errors, key=lambda error: error.index),
+        )
+
+    async def bulk_delete(self, ids: List[UUID]) -> TaskBulkResult:
+        async with self.uow:
+            deleted = set(await self.uow.tasks.bulk_delete(ids))
+            await self.uow.tombstones.record(list(deleted))
+            self._publish("deleted", list(deleted))
+            errors = [
+                TaskBulkError(index=index, id=task_id, detail="Task not found")
+                for index, task_id in enumerate(ids)
+                if task_id not in deleted
+            ]
+            logger.info("Bulk deleted %d tasks", len(deleted))
+        if deleted:
+            await self._invalidate()
+        return TaskBulkResult(
+            deleted=[task_id for task_id in ids if task_id in deleted],
+            errors=errors,
+        )
+
+
+def validate_creates(
+    items: List[Dict[str, Any]], offset: int = 0
+) -> Tuple[List[TaskCreate], List[TaskBulkError]]:
+    """Valid items, and an error per invalid one indexed from `offset`."""
+    valid, errors = [], []
+    for index, item in enumerate(items, start=offset):
+        try:
+            valid.append(TaskCreate.model_validate(item))
+        except ValidationError as e:
+            errors.append(TaskBulkError(index=index, detail=_describe(e)))
+    return valid, errors
+
+
+async def _enumerate(items: AsyncIterator[Any]) -> AsyncIterator[Tuple[int, Any]]:
+    index = 0
+    async for item in items:
+        yield index, item
+        index += 1
+
+
+def _describe(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(map(str, e['loc'])) or 'item'}: {e['msg']}" for e in error.errors()
+    )
@@ -0,0 +1,22 @@
+from typing import Optional
+
+from app.core.config import settings
+from app.db.db import async_session
+from app.services.task_events import task_events
+from app.services.write_behind import WriteBehindQueue
+
+# Shared by every request of this worker; None when updates commit one by one
+task_writes = (
+    WriteBehindQueue(
+        async_session,
+        max_delay=settings.write_behind_delay_ms / 1000,
+        max_items=settings.write_behind_max_items,
+        events=task_events,
+    )
+    if settings.write_behind_enabled
+    else None
+)
+
+
+def get_task_writes() -> Optional[WriteBehindQueue]:
+    return task_writes
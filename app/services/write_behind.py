@@ -0,0 +1,120 @@
+import asyncio
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Set, Tuple
+from uuid import UUID
+
+from app.core.events import InMemoryBroker, task_events
+from app.core.logger import AppLogger
+from app.repositories.task_repository import TaskRepository
+from app.schemas.task import TaskOut
+
+logger = AppLogger().get_logger()
+
+Key = Tuple[str, UUID]
+
+
+class WriteBehindQueue:
+    """Batches small task updates into one transaction per flush.
+
+    Updates wait at most `max_delay` seconds, or until `max_items` tasks are
+    pending. Several updates to the same task in one batch are merged, the
+    last value of each field wins, and all their callers get the final row.
+    Callers are answered only after the batch has committed.
+    """
+
+    def __init__(
+        self,
+        session_factory,
+        max_delay: float,
+        max_items: int,
+        events: Optional[InMemoryBroker] = None,
+    ):
+        self.session_factory = session_factory
+        self.events = events
+        self.max_delay = max_delay
+        self.max_items = max_items
+        self._pending: Dict[Key, Dict[str, Any]] = {}
+        self._waiters: Dict[Key, List[asyncio.Future]] = defaultdict(list)
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flushing: Set[asyncio.Task] = set()
+        self.updates = 0
+        self.rows = 0
+        self.flushes = 0
+
+    async def submit(
+        self, tenant_id: str, task_id: UUID, values: Dict[str, Any]
+    ) -> Optional[TaskOut]:
+        key = (tenant_id, task_id)
+        self._pending.setdefault(key, {}).update(values)
+        future = asyncio.get_running_loop().create_future()
+        self._waiters[key].append(future)
+        self.updates += 1
+
+        if len(self._pending) >= self.max_items:
+            self._flush_now()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(
+                self.max_delay, self._flush_now
+            )
+        return await future
+
+    def _flush_now(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        batch, waiters = self._pending, self._waiters
+        self._pending, self._waiters = {}, defaultdict(list)
+        task = asyncio.create_task(self._flush(batch, waiters))
+        self._flushing.add(task)
+        task.add_done_callback(self._flushing.discard)
+
+    async def _flush(
+        self, batch: Dict[Key, Dict[str, Any]], waiters: Dict[Key, List[asyncio.Future]]
+    ):
+        items = defaultdict(list)
+        for (tenant_id, task_id), values in batch.items():
+            items[tenant_id].append({"id": task_id, **values})
+
+        results: Dict[Key, TaskOut] = {}
+        events: List[dict] = []
+        try:
+            async with self.session_factory() as session:
+                for tenant_id, tenant_items in items.items():
+                    repo = TaskRepository(session, tenant_id)
+                    tasks = await repo.bulk_update(tenant_items)
+                    for task in tasks:
+                        results[(tenant_id, task.id)] = TaskOut.model_validate(task)
+                    events.extend(
+                        task_events(tenant_id, "updated", [task.id for task in tasks])
+                    )
+                if self.events and events:
+                    await self.events.before_commit(session, events)
+                await session.commit()
+        except Exception as e:
+            logger.error("Write-behind flush of %d tasks failed: %s", len(batch), e)
+            for futures in waiters.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+            return
+
+        self.rows += len(batch)
+        self.flushes += 1
+        if self.events and events:
+            self.events.after_commit(events)
+        for key, futures in waiters.items():
+            for future in futures:
+                # A caller that gave up has a cancelled future
+                if not future.done():
+                    future.set_result(results.get(key))
+
+    async def stop(self):
+        """Flushes what is pending and waits for flushes in progress."""
+        self._flush_now()
+        if self._flushing:
+            await asyncio.gather(*self._flushing, return_exceptions=True)
+
+    def stats(self) -> dict:
+        return {"updates": self.updates, "rows": self.rows, "flushes": self.flushes}
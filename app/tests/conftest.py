@@ -2,7 +2,26 @@ import pytest
 import pytest_asyncio
 from fastapi.testclient import TestClient
 from httpx import AsyncClient, ASGITransport
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.core.config import settings
+
+# Before app.main sets up the app logger: tests log to the console only
+settings.log_file_enabled = False
+
 from app.main import app
+from app.db.base import Base
+from app.db.db import get_session, get_session_factory, session_opener
+from app.db.instrumentation import instrument_engine
+from app.core.cache import InMemoryCache
+from app.core.events import Broadcaster, InMemoryBroker
+from app.services.task_cache import TaskCache, get_task_cache
+from app.services.task_events import get_task_events
+from app.models.task import Task  # noqa: F401 - registers the tables
+from app.models.task_tombstone import TaskTombstone  # noqa: F401
+from app.models.task_summary import TaskSummary  # noqa: F401
+from app.models.task_job import TaskJob  # noqa: F401
 
 
 @pytest.fixture
@@ -15,3 +34,46 @@ async def async_client():
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url="http://test") as ac:
         yield ac
+
+
+@pytest_asyncio.fixture
+async def session_factory():
+    # In-memory SQLite stand-in for Postgres, shared across sessions
+    engine = instrument_engine(
+        create_async_engine(
+            "sqlite+aiosqlite://",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield sessionmaker(
+        engine, class_=AsyncSession, expire_on_commit=False, autoflush=False
+    )
+    await engine.dispose()
+
+
+@pytest.fixture
+def task_events():
+    # Stands in for LISTEN/NOTIFY, which SQLite doesn't have
+    return InMemoryBroker(Broadcaster(queue_size=10))
+
+
+@pytest_asyncio.fixture
+async def db_client(session_factory, task_events):
+    async def override_get_session():
+        async with session_factory() as session:
+            yield session
+
+    # Fresh cache per test, so reads never leak between test databases
+    cache = TaskCache(InMemoryCache(), ttl=30)
+    open_session = session_opener(session_factory)
+    app.dependency_overrides[get_session] = override_get_session
+    app.dependency_overrides[get_session_factory] = lambda: open_session
+    app.dependency_overrides[get_task_cache] = lambda: cache
+    app.dependency_overrides[get_task_events] = lambda: task_events
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        yield ac
+    app.dependency_overrides.clear()
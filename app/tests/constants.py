@@ -8,3 +8,20 @@ HEALTH_RESPONSE = {
     "detail": "ok",
     "result": "working",
 }
+
+# test_tasks
+TASKS = "/tasks/"
+TASKS_EXPORT = "/tasks/export"
+TASKS_BULK = "/tasks/bulk"
+HEALTHCHECK_DB_POOL = "/healthcheck/db/pool"
+HEALTHCHECK_CACHE = "/healthcheck/cache"
+TASKS_CHANGES = "/tasks/changes"
+TASKS_STATS = "/tasks/stats"
+TASKS_TOP = "/tasks/top"
+TASKS_IMPORT = "/tasks/import"
+
+# test_jobs
+JOBS = "/jobs/"
+
+# test_metrics
+METRICS = "/metrics"
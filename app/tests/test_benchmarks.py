@@ -0,0 +1,47 @@
+import pytest
+from benchmarks.runner import Runner, compare
+from benchmarks.scenarios import SCENARIOS
+from benchmarks.seed import seed_tasks
+
+
+@pytest.mark.asyncio
+async def test_benchmark_scenarios_run_cleanly(session_factory):
+    # Smoke run, so scenarios keep up with API changes
+    engine = session_factory.kw["bind"]
+    assert await seed_tasks(engine, 60) == 60
+    results = await Runner(engine, concurrency=2, requests=4, cache=None).run(SCENARIOS)
+    assert set(results) == {scenario.name for scenario in SCENARIOS}
+    for name, result in results.items():
+        assert result["errors"] == 0, name
+        # Only below 1 when concurrent identical reads share a query
+        if result["coalesced"]:
+            assert result["queries_per_request"] > 0, name
+        else:
+            assert result["queries_per_request"] >= 1, name
+
+
+def test_benchmark_compare_flags_regressions():
+    baseline = {
+        "results": {
+            "list": {
+                "errors": 0,
+                "throughput": 100.0,
+                "p95_ms": 10.0,
+                "queries_per_request": 2.0,
+                "coalesced": False,
+            }
+        }
+    }
+    same = {"list": {**baseline["results"]["list"], "p95_ms": 11.0}}
+    assert compare(baseline, same, tolerance=0.25) == []
+
+    worse = {"list": {**same["list"], "queries_per_request": 2.2}}
+    assert compare(baseline, worse, tolerance=0.25) == [
+        "list: queries_per_request 2.0 -> 2.2"
+    ]
+    # How many reads share a query depends on timing
+    coalesced = {"list": {**worse["list"], "coalesced": True}}
+    assert compare(baseline, coalesced, tolerance=0.25) == []
+
+    added = {**same, "stats": same["list"]}
+    assert compare(baseline, added, tolerance=0.25) == ["stats: not in the baseline"]
@@ -0,0 +1,50 @@
+import asyncio
+import pytest
+from pydantic import ValidationError
+from app.core.cache import InMemoryCache
+from app.core.config import Settings
+from app.core.db_settings import DatabaseSettings
+
+
+@pytest.mark.asyncio
+async def test_in_memory_cache_evicts_least_recently_used():
+    cache = InMemoryCache(max_entries=2)
+    await cache.set("a", "1")
+    await cache.set("b", "2")
+    await cache.get("a")
+    await cache.set("c", "3")
+
+    assert await cache.get("a") == "1"
+    assert await cache.get("b") is None
+    assert await cache.get("c") == "3"
+
+
+@pytest.mark.asyncio
+async def test_in_memory_cache_expires_entries():
+    cache = InMemoryCache()
+    await cache.set("a", "1", ex=0.01)
+    await asyncio.sleep(0.02)
+    assert await cache.get("a") is None
+
+
+@pytest.mark.asyncio
+async def test_in_memory_cache_counters_survive_eviction():
+    cache = InMemoryCache(max_entries=1)
+    assert await cache.incr("generation") == 1
+    await cache.set("a", "1")
+    await cache.set("b", "2")
+    assert await cache.get("generation") == "1"
+
+
+def test_memory_cache_is_refused_with_several_workers():
+    with pytest.raises(ValidationError, match="CACHE_BACKEND=redis"):
+        Settings(workers=2, cache_enabled=True, cache_backend="memory")
+    Settings(workers=2, cache_backend="redis")
+    Settings(workers=2, cache_enabled=False)
+
+
+def test_memory_cache_is_refused_with_replicas():
+    db = DatabaseSettings(DB_REPLICA_URLS=["postgresql+asyncpg://replica/tododb"])
+    with pytest.raises(ValidationError, match="DB_REPLICA_URLS"):
+        Settings(db=db, cache_backend="memory")
+    Settings(db=db, cache_backend="redis")
@@ -0,0 +1,101 @@
+import json
+import pytest
+from app.core.events import RESYNC, Broadcaster
+from app.core.events import task_events as make_events
+from app.db.db import session_opener
+from app.repositories.task_repository import TaskRepository
+from app.repositories.unit_of_work import UnitOfWork
+from app.routers.task import task_events as events_endpoint
+from app.schemas.task import TaskCreate
+from .constants import TASKS, TASKS_BULK
+
+
+def drain(subscription) -> list:
+    events = []
+    while not subscription.queue.empty():
+        events.append(subscription.queue.get_nowait())
+    return events
+
+
+def task_events_for(type: str) -> list:
+    return make_events("default", type, ["00000000-0000-0000-0000-000000000001"])
+
+
+@pytest.mark.asyncio
+async def test_writes_notify_only_their_tenant(db_client, task_events):
+    acme = task_events.broadcaster.subscribe("acme")
+    globex = task_events.broadcaster.subscribe("globex")
+    headers = {"X-Tenant-ID": "acme"}
+
+    task = (await db_client.post(TASKS, json={"title": "a"}, headers=headers)).json()
+    await db_client.patch(f"{TASKS}{task['id']}/done", json={}, headers=headers)
+    await db_client.delete(f"{TASKS}{task['id']}", headers=headers)
+    # Not found: nothing committed, nothing sent
+    await db_client.delete(f"{TASKS}{task['id']}", headers=headers)
+
+    assert [(event["type"], event["ids"]) for event in drain(acme)] == [
+        ("created", [task["id"]]),
+        ("updated", [task["id"]]),
+        ("deleted", [task["id"]]),
+    ]
+    assert drain(globex) == []
+
+
+@pytest.mark.asyncio
+async def test_bulk_writes_are_split_into_bounded_events(db_client, task_events):
+    subscription = task_events.broadcaster.subscribe("default")
+    response = await db_client.post(TASKS_BULK, json=[{"title": "t"}] * 150)
+
+    events = drain(subscription)
+    assert [len(event["ids"]) for event in events] == [100, 50]
+    assert [i for event in events for i in event["ids"]] == [
+        task["id"] for task in response.json()["tasks"]
+    ]
+
+
+@pytest.mark.asyncio
+async def test_rolled_back_unit_of_work_sends_nothing(session_factory, task_events):
+    subscription = task_events.broadcaster.subscribe("default")
+    uow = UnitOfWork(
+        session_opener(session_factory),
+        {"tasks": TaskRepository},
+        events=task_events,
+        tenant_id="default",
+    )
+
+    with pytest.raises(RuntimeError):
+        async with uow:
+            await uow.tasks.create_task(TaskCreate(title="a"))
+            uow.publish(task_events_for("created"))
+            raise RuntimeError
+
+    assert drain(subscription) == []
+
+
+def test_slow_subscriber_is_told_to_resync():
+    broadcaster = Broadcaster(queue_size=2)
+    subscription = broadcaster.subscribe("default")
+    for event in task_events_for("updated") * 3:
+        broadcaster.publish(event)
+
+    assert drain(subscription) == [{"type": RESYNC}]
+    assert broadcaster.stats()["dropped"] == 2
+
+
+@pytest.mark.asyncio
+async def test_event_stream_sends_server_sent_events(task_events):
+    response = await events_endpoint(tenant_id="default", events=task_events)
+    assert response.media_type == "text/event-stream"
+    stream = response.body_iterator
+
+    assert await anext(stream) == b": subscribed\n\n"
+    task_events.after_commit(task_events_for("deleted"))
+    event = (await anext(stream)).decode()
+    assert event.startswith("event: deleted\ndata: ")
+    assert json.loads(event.split("data: ")[1]) == {
+        "type": "deleted",
+        "ids": ["00000000-0000-0000-0000-000000000001"],
+    }
+
+    await stream.aclose()
+    assert task_events.broadcaster.stats()["subscribers"] == 0
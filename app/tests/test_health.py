@@ -1,6 +1,11 @@
 from fastapi import status
 import pytest
-from .constants import HEALTHCHECK, HEALTHCHECK_DB, HEALTH_RESPONSE
+from .constants import (
+    HEALTHCHECK,
+    HEALTHCHECK_DB,
+    HEALTHCHECK_DB_POOL,
+    HEALTH_RESPONSE,
+)
 
 
 def assert_health_response(response):
@@ -17,3 +22,12 @@ def test_health_check(client):
 async def test_health_db(async_client):
     response = await async_client.get(HEALTHCHECK_DB)
     assert_health_response(response)
+
+
+def test_health_db_pool(client):
+    response = client.get(HEALTHCHECK_DB_POOL)
+    assert response.status_code == status.HTTP_200_OK
+    body = response.json()
+    assert body["size"] >= 0
+    assert body["checked_out"] >= 0
+    assert body["wait_seconds_max"] >= 0
@@ -0,0 +1,144 @@
+import asyncio
+import pytest
+import pytest_asyncio
+from fastapi import status
+from sqlalchemy import func, select
+from app.db.db import session_opener
+from app.main import app
+from app.models.task_tombstone import TaskTombstone
+from app.repositories.task_job_repository import TaskJobQueue
+from app.services.job_worker import JobWorkerPool, TaskJobRunner
+from app.services.task_jobs import get_task_jobs
+from .constants import JOBS, TASKS
+
+
+@pytest_asyncio.fixture
+async def jobs(db_client, session_factory, task_events):
+    open_session = session_opener(session_factory)
+    pool = JobWorkerPool(
+        open_session,
+        TaskJobRunner(open_session, chunk_size=2, events=task_events),
+        concurrency=1,
+        poll_seconds=0.01,
+        stale_seconds=60,
+        max_attempts=2,
+    )
+    app.dependency_overrides[get_task_jobs] = lambda: pool
+    return pool
+
+
+async def submit(client, **job):
+    response = await client.post(JOBS, json=job)
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    assert response.headers["Location"] == f"/jobs/{response.json()['id']}"
+    return response.json()
+
+
+async def fetch_job(client, job):
+    response = await client.get(f"{JOBS}{job['id']}")
+    assert response.status_code == status.HTTP_200_OK
+    return response.json()
+
+
+@pytest.mark.asyncio
+async def test_import_job_creates_tasks_in_chunks(db_client, jobs):
+    items = [{"title": f"t{i}"} for i in range(4)] + [{"priority": 1}]
+    job = await submit(db_client, kind="import", items=items)
+    assert (job["status"], job["progress"], job["total"]) == ("queued", 0, 5)
+
+    assert await jobs.run_pending() == 1
+
+    job = await fetch_job(db_client, job)
+    assert (job["status"], job["progress"], job["attempts"]) == ("succeeded", 5, 1)
+    assert job["result"]["created"] == 4
+    assert job["result"]["rejected"] == 1
+    assert job["result"]["errors"][0]["index"] == 4
+    tasks = (await db_client.get(TASKS)).json()["tasks"]
+    assert sorted(task["title"] for task in tasks) == ["t0", "t1", "t2", "t3"]
+
+
+@pytest.mark.asyncio
+async def test_reprioritize_and_purge_jobs(db_client, jobs, session_factory):
+    for i in range(5):
+        await db_client.post(
+            TASKS, json={"title": f"t{i}", "category": "work", "done": i < 3}
+        )
+    await db_client.post(TASKS, json={"title": "other", "done": True})
+
+    reprioritize = await submit(
+        db_client, kind="reprioritize", category="work", priority=9
+    )
+    purge = await submit(db_client, kind="purge_done", category="work")
+    assert await jobs.run_pending() == 2
+
+    reprioritize = await fetch_job(db_client, reprioritize)
+    purge = await fetch_job(db_client, purge)
+    assert (reprioritize["status"], reprioritize["progress"]) == ("succeeded", 5)
+    assert (purge["status"], purge["progress"], purge["total"]) == ("succeeded", 3, 3)
+    tasks = (await db_client.get(TASKS)).json()["tasks"]
+    assert sorted((t["title"], t["priority"]) for t in tasks) == [
+        ("other", 5),
+        ("t3", 9),
+        ("t4", 9),
+    ]
+    # Purged tasks leave tombstones for incremental sync
+    async with session_factory() as session:
+        assert await session.scalar(select(func.count(TaskTombstone.id))) == 3
+
+
+@pytest.mark.asyncio
+async def test_interrupted_job_resumes_from_its_progress(
+    db_client, jobs, session_factory
+):
+    job = await submit(
+        db_client, kind="import", items=[{"title": f"t{i}"} for i in range(5)]
+    )
+    # First worker: one chunk, then cancelled (e.g. shutdown)
+    original = jobs.runner._run_import
+
+    async def run_one_chunk(claimed):
+        claimed.params = {"items": claimed.params["items"][:2]}
+        await original(claimed)
+        raise asyncio.CancelledError
+
+    jobs.runner._run_import = run_one_chunk
+    with pytest.raises(asyncio.CancelledError):
+        await jobs.run_next()
+    assert (await fetch_job(db_client, job))["status"] == "queued"
+
+    jobs.runner._run_import = original
+    assert await jobs.run_pending() == 1
+    job = await fetch_job(db_client, job)
+    assert (job["status"], job["progress"], job["attempts"]) == ("succeeded", 5, 2)
+    assert job["result"]["created"] == 5
+    assert len((await db_client.get(TASKS)).json()["tasks"]) == 5
+
+
+@pytest.mark.asyncio
+async def test_stale_jobs_are_taken_over_and_fenced(db_client, jobs, session_factory):
+    job = await submit(db_client, kind="purge_done")
+    async with session_factory() as session:
+        first = await TaskJobQueue(session).claim(stale_seconds=60)
+        await session.commit()
+    async with session_factory() as session:
+        # Running with a fresh heartbeat: not claimable
+        assert await TaskJobQueue(session).claim(stale_seconds=60) is None
+        second = await TaskJobQueue(session).claim(stale_seconds=-1)
+        await session.commit()
+    assert (first.id, second.id) == (first.id, first.id)
+    assert second.attempts == first.attempts + 1
+
+    async with session_factory() as session:
+        # The first worker's claim was superseded, so it can't finish the job
+        assert not await TaskJobQueue(session).finish(first, "succeeded")
+        assert await TaskJobQueue(session).finish(second, "succeeded")
+        await session.commit()
+    assert (await fetch_job(db_client, job))["status"] == "succeeded"
+
+
+@pytest.mark.asyncio
+async def test_unknown_job_kind_is_rejected(db_client, jobs):
+    response = await db_client.post(JOBS, json={"kind": "drop_tables"})
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    response = await db_client.get(f"{JOBS}00000000-0000-0000-0000-000000000001")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
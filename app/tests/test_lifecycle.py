@@ -0,0 +1,26 @@
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from app.db.db import warm_up
+
+
+@pytest.mark.asyncio
+async def test_warm_up_fills_the_pool(tmp_path):
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'warm.db'}",
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=3,
+    )
+    await warm_up(engine, 3)
+    assert engine.pool.checkedin() == 3
+    assert engine.pool.checkedout() == 0
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_warm_up_tolerates_unreachable_database(tmp_path):
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'missing' / 'warm.db'}"
+    )
+    await warm_up(engine, 2)
+    await engine.dispose()
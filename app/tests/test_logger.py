@@ -0,0 +1,29 @@
+import json
+import logging
+from app.core.logger import JsonFormatter, SamplingFilter, log_sampled
+
+
+def make_record(level: int) -> logging.LogRecord:
+    return logging.LogRecord("app", level, __file__, 1, "hello %s", ("world",), None)
+
+
+def test_sampling_filter_follows_request_decision():
+    sampling = SamplingFilter(rate=0.5)
+    token = log_sampled.set(False)
+    try:
+        assert not sampling.filter(make_record(logging.INFO))
+        assert sampling.filter(make_record(logging.WARNING))
+    finally:
+        log_sampled.reset(token)
+
+    token = log_sampled.set(True)
+    try:
+        assert sampling.filter(make_record(logging.INFO))
+    finally:
+        log_sampled.reset(token)
+
+
+def test_json_formatter():
+    entry = json.loads(JsonFormatter().format(make_record(logging.INFO)))
+    assert entry["level"] == "INFO"
+    assert entry["message"] == "hello world"
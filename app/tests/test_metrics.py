@@ -0,0 +1,30 @@
+import pytest
+from fastapi import status
+from .constants import HEALTHCHECK, METRICS, TASKS
+
+
+def test_metrics_exposes_route_latency(client):
+    client.get(HEALTHCHECK)
+    response = client.get(METRICS)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert "# TYPE http_request_duration_seconds histogram" in body
+    # Labelled by route template, not by the raw path
+    assert 'route="/healthcheck/",status="200"' in body
+    assert "db_pool_connections" in body
+
+
+@pytest.mark.asyncio
+async def test_server_timing_reports_db_time(db_client):
+    response = await db_client.post(TASKS, json={"title": "Timed", "priority": 1})
+    assert response.status_code == status.HTTP_201_CREATED
+
+    response = await db_client.get(TASKS)
+    timing = dict(
+        part.strip().split(";dur=")
+        for part in response.headers["server-timing"].split(",")
+    )
+    assert set(timing) == {"db", "serialize", "total"}
+    assert float(timing["db"]) > 0
+    assert float(timing["total"]) >= float(timing["db"])
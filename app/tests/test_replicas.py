@@ -0,0 +1,32 @@
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from app.db.replicas import ReplicaSet
+
+
+def factory(url):
+    return sessionmaker(create_async_engine(url), class_=AsyncSession)
+
+
+def test_replicas_round_robin():
+    replicas = ReplicaSet([factory("sqlite+aiosqlite://")] * 3, eject_seconds=30)
+    assert [replicas.healthy()[0] for _ in range(4)] == [0, 1, 2, 0]
+
+
+@pytest.mark.asyncio
+async def test_replicas_eject_unreachable():
+    replicas = ReplicaSet(
+        [
+            factory("sqlite+aiosqlite:////nonexistent/dir/replica.db"),
+            factory("sqlite+aiosqlite://"),
+        ],
+        eject_seconds=30,
+    )
+
+    session = await replicas.connect()
+
+    assert session is not None
+    await session.close()
+    # The broken replica stays out of rotation until the eject window ends
+    assert replicas.healthy() == [1]
+    assert replicas.healthy() == [1]
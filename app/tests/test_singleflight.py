@@ -0,0 +1,80 @@
+import asyncio
+import pytest
+from app.core.singleflight import SingleFlight
+from app.repositories.task_repository import TaskRepository
+from app.services.task_flights import get_task_flights
+from app.main import app
+from .constants import TASKS
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_result():
+    flights, calls = SingleFlight(), 0
+
+    async def load():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "result"
+
+    results = await asyncio.gather(*(flights.do("key", load) for _ in range(5)))
+    assert results == ["result"] * 5
+    assert calls == 1
+    assert flights.stats() == {"leaders": 1, "coalesced": 4}
+    # Finished flights are not reused
+    assert await flights.do("key", load) == "result"
+    assert calls == 2
+
+
+@pytest.mark.asyncio
+async def test_errors_reach_every_caller():
+    flights = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    results = await asyncio.gather(
+        *(flights.do("key", fail) for _ in range(3)), return_exceptions=True
+    )
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+@pytest.mark.asyncio
+async def test_follower_retries_when_leader_is_cancelled():
+    flights = SingleFlight()
+
+    async def load():
+        await asyncio.sleep(0.05)
+        return "result"
+
+    leader = asyncio.create_task(flights.do("key", load))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(flights.do("key", load))
+    await asyncio.sleep(0)
+    leader.cancel()
+    assert await follower == "result"
+
+
+@pytest.mark.asyncio
+async def test_identical_list_requests_share_a_query(db_client, monkeypatch):
+    calls = 0
+    get_tasks = TaskRepository.get_tasks
+
+    async def slow_get_tasks(self, *args, **kwargs):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return await get_tasks(self, *args, **kwargs)
+
+    flights = SingleFlight()
+    app.dependency_overrides[get_task_flights] = lambda: flights
+    monkeypatch.setattr(TaskRepository, "get_tasks", slow_get_tasks)
+    params = {"status_": "undone", "sort": "priority_desc"}
+
+    responses = await asyncio.gather(
+        *(db_client.get(TASKS, params=params) for _ in range(5))
+    )
+    assert all(response.status_code == 200 for response in responses)
+    assert calls == 1
+    assert flights.coalesced >= 4
@@ -0,0 +1,59 @@
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app.core.config import settings
+from app.db.db import session_opener
+from app.models.task import Task
+from app.schemas.task import TaskCreate
+from app.services.task_service import TaskService
+
+TENANT = "sync-order"
+
+
+@pytest.mark.asyncio
+async def test_changes_feed_waits_for_open_transactions():
+    # Concurrent transactions need the real thing, not SQLite's single writer
+    engine = create_async_engine(settings.db.url, poolclass=NullPool)
+    make_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    service = TaskService(session_opener(make_session), TENANT)
+    try:
+        await service.create_task(TaskCreate(title="early", category="early"))
+    except OSError:
+        await engine.dispose()
+        pytest.skip("Postgres unavailable")
+
+    try:
+        changes = await service.list_changes(None, 10)
+        assert [task.title for task in changes.changed] == ["early"]
+        token = changes.next_token
+
+        async with make_session() as slow, make_session() as fast:
+            late = Task(
+                tenant_id=TENANT,
+                title="late",
+                # Its own summary row, which the fast write doesn't wait on
+                category="slow",
+                updated_at=datetime(2000, 1, 1, tzinfo=timezone.utc),
+            )
+            slow.add(late)
+            await slow.flush()
+            fast.add(Task(tenant_id=TENANT, title="fast"))
+            await fast.commit()
+
+            # The fast write is held back too, or its token would pass "late"
+            changes = await service.list_changes(token, 10)
+            assert changes.changed == []
+            await slow.commit()
+
+        changes = await service.list_changes(changes.next_token, 10)
+        assert {task.title for task in changes.changed} == {"late", "fast"}
+    finally:
+        async with make_session() as session:
+            await session.execute(delete(Task).where(Task.tenant_id == TENANT))
+            await session.commit()
+        await engine.dispose()
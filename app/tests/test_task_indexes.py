@@ -0,0 +1,172 @@
+import asyncio
+import itertools
+from datetime import datetime, timezone
+from uuid import uuid4
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.core.config import settings
+from app.repositories.task_repository import SORT_KEYS, TaskRepository
+from app.repositories.task_summary_repository import TaskSummaryRepository
+
+STATUSES = [None, "done", "undone"]
+CATEGORIES = [None, "work"]
+SORTS = [None, *SORT_KEYS]
+SORT_COLUMNS = ["priority", "due_date"]
+AFTER = {
+    None: [uuid4()],
+    "priority_asc": [5, uuid4()],
+    "priority_desc": [5, uuid4()],
+    "due_date_asc": [datetime.now(timezone.utc), uuid4()],
+    "due_date_desc": [datetime.now(timezone.utc), uuid4()],
+}
+
+# Plans of an empty table all just walk the tenant index, so the planner is
+# given the statistics of a realistic spread, in tenants of their own
+PLAN_TENANT = "index-plans"
+SEED = text(
+    "INSERT INTO tasks (id, tenant_id, title, priority, done, due_date, category) "
+    "SELECT gen_random_uuid(), :tenant || ' ' || n % 4, 'task ' || n, "
+    "n % 10 + 1, n % 3 = 0, now() + (n - 20000) * interval '1 minute', "
+    "CASE WHEN n % 47 = 0 THEN 'work' ELSE 'category ' || n % 47 END "
+    "FROM generate_series(1, 40000) AS n"
+)
+CLEANUP = text("DELETE FROM tasks WHERE tenant_id LIKE :tenant || ' %'")
+
+
+async def pg_execute(*statements):
+    # Own engine without a pool: pooled connections can't cross event loops
+    engine = create_async_engine(settings.db.url, poolclass=NullPool)
+    try:
+        async with engine.begin() as conn:
+            # Leaves the summary triggers out of the seed and its cleanup
+            await conn.execute(text("SET LOCAL session_replication_role = replica"))
+            for statement in statements:
+                await conn.execute(statement, {"tenant": PLAN_TENANT})
+    finally:
+        await engine.dispose()
+
+
+@pytest.fixture(scope="module")
+def seeded():
+    try:
+        asyncio.run(pg_execute(CLEANUP, SEED))
+    except OSError:
+        pytest.skip("Postgres unavailable")
+    yield
+    asyncio.run(pg_execute(CLEANUP))
+
+
+@pytest_asyncio.fixture
+async def pg_session(seeded):
+    # Plans are only meaningful against the migrated Postgres schema
+    engine = create_async_engine(settings.db.url, poolclass=NullPool)
+    try:
+        async with AsyncSession(engine) as session:
+            # Tiny tables would otherwise always be scanned sequentially
+            await session.execute(text("SET LOCAL enable_seqscan = off"))
+            # Statistics of every row rather than a random sample, so plans
+            # don't change between runs; in this transaction, so autovacuum
+            # can't replace them meanwhile
+            await session.execute(text("SET LOCAL default_statistics_target = 1000"))
+            await session.execute(text("ANALYZE tasks"))
+            yield session
+            await session.rollback()
+    finally:
+        await engine.dispose()
+
+
+def plan_repo(session) -> TaskRepository:
+    return TaskRepository(session, f"{PLAN_TENANT} 0")
+
+
+async def explain(session, query) -> str:
+    sql = query.compile(
+        dialect=session.bind.dialect, compile_kwargs={"literal_binds": True}
+    )
+    connection = await session.connection()
+    result = await connection.exec_driver_sql(f"EXPLAIN {sql}")
+    return "\n".join(result.scalars().all())
+
+
+def expected_indexes(status, category, sort) -> set:
+    """Indexes (any one of) that must serve the shape, unpartitioned schema.
+
+    Near ties count too: a category's few rows may come off either of its
+    indexes and be sorted, and a status most rows have may just filter the
+    tenant index.
+    """
+    column = SORT_KEYS[sort][0].key if sort else None
+    if category:
+        # Open tasks per category come from the partial NOT done indexes
+        prefix = "open_category" if status == "undone" else "category"
+        return {f"ix_tasks_tenant_{prefix}_{name}_id" for name in SORT_COLUMNS}
+    if status:
+        if column:
+            return {f"ix_tasks_tenant_done_{column}_id"}
+        return {"ix_tasks_tenant_done_id", "ix_tasks_tenant_id"}
+    return {f"ix_tasks_tenant_{column}_id" if column else "ix_tasks_tenant_id"}
+
+
+def assert_uses_index(plan: str, names: set):
+    assert "Seq Scan" not in plan, plan
+    assert any(name in plan for name in names), (names, plan)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "status,category,sort", itertools.product(STATUSES, CATEGORIES, SORTS)
+)
+async def test_list_query_shapes_use_index(pg_session, status, category, sort):
+    repo = plan_repo(pg_session)
+    for after in (None, AFTER[sort]):
+        query = repo.build_query(
+            status=status, category=category, sort=sort, after=after
+        ).limit(50)
+        plan = await explain(pg_session, query)
+        assert_uses_index(plan, expected_indexes(status, category, sort))
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("sort", [None, "relevance"])
+async def test_search_query_shapes_use_index(pg_session, sort):
+    repo = plan_repo(pg_session)
+    query = repo.build_query(search="groceries", sort=sort).limit(50)
+    plan = await explain(pg_session, query)
+    # Both sides of title ILIKE ... OR description ILIKE ..., bitmap-ORed
+    assert_uses_index(plan, {"ix_tasks_title_trgm"})
+    assert_uses_index(plan, {"ix_tasks_description_trgm"})
+
+
+@pytest.mark.asyncio
+async def test_overdue_query_reads_the_open_due_date_range(pg_session):
+    repo = TaskSummaryRepository(pg_session, f"{PLAN_TENANT} 0")
+    query = repo.build_overdue_query(datetime.now(timezone.utc))
+    plan = await explain(pg_session, query)
+    assert_uses_index(plan, {"ix_tasks_tenant_done_due_date_id"})
+
+
+@pytest.mark.asyncio
+async def test_top_per_category_lateral_groups_like_the_window(pg_session, monkeypatch):
+    repo = TaskRepository(pg_session, f"{PLAN_TENANT} top")
+    # Rolled back with the session, summary rows included
+    await pg_session.execute(
+        text(
+            "INSERT INTO tasks (id, tenant_id, title, priority, done, due_date, category) "
+            "SELECT gen_random_uuid(), :tenant, 'task ' || n, n % 3 + 1, false, now(), "
+            "(ARRAY['work', '', NULL])[n % 3 + 1] "
+            "FROM generate_series(1, 12) AS n"
+        ),
+        {"tenant": repo.tenant_id},
+    )
+
+    lateral = await repo.get_top_per_category("priority_asc", 2)
+    monkeypatch.setattr(TaskRepository, "dialect_name", "sqlite")
+    window = await repo.get_top_per_category("priority_asc", 2)
+
+    assert [row.category for row in lateral] == ["", "", "work", "work", None, None]
+    assert lateral == window
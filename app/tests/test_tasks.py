@@ -0,0 +1,471 @@
+import json
+from datetime import datetime, timezone
+from fastapi import status
+import pytest
+from app.core.config import settings
+from app.db.db import READ_YOUR_WRITES_HEADER
+from app.models.task import Task
+from .constants import (
+    HEALTHCHECK_CACHE,
+    TASKS,
+    TASKS_BULK,
+    TASKS_CHANGES,
+    TASKS_EXPORT,
+    TASKS_STATS,
+    TASKS_TOP,
+)
+
+
+async def create_tasks(client, count, **fields):
+    created = []
+    for i in range(count):
+        payload = {"title": f"task {i}", "priority": i % 3 + 1, **fields}
+        response = await client.post(TASKS, json=payload)
+        assert response.status_code == status.HTTP_201_CREATED
+        created.append(response.json())
+    return created
+
+
+async def fetch_all_pages(client, **params):
+    tasks, cursor = [], None
+    while True:
+        query = {**params, **({"cursor": cursor} if cursor else {})}
+        response = await client.get(TASKS, params=query)
+        assert response.status_code == status.HTTP_200_OK
+        body = response.json()
+        tasks.extend(body["tasks"])
+        cursor = body["next_cursor"]
+        if cursor is None:
+            return tasks
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "sort", [None, "priority_asc", "priority_desc", "due_date_asc", "due_date_desc"]
+)
+async def test_list_tasks_keyset_pages(db_client, sort):
+    created = await create_tasks(db_client, 7)
+    params = {"limit": 3, **({"sort": sort} if sort else {})}
+
+    tasks = await fetch_all_pages(db_client, **params)
+
+    assert sorted(t["id"] for t in tasks) == sorted(t["id"] for t in created)
+    if sort and sort.startswith("priority"):
+        priorities = [t["priority"] for t in tasks]
+        assert priorities == sorted(priorities, reverse=sort.endswith("desc"))
+
+
+@pytest.mark.asyncio
+async def test_list_tasks_last_page_has_no_cursor(db_client):
+    await create_tasks(db_client, 2)
+    response = await db_client.get(TASKS, params={"limit": 5})
+    body = response.json()
+    assert len(body["tasks"]) == 2
+    assert body["next_cursor"] is None
+
+
+@pytest.mark.asyncio
+async def test_list_tasks_page_size_is_bounded(db_client):
+    response = await db_client.get(TASKS, params={"limit": 10_000})
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.asyncio
+async def test_list_tasks_rejects_foreign_cursor(db_client):
+    await create_tasks(db_client, 3)
+    response = await db_client.get(TASKS, params={"limit": 1, "sort": "priority_asc"})
+    cursor = response.json()["next_cursor"]
+
+    for params in (
+        {"cursor": cursor, "sort": "due_date_asc"},
+        {"cursor": "not-a-cursor"},
+    ):
+        response = await db_client.get(TASKS, params=params)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.asyncio
+async def test_list_rows_serialize_like_task_out(db_client):
+    # The list is dumped from plain rows; it must match the TaskOut responses
+    created = await create_tasks(db_client, 2, category="work", description="d")
+    response = await db_client.get(TASKS)
+    assert response.headers["content-type"] == "application/json"
+    listed = {task["id"]: task for task in response.json()["tasks"]}
+    for task in created:
+        single = (await db_client.get(f"{TASKS}{task['id']}")).json()
+        assert listed[task["id"]] == single
+
+
+@pytest.mark.asyncio
+async def test_export_tasks_streams_ndjson(db_client):
+    await create_tasks(db_client, 4, category="work")
+    await create_tasks(db_client, 2, category="home")
+
+    response = await db_client.get(TASKS_EXPORT, params={"category": "work"})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert len(rows) == 4
+    assert {row["category"] for row in rows} == {"work"}
+
+
+@pytest.mark.asyncio
+async def test_search_by_relevance_pages_through_matches(db_client):
+    await create_tasks(db_client, 3, description="buy groceries")
+    await create_tasks(db_client, 2, description="call the bank")
+
+    tasks = await fetch_all_pages(db_client, search="grocer", sort="relevance", limit=2)
+
+    assert len(tasks) == 3
+    assert all("groceries" in t["description"] for t in tasks)
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_reports_invalid_items(db_client):
+    items = [{"title": "a"}, {"priority": 3}, {"title": "c", "category": "work"}]
+
+    response = await db_client.post(TASKS_BULK, json=items)
+
+    assert response.status_code == status.HTTP_200_OK
+    body = response.json()
+    assert [t["title"] for t in body["tasks"]] == ["a", "c"]
+    assert [e["index"] for e in body["errors"]] == [1]
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_with_mixed_optional_fields(db_client):
+    items = [
+        {"title": "a"},
+        {"title": "b", "category": "work", "description": "d"},
+        {"title": "c", "category": "home", "priority": None},
+    ]
+
+    response = await db_client.post(TASKS_BULK, json=items)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["errors"] == []
+    stored = {t["title"]: t for t in (await db_client.get(TASKS)).json()["tasks"]}
+    assert [
+        (stored[title]["category"], stored[title]["description"]) for title in "abc"
+    ] == [(None, None), ("work", "d"), ("home", None)]
+    assert stored["c"]["priority"] == 5
+
+
+@pytest.mark.asyncio
+async def test_bulk_update_applies_partial_changes(db_client):
+    first, second = await create_tasks(db_client, 2)
+    missing = "00000000-0000-0000-0000-000000000000"
+    items = [
+        {"id": first["id"], "done": True},
+        {"id": second["id"], "priority": 9, "title": "renamed"},
+        {"id": missing, "done": True},
+    ]
+
+    response = await db_client.patch(TASKS_BULK, json=items)
+
+    body = response.json()
+    updated = {t["id"]: t for t in body["tasks"]}
+    assert updated[first["id"]]["done"] is True
+    assert updated[first["id"]]["title"] == first["title"]
+    assert updated[second["id"]]["priority"] == 9
+    assert body["errors"] == [{"index": 2, "id": missing, "detail": "Task not found"}]
+
+
+@pytest.mark.asyncio
+async def test_bulk_update_rejects_nulls_for_required_fields(db_client):
+    first, second = await create_tasks(db_client, 2)
+    items = [
+        {"id": first["id"], "title": None},
+        {"id": second["id"], "category": None, "priority": 2},
+    ]
+
+    response = await db_client.patch(TASKS_BULK, json=items)
+
+    assert response.status_code == status.HTTP_200_OK
+    body = response.json()
+    assert [t["id"] for t in body["tasks"]] == [second["id"]]
+    assert body["tasks"][0]["category"] is None
+    assert [(e["index"], e["id"]) for e in body["errors"]] == [(0, first["id"])]
+    assert "title" in body["errors"][0]["detail"]
+
+
+@pytest.mark.asyncio
+async def test_bulk_delete_reports_missing_ids(db_client):
+    first, second = await create_tasks(db_client, 2)
+    missing = "00000000-0000-0000-0000-000000000000"
+
+    response = await db_client.request(
+        "DELETE", TASKS_BULK, json={"ids": [first["id"], missing]}
+    )
+
+    body = response.json()
+    assert body["deleted"] == [first["id"]]
+    assert [e["id"] for e in body["errors"]] == [missing]
+    remaining = await fetch_all_pages(db_client)
+    assert [t["id"] for t in remaining] == [second["id"]]
+
+
+@pytest.mark.asyncio
+async def test_mark_done_and_priority_return_updated_task(db_client):
+    (task,) = await create_tasks(db_client, 1)
+
+    response = await db_client.patch(f"{TASKS}{task['id']}/done", json={"done": True})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["done"] is True
+
+    response = await db_client.patch(
+        f"{TASKS}{task['id']}/priority", json={"priority": 8}
+    )
+    body = response.json()
+    assert (body["id"], body["done"], body["priority"]) == (task["id"], True, 8)
+
+
+@pytest.mark.asyncio
+async def test_update_and_delete_missing_task_return_404(db_client):
+    missing = "00000000-0000-0000-0000-000000000000"
+
+    response = await db_client.patch(f"{TASKS}{missing}/done", json={"done": True})
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    response = await db_client.delete(f"{TASKS}{missing}")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.asyncio
+async def test_delete_task(db_client):
+    (task,) = await create_tasks(db_client, 1)
+
+    response = await db_client.delete(f"{TASKS}{task['id']}")
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    response = await db_client.get(f"{TASKS}{task['id']}")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.asyncio
+async def test_cached_reads_are_invalidated_by_writes(db_client):
+    (task,) = await create_tasks(db_client, 1)
+
+    first = await db_client.get(TASKS)
+    second = await db_client.get(TASKS)
+    assert first.json() == second.json()
+    stats = (await db_client.get(HEALTHCHECK_CACHE)).json()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+    await db_client.patch(f"{TASKS}{task['id']}/done", json={"done": True})
+
+    response = await db_client.get(TASKS)
+    assert response.json()["tasks"][0]["done"] is True
+    response = await db_client.get(f"{TASKS}{task['id']}")
+    assert response.json()["done"] is True
+
+
+@pytest.mark.asyncio
+async def test_read_your_writes_skips_the_cache(db_client, session_factory):
+    await db_client.get(TASKS)
+    # Written behind the cache's back, as by a page cached off a lagging replica
+    async with session_factory() as session:
+        session.add(Task(tenant_id=settings.default_tenant, title="unseen"))
+        await session.commit()
+
+    assert (await db_client.get(TASKS)).json()["tasks"] == []
+    response = await db_client.get(TASKS, headers={READ_YOUR_WRITES_HEADER: "1"})
+    assert [task["title"] for task in response.json()["tasks"]] == ["unseen"]
+
+
+@pytest.mark.asyncio
+async def test_list_etag_returns_304_until_data_changes(db_client):
+    (task,) = await create_tasks(db_client, 1)
+    etag = (await db_client.get(TASKS)).headers["etag"]
+
+    response = await db_client.get(TASKS, headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    await db_client.patch(f"{TASKS}{task['id']}/priority", json={"priority": 2})
+    response = await db_client.get(TASKS, headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["etag"] != etag
+
+    # Only the page's own rows matter: a task on another page doesn't
+    etag = (await db_client.get(TASKS, params={"category": "home"})).headers["etag"]
+    await create_tasks(db_client, 1, category="work")
+    response = await db_client.get(
+        TASKS, params={"category": "home"}, headers={"If-None-Match": etag}
+    )
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+
+@pytest.mark.asyncio
+async def test_task_etag_follows_version(db_client):
+    (task,) = await create_tasks(db_client, 1)
+    url = f"{TASKS}{task['id']}"
+    etag = (await db_client.get(url)).headers["etag"]
+
+    response = await db_client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    await db_client.patch(f"{url}/done", json={"done": True})
+    response = await db_client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["version"] == task["version"] + 1
+
+
+@pytest.mark.asyncio
+async def test_changes_feed_reports_updates_and_deletions(db_client):
+    kept, updated, deleted = await create_tasks(db_client, 3)
+
+    snapshot = (await db_client.get(TASKS_CHANGES)).json()
+    assert {t["id"] for t in snapshot["changed"]} == {
+        kept["id"],
+        updated["id"],
+        deleted["id"],
+    }
+
+    await db_client.patch(f"{TASKS}{updated['id']}/done", json={"done": True})
+    await db_client.delete(f"{TASKS}{deleted['id']}")
+
+    params = {"since": snapshot["next_token"]}
+    changes = (await db_client.get(TASKS_CHANGES, params=params)).json()
+    assert [t["id"] for t in changes["changed"]] == [updated["id"]]
+    assert changes["deleted"] == [deleted["id"]]
+
+    params = {"since": changes["next_token"]}
+    changes = (await db_client.get(TASKS_CHANGES, params=params)).json()
+    assert (changes["changed"], changes["deleted"]) == ([], [])
+
+
+@pytest.mark.asyncio
+async def test_changes_feed_orders_by_commit_not_clock(db_client, session_factory):
+    await create_tasks(db_client, 1)
+    token = (await db_client.get(TASKS_CHANGES)).json()["next_token"]
+
+    # Stamped long before the token was issued, as by a slow transaction
+    async with session_factory() as session:
+        late = Task(
+            tenant_id=settings.default_tenant,
+            title="late",
+            updated_at=datetime(2000, 1, 1, tzinfo=timezone.utc),
+        )
+        session.add(late)
+        await session.commit()
+
+    changes = (await db_client.get(TASKS_CHANGES, params={"since": token})).json()
+    assert [t["id"] for t in changes["changed"]] == [str(late.id)]
+
+
+@pytest.mark.asyncio
+async def test_stats_counts_by_category_priority_and_overdue(db_client):
+    await create_tasks(db_client, 3, category="work", due_date="2000-01-01T00:00:00")
+    await create_tasks(db_client, 1, due_date="2999-01-01T00:00:00")
+    done = (await create_tasks(db_client, 1, category="work"))[0]
+    await db_client.patch(f"{TASKS}{done['id']}/done", json={"done": True})
+
+    response = await db_client.get(TASKS_STATS)
+    assert response.status_code == status.HTTP_200_OK
+    stats = response.json()
+    assert (stats["total"], stats["done"], stats["open"]) == (5, 1, 4)
+    assert stats["done_ratio"] == pytest.approx(0.2)
+    assert stats["overdue"] == 3
+    assert stats["categories"] == [
+        {"category": None, "total": 1, "done": 0, "open": 1, "overdue": 0},
+        {"category": "work", "total": 4, "done": 1, "open": 3, "overdue": 3},
+    ]
+    assert sum(p["total"] for p in stats["priorities"]) == 5
+
+
+@pytest.mark.asyncio
+async def test_top_tasks_are_limited_in_sort_order(db_client):
+    tasks = await create_tasks(db_client, 9)
+    await db_client.patch(f"{TASKS}{tasks[2]['id']}/done", json={})
+
+    response = await db_client.get(
+        TASKS_TOP, params={"sort": "priority_desc", "limit": 3, "status_": "undone"}
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    top = response.json()["tasks"]
+    # Priority 3 tasks are 2, 5 and 8; 2 is done, so one priority 2 task follows
+    expected = sorted(
+        (t for t in tasks if t["priority"] == 3 and t is not tasks[2]),
+        key=lambda t: t["id"],
+        reverse=True,
+    )
+    assert [t["id"] for t in top[:2]] == [t["id"] for t in expected]
+    assert [t["priority"] for t in top] == [3, 3, 2]
+
+
+@pytest.mark.asyncio
+async def test_top_tasks_per_category(db_client):
+    await create_tasks(db_client, 4, category="work")
+    await create_tasks(db_client, 3, category="home")
+    await create_tasks(db_client, 1, category="")
+    await create_tasks(db_client, 1)
+
+    response = await db_client.get(
+        TASKS_TOP, params={"sort": "priority_asc", "limit": 2, "per_category": True}
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    top = response.json()["tasks"]
+    assert [(t["category"], t["priority"]) for t in top] == [
+        ("", 1),
+        ("home", 1),
+        ("home", 2),
+        ("work", 1),
+        ("work", 1),
+        (None, 1),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_top_tasks_per_category_applies_category(db_client):
+    await create_tasks(db_client, 4, category="work")
+    await create_tasks(db_client, 3, category="home")
+
+    response = await db_client.get(
+        TASKS_TOP,
+        params={"limit": 2, "category": "home", "per_category": True},
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [t["category"] for t in response.json()["tasks"]] == ["home", "home"]
+
+
+@pytest.mark.asyncio
+async def test_top_tasks_rejects_unknown_sort(db_client):
+    response = await db_client.get(TASKS_TOP, params={"sort": "relevance"})
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.asyncio
+async def test_tenants_only_see_their_own_tasks(db_client):
+    acme, globex = {"X-Tenant-ID": "acme"}, {"X-Tenant-ID": "globex"}
+    task = (await db_client.post(TASKS, json={"title": "a"}, headers=acme)).json()
+    await db_client.post(TASKS, json={"title": "g", "category": "x"}, headers=globex)
+
+    listed = (await db_client.get(TASKS, headers=acme)).json()["tasks"]
+    assert [t["id"] for t in listed] == [task["id"]]
+    assert (await db_client.get(TASKS)).json()["tasks"] == []
+    stats = (await db_client.get(TASKS_STATS, headers=globex)).json()
+    assert stats["total"] == 1
+
+    # Other tenants can neither read nor change the task
+    path = f"{TASKS}{task['id']}"
+    assert (await db_client.get(path, headers=globex)).status_code == 404
+    response = await db_client.patch(
+        f"{path}/done", json={"done": True}, headers=globex
+    )
+    assert response.status_code == 404
+    assert (await db_client.delete(path, headers=globex)).status_code == 404
+    result = (
+        await db_client.request(
+            "DELETE", TASKS_BULK, json={"ids": [task["id"]]}, headers=globex
+        )
+    ).json()
+    assert result["deleted"] == []
+    assert (await db_client.get(path, headers=acme)).json()["done"] is False
+
+
+@pytest.mark.asyncio
+async def test_invalid_tenant_header_is_rejected(db_client):
+    response = await db_client.get(TASKS, headers={"X-Tenant-ID": "a b"})
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
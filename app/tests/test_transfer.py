@@ -0,0 +1,140 @@
+import csv
+import io
+import json
+from uuid import uuid4
+import pytest
+from fastapi import status
+from app.core.config import settings
+from app.utils.records import RecordError, read_csv, read_ndjson
+from .constants import TASKS, TASKS_BULK, TASKS_CHANGES, TASKS_EXPORT, TASKS_IMPORT
+
+
+async def chunked(data: bytes, size: int):
+    for start in range(0, len(data), size):
+        yield data[start : start + size]
+
+
+def rows(data: bytes):
+    return list(csv.reader(io.StringIO(data.decode())))
+
+
+@pytest.mark.asyncio
+async def test_read_csv_across_chunk_boundaries():
+    data = 'title,description,done\n"a, b","two\nlines",t\nc,,f\nd\n'.encode()
+    records = [record async for record in read_csv(chunked(data, 3))]
+    assert records[:2] == [
+        {"title": "a, b", "description": "two\nlines", "done": "t"},
+        {"title": "c", "done": "f"},
+    ]
+    assert isinstance(records[2], RecordError)
+
+
+@pytest.mark.asyncio
+async def test_read_ndjson_reports_bad_lines():
+    data = '{"title": "é"}\n\nnot json\n{"title": "x"}'.encode()
+    records = [record async for record in read_ndjson(chunked(data, 5))]
+    assert records[0] == {"title": "é"}
+    assert isinstance(records[1], RecordError)
+    assert records[2] == {"title": "x"}
+
+
+@pytest.mark.asyncio
+async def test_records_keep_unicode_line_separators_in_values():
+    data = '{"title": "a\x85b\u2028c"}\n{"title": "d"}\n'.encode()
+    records = [record async for record in read_ndjson(chunked(data, 4))]
+    assert records == [{"title": "a\x85b\u2028c"}, {"title": "d"}]
+
+    data = "title,description\na,b\x0cc\n".encode()
+    records = [record async for record in read_csv(chunked(data, 4))]
+    assert records == [{"title": "a", "description": "b\x0cc"}]
+
+
+@pytest.mark.asyncio
+async def test_import_ndjson_in_batches(db_client, monkeypatch):
+    monkeypatch.setattr(settings, "import_batch_size", 3)
+    lines = [{"title": f"t{i}", "priority": i} for i in range(7)]
+    lines.insert(3, {"priority": 1})
+    body = "\n".join(json.dumps(line) for line in lines).encode()
+
+    response = await db_client.post(TASKS_IMPORT, content=body)
+    assert response.status_code == status.HTTP_200_OK
+    result = response.json()
+    assert (result["created"], result["rejected"]) == (7, 1)
+    assert result["errors"][0]["index"] == 3
+
+    tasks = (await db_client.get(TASKS, params={"limit": 20})).json()["tasks"]
+    assert sorted(task["title"] for task in tasks) == [f"t{i}" for i in range(7)]
+
+
+@pytest.mark.asyncio
+async def test_csv_export_imports_back(db_client):
+    first = {"title": "a, b", "description": "p\x0cq", "done": True, "priority": 2}
+    await db_client.post(TASKS, json=first)
+    await db_client.post(TASKS, json={"title": "c", "description": "x\ny"})
+
+    response = await db_client.get(TASKS_EXPORT, params={"format": "csv"})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/csv")
+    exported = response.content
+    assert exported.startswith(b"title,description,priority,done,due_date,")
+
+    # The ids are still taken
+    response = await db_client.post(
+        TASKS_IMPORT, params={"format": "csv"}, content=exported
+    )
+    assert (response.json()["created"], response.json()["rejected"]) == (0, 2)
+
+    for task in (await db_client.get(TASKS)).json()["tasks"]:
+        await db_client.delete(f"{TASKS}{task['id']}")
+    response = await db_client.post(
+        TASKS_IMPORT, params={"format": "csv"}, content=exported
+    )
+    assert response.json() == {"created": 2, "rejected": 0, "errors": []}
+    response = await db_client.get(TASKS_EXPORT, params={"format": "csv"})
+    # All but updated_at, which the import sets
+    assert [row[:-1] for row in rows(response.content)] == [
+        row[:-1] for row in rows(exported)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_import_skips_taken_ids_row_by_row(db_client):
+    other = {"X-Tenant-ID": "other"}
+    taken = (await db_client.post(TASKS, json={"title": "a"}, headers=other)).json()
+    repeated = str(uuid4())
+    lines = [
+        {"title": "new"},
+        {"id": taken["id"], "title": "taken by another tenant"},
+        {"id": repeated, "title": "first"},
+        {"id": repeated, "title": "repeat"},
+    ]
+    body = "\n".join(json.dumps(line) for line in lines).encode()
+
+    result = (await db_client.post(TASKS_IMPORT, content=body)).json()
+    assert (result["created"], result["rejected"]) == (2, 2)
+    assert [(e["index"], e["id"]) for e in result["errors"]] == [
+        (1, taken["id"]),
+        (3, repeated),
+    ]
+    tasks = (await db_client.get(TASKS)).json()["tasks"]
+    assert sorted(task["title"] for task in tasks) == ["first", "new"]
+
+
+@pytest.mark.asyncio
+async def test_reimported_task_can_be_deleted_again(db_client):
+    task = (await db_client.post(TASKS, json={"title": "a"})).json()
+    line = json.dumps({"id": task["id"], "title": "a"}).encode()
+    token = (await db_client.get(TASKS_CHANGES)).json()["next_token"]
+
+    await db_client.delete(f"{TASKS}{task['id']}")
+    assert (await db_client.post(TASKS_IMPORT, content=line)).json()["created"] == 1
+    response = await db_client.delete(f"{TASKS}{task['id']}")
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+
+    # Bulk deletes (and the purge job) record tombstones the same way
+    assert (await db_client.post(TASKS_IMPORT, content=line)).json()["created"] == 1
+    response = await db_client.request("DELETE", TASKS_BULK, json={"ids": [task["id"]]})
+    assert response.json()["deleted"] == [task["id"]]
+
+    changes = (await db_client.get(TASKS_CHANGES, params={"since": token})).json()
+    assert (changes["changed"], changes["deleted"]) == ([], [task["id"]])
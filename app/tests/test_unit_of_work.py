@@ -0,0 +1,41 @@
+import pytest
+from app.db.db import session_opener
+from app.repositories.task_repository import TaskRepository
+from app.repositories.task_tombstone_repository import TaskTombstoneRepository
+from app.repositories.unit_of_work import UnitOfWork
+from app.schemas.task import TaskCreate
+
+
+def make_uow(session_factory) -> UnitOfWork:
+    return UnitOfWork(
+        session_opener(session_factory),
+        {"tasks": TaskRepository, "tombstones": TaskTombstoneRepository},
+        tenant_id="default",
+    )
+
+
+@pytest.mark.asyncio
+async def test_repositories_are_built_on_first_use(session_factory):
+    uow = make_uow(session_factory)
+    async with uow.read():
+        assert "tasks" not in vars(uow)
+        assert uow.tasks is uow.tasks
+        assert "tombstones" not in vars(uow)
+
+    # Bound to the closed session, so dropped with it
+    assert "tasks" not in vars(uow)
+    with pytest.raises(RuntimeError):
+        uow.tasks
+
+
+@pytest.mark.asyncio
+async def test_read_blocks_never_commit(session_factory):
+    uow = make_uow(session_factory)
+    async with uow.read():
+        await uow.tasks.create_task(TaskCreate(title="discarded"))
+    async with uow:
+        await uow.tasks.create_task(TaskCreate(title="kept"))
+
+    async with uow.read():
+        titles = [task.title for task in await uow.tasks.get_all()]
+    assert titles == ["kept"]
@@ -0,0 +1,43 @@
+import asyncio
+import pytest
+from fastapi import status
+from app.main import app
+from app.services.task_writes import get_task_writes
+from app.services.write_behind import WriteBehindQueue
+from .constants import TASKS
+
+
+@pytest.mark.asyncio
+async def test_toggles_are_flushed_in_one_batch(db_client, session_factory):
+    writes = WriteBehindQueue(session_factory, max_delay=0.05, max_items=100)
+    app.dependency_overrides[get_task_writes] = lambda: writes
+    first = (await db_client.post(TASKS, json={"title": "a"})).json()
+    second = (await db_client.post(TASKS, json={"title": "b"})).json()
+
+    responses = await asyncio.gather(
+        *(
+            db_client.patch(f"{TASKS}{first['id']}/done", json={"done": i % 2 == 0})
+            for i in range(5)
+        ),
+        db_client.patch(f"{TASKS}{second['id']}/priority", json={"priority": 9}),
+    )
+
+    assert all(response.status_code == status.HTTP_200_OK for response in responses)
+    # One value wins, and every caller sees the same committed row
+    task = (await db_client.get(f"{TASKS}{first['id']}")).json()
+    assert [response.json() for response in responses[:5]] == [task] * 5
+    assert responses[5].json()["priority"] == 9
+    assert writes.stats() == {"updates": 6, "rows": 2, "flushes": 1}
+
+
+@pytest.mark.asyncio
+async def test_batch_flushes_early_and_reports_missing_tasks(
+    db_client, session_factory
+):
+    writes = WriteBehindQueue(session_factory, max_delay=10, max_items=1)
+    app.dependency_overrides[get_task_writes] = lambda: writes
+    missing = "00000000-0000-0000-0000-000000000001"
+
+    response = await db_client.patch(f"{TASKS}{missing}/done", json={"done": True})
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    await writes.stop()
@@ -0,0 +1,81 @@
+import argparse
+import asyncio
+import sys
+from typing import AsyncIterator, BinaryIO
+
+from app.core.config import settings
+from app.core.logger import AppLogger
+from app.db.db import engine, open_session
+from app.services.task_cache import task_cache
+from app.services.task_events import task_events
+from app.services.task_service import TaskService
+from app.utils.records import read_csv, read_ndjson
+
+logger = AppLogger().get_logger()
+
+READ_CHUNK_BYTES = 1 << 20
+
+
+async def read_file(file: BinaryIO) -> AsyncIterator[bytes]:
+    while chunk := await asyncio.to_thread(file.read, READ_CHUNK_BYTES):
+        yield chunk
+
+
+def open_file(path: str, mode: str) -> BinaryIO:
+    if path == "-":
+        return sys.stdin.buffer if "r" in mode else sys.stdout.buffer
+    return open(path, mode)
+
+
+async def import_tasks(args: argparse.Namespace):
+    service = TaskService(open_session, args.tenant, task_cache, events=task_events)
+    read = read_csv if args.format == "csv" else read_ndjson
+    with open_file(args.file, "rb") as file:
+        result = await service.import_tasks(read(read_file(file)), args.batch_size)
+    logger.info("Created %d tasks, rejected %d", result.created, result.rejected)
+    for error in result.errors:
+        logger.warning("Row %d: %s", error.index, error.detail)
+
+
+async def export_tasks(args: argparse.Namespace):
+    service = TaskService(open_session, args.tenant)
+    if args.format == "csv":
+        chunks = service.export_csv(args.search, args.status, args.sort, args.category)
+    else:
+        chunks = service.export_tasks(
+            args.search, args.status, args.sort, args.category
+        )
+    with open_file(args.file, "wb") as file:
+        async for chunk in chunks:
+            line = chunk if args.format == "csv" else chunk + b"\n"
+            await asyncio.to_thread(file.write, line)
+
+
+async def main(args: argparse.Namespace):
+    try:
+        await args.run(args)
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m app.transfer")
+    commands = parser.add_subparsers(required=True)
+
+    importer = commands.add_parser("import", help="Load tasks from a file")
+    importer.set_defaults(run=import_tasks)
+    importer.add_argument("--batch-size", type=int, default=settings.import_batch_size)
+
+    exporter = commands.add_parser("export", help="Write tasks to a file")
+    exporter.set_defaults(run=export_tasks)
+    exporter.add_argument("--search")
+    exporter.add_argument("--status", choices=["done", "undone"])
+    exporter.add_argument("--sort")
+    exporter.add_argument("--category")
+
+    for command in (importer, exporter):
+        command.add_argument("file", help="Path, or - for stdin/stdout")
+        command.add_argument("--tenant", default=settings.default_tenant)
+        command.add_argument("--format", choices=["csv", "ndjson"], default="csv")
+
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,21 @@
+import hashlib
+import json
+from typing import Any, Optional
+
+
+def make_etag(*parts: Any) -> str:
+    raw = json.dumps(parts, default=str, separators=(",", ":")).encode()
+    return f'"{hashlib.sha1(raw).hexdigest()}"'
+
+
+def body_etag(body: bytes) -> str:
+    # Strong validator of the exact representation, e.g. a list page
+    return f'"{hashlib.sha1(body).hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    # Weak comparison, as If-None-Match requires (RFC 9110 13.1.2)
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
@@ -0,0 +1,24 @@
+import base64
+import json
+from typing import Any, List
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(values: List[Any]) -> str:
+    # Opaque to clients: url-safe base64 of a compact JSON array
+    raw = json.dumps(values, default=str, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> List[Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded))
+    except ValueError as e:
+        raise InvalidCursor("Malformed cursor") from e
+    if not isinstance(values, list):
+        raise InvalidCursor("Malformed cursor")
+    return values
@@ -0,0 +1,66 @@
+import codecs
+import csv
+import json
+from typing import Any, AsyncIterator, Dict, List, Union
+
+
+class RecordError(str):
+    """Yielded in place of a record that couldn't be parsed."""
+
+
+Record = Union[Dict[str, Any], RecordError]
+
+
+async def read_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """UTF-8 lines (with their line break) from arbitrarily split chunks."""
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    pending = ""
+    async for chunk in chunks:
+        # Only "\n" ends a line: str.splitlines also breaks on \x0c, \x85,
+        # U+2028 and the like, which are valid inside values. The last piece
+        # may continue in the next chunk
+        *lines, pending = (pending + decoder.decode(chunk)).split("\n")
+        for line in lines:
+            yield line + "\n"
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+async def read_ndjson(chunks: AsyncIterator[bytes]) -> AsyncIterator[Record]:
+    async for line in read_lines(chunks):
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as e:
+            yield RecordError(f"Invalid JSON: {e}")
+
+
+async def read_csv(chunks: AsyncIterator[bytes]) -> AsyncIterator[Record]:
+    """Rows keyed by the header's column names, as written by COPY ... CSV
+    HEADER. Empty fields are left out, so they fall back to defaults."""
+    header = None
+    lines: List[str] = []
+    async for line in read_lines(chunks):
+        lines.append(line)
+        # A quoted field may span lines; the record ends on balanced quotes
+        if sum(part.count('"') for part in lines) % 2:
+            continue
+        record, lines = lines, []
+        try:
+            values = next(csv.reader(record, strict=True), [])
+        except csv.Error as e:
+            yield RecordError(f"Invalid CSV: {e}")
+            continue
+        if not values:
+            continue
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        if len(values) != len(header):
+            yield RecordError(f"Expected {len(header)} fields, got {len(values)}")
+            continue
+        yield {name: value for name, value in zip(header, values) if value != ""}
+    if lines:
+        yield RecordError("Invalid CSV: unterminated quoted field")
@@ -0,0 +1,123 @@
+"""Load benchmark for the task API.
+
+Seeds a database, drives every /tasks scenario in-process through
+httpx's ASGITransport and compares the results against a stored baseline:
+
+    python -m benchmarks --tasks 100000 --concurrency 16
+    python -m benchmarks --database-url postgresql+asyncpg://... --update-baseline
+
+Point --database-url at a throwaway database: the tasks table is rewritten.
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+import tempfile
+from pathlib import Path
+
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.cache import InMemoryCache
+from app.db.instrumentation import instrument_engine
+from app.services.task_cache import TaskCache
+from benchmarks.runner import (
+    Runner,
+    compare,
+    format_report,
+    load_baseline,
+    save_baseline,
+)
+from benchmarks.scenarios import READ_SCENARIOS, SCENARIOS
+from benchmarks.seed import seed_tasks
+
+BASELINE = Path(__file__).with_name("baseline.json")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument(
+        "--database-url",
+        default=f"sqlite+aiosqlite:///{Path(tempfile.gettempdir()) / 'todo-bench.sqlite3'}",
+        help="Database to seed and benchmark (default: a SQLite file)",
+    )
+    parser.add_argument("--tasks", type=int, default=10_000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200, help="per scenario")
+    parser.add_argument(
+        "--tenants", type=int, default=1, help="spread the tasks over this many"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--scenario", action="append", help="run only these")
+    parser.add_argument("--read-only", action="store_true", help="skip writes")
+    parser.add_argument("--cache", action="store_true", help="enable the task cache")
+    parser.add_argument(
+        "--write-behind", action="store_true", help="batch done/priority updates"
+    )
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="allowed relative throughput/p95 regression (query counts: none, "
+        "except in coalesced scenarios)",
+    )
+    return parser.parse_args(argv)
+
+
+async def main(args) -> int:
+    # Per-request INFO logs would dominate the timings
+    logging.getLogger("app").setLevel(logging.WARNING)
+
+    options = {}
+    if args.database_url.startswith("sqlite"):
+        options["connect_args"] = {"timeout": 30}
+    else:
+        options["pool_size"] = args.concurrency
+    engine = instrument_engine(create_async_engine(args.database_url, **options))
+
+    scenarios = READ_SCENARIOS if args.read_only else SCENARIOS
+    if args.scenario:
+        scenarios = [s for s in scenarios if s.name in args.scenario]
+
+    try:
+        if await seed_tasks(engine, args.tasks, args.seed, args.tenants):
+            print(f"Seeded {args.tasks} tasks", file=sys.stderr)
+        cache = TaskCache(InMemoryCache(), ttl=30) if args.cache else None
+        runner = Runner(
+            engine, args.concurrency, args.requests, cache, args.write_behind
+        )
+        results = await runner.run(scenarios)
+    finally:
+        await engine.dispose()
+
+    print(format_report(results))
+    config = {
+        "dialect": engine.dialect.name,
+        "tasks": args.tasks,
+        "tenants": args.tenants,
+        "concurrency": args.concurrency,
+        "requests": args.requests,
+        "cache": args.cache,
+        "write_behind": args.write_behind,
+    }
+    if args.update_baseline:
+        save_baseline(args.baseline, config, results)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    if baseline is None:
+        return 0
+    if baseline["config"] != config:
+        print(f"Baseline config {baseline['config']} differs, not comparing")
+        return 0
+    regressions = compare(baseline, results, args.tolerance)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(parse_args())))
@@ -0,0 +1,187 @@
+import asyncio
+import json
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.core.events import Broadcaster, InMemoryBroker, PostgresBroker
+from app.core.metrics import db_queries_per_request
+from app.core.singleflight import SingleFlight
+from app.db.db import get_session_factory, session_opener
+from app.main import app
+from app.models.task import Task
+from app.services.task_cache import get_task_cache
+from app.services.task_events import get_task_events
+from app.services.task_flights import get_task_flights
+from app.services.task_writes import get_task_writes
+from app.services.write_behind import WriteBehindQueue
+from benchmarks.scenarios import Context, Scenario
+
+# Metrics compared against the baseline; True means higher is better
+COMPARED = {"throughput": True, "p95_ms": False, "queries_per_request": False}
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class Runner:
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        concurrency: int,
+        requests: int,
+        cache,
+        write_behind: bool = False,
+    ):
+        self.engine = engine
+        self.concurrency = concurrency
+        self.requests = requests
+        self.cache = cache
+        # Set per scenario, see Scenario.coalesced
+        self.flights: Optional[SingleFlight] = None
+        self.session_factory = sessionmaker(
+            engine, class_=AsyncSession, expire_on_commit=False, autoflush=False
+        )
+        # Writes pay for NOTIFY on Postgres; nothing listens during the run
+        self.events = (
+            PostgresBroker(Broadcaster(100), dsn="")
+            if engine.dialect.name == "postgresql"
+            else InMemoryBroker(Broadcaster(100))
+        )
+        self.writes = (
+            WriteBehindQueue(
+                self.session_factory,
+                max_delay=0.01,
+                max_items=200,
+                events=self.events,
+            )
+            if write_behind
+            else None
+        )
+
+    async def run(self, scenarios: List[Scenario]) -> Dict[str, dict]:
+        open_session = session_opener(self.session_factory)
+        app.dependency_overrides[get_session_factory] = lambda: open_session
+        app.dependency_overrides[get_task_cache] = lambda: self.cache
+        app.dependency_overrides[get_task_flights] = lambda: self.flights
+        app.dependency_overrides[get_task_writes] = lambda: self.writes
+        app.dependency_overrides[get_task_events] = lambda: self.events
+        try:
+            transport = ASGITransport(app=app)
+            async with AsyncClient(
+                transport=transport, base_url="http://bench"
+            ) as client:
+                context = await self._context()
+                return {
+                    scenario.name: await self._run_scenario(client, context, scenario)
+                    for scenario in scenarios
+                }
+        finally:
+            app.dependency_overrides.clear()
+
+    async def _context(self) -> Context:
+        async with self.session_factory() as session:
+            ids = await session.scalars(select(Task.id).order_by(Task.id).limit(1000))
+            return Context(task_ids=[str(task_id) for task_id in ids])
+
+    async def _run_scenario(
+        self, client: AsyncClient, context: Context, scenario: Scenario
+    ) -> dict:
+        self.flights = SingleFlight() if scenario.coalesced else None
+        params = dict(scenario.params)
+        if scenario.paged:
+            first = await client.get(scenario.path, params=params)
+            params["cursor"] = first.json()["next_cursor"]
+
+        latencies, errors = [], 0
+        counter = iter(range(self.requests))
+
+        async def worker():
+            nonlocal errors
+            for n in counter:
+                started = time.perf_counter()
+                response = await client.request(
+                    scenario.method,
+                    scenario.url(context, n),
+                    params=params,
+                    json=scenario.body(context, n) if scenario.body else None,
+                )
+                await response.aread()
+                latencies.append(time.perf_counter() - started)
+                if response.status_code >= 400:
+                    errors += 1
+
+        queries_before = db_queries_per_request.totals()
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+        elapsed = time.perf_counter() - started
+        requests, queries = (
+            after - before
+            for after, before in zip(db_queries_per_request.totals(), queries_before)
+        )
+
+        return {
+            "requests": len(latencies),
+            "errors": errors,
+            "throughput": round(len(latencies) / elapsed, 1),
+            "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+            "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+            "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+            "queries_per_request": round(queries / requests, 2) if requests else 0.0,
+            "coalesced": scenario.coalesced,
+        }
+
+
+def format_report(results: Dict[str, dict]) -> str:
+    columns = ["throughput", "p50_ms", "p95_ms", "p99_ms", "queries_per_request"]
+    header = f"{'scenario':<32}" + "".join(f"{c:>20}" for c in columns)
+    lines = [header, "-" * len(header)]
+    for name, result in results.items():
+        errors = f"  ({result['errors']} errors)" if result["errors"] else ""
+        lines.append(
+            f"{name:<32}" + "".join(f"{result[c]:>20}" for c in columns) + errors
+        )
+    return "\n".join(lines)
+
+
+def load_baseline(path: Path) -> Optional[dict]:
+    return json.loads(path.read_text()) if path.exists() else None
+
+
+def save_baseline(path: Path, config: dict, results: Dict[str, dict]):
+    path.write_text(json.dumps({"config": config, "results": results}, indent=2) + "\n")
+
+
+def compare(baseline: dict, results: Dict[str, dict], tolerance: float) -> List[str]:
+    """Returns one line per metric that regressed by more than `tolerance`,
+    and one per scenario the baseline doesn't have yet."""
+    regressions = []
+    for name, result in results.items():
+        reference = baseline["results"].get(name)
+        if reference is None:
+            # Would go unchecked for good: refresh the baseline
+            regressions.append(f"{name}: not in the baseline")
+            continue
+        if result["errors"] > reference["errors"]:
+            regressions.append(f"{name}: {result['errors']} errors")
+        for metric, higher_is_better in COMPARED.items():
+            old, new = reference[metric], result[metric]
+            # Query counts are deterministic without single-flight, so any
+            # increase is a regression
+            exact = metric == "queries_per_request" and not result["coalesced"]
+            allowed = 0 if exact else tolerance
+            if higher_is_better:
+                regressed = new < old * (1 - allowed)
+            else:
+                regressed = new > old * (1 + allowed)
+            if regressed:
+                regressions.append(f"{name}: {metric} {old} -> {new}")
+    return regressions
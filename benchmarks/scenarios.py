@@ -0,0 +1,128 @@
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from benchmarks.seed import CATEGORIES, WORDS
+
+
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    path: str
+    params: Dict[str, Any] = field(default_factory=dict)
+    # Builds the JSON body for one request from the benchmark context
+    body: Optional[Callable[["Context", int], Any]] = None
+    # Resolves placeholders such as {task_id} in the path
+    path_args: Optional[Callable[["Context", int], Dict[str, Any]]] = None
+    writes: bool = False
+    # Requests the second page, using a cursor fetched once before the run
+    paged: bool = False
+    # Concurrent identical reads share one query, so the query count depends
+    # on timing; every other scenario runs without single-flight
+    coalesced: bool = False
+
+    def url(self, context: "Context", n: int) -> str:
+        if self.path_args is None:
+            return self.path
+        return self.path.format(**self.path_args(context, n))
+
+
+@dataclass
+class Context:
+    """Data discovered at run time that scenarios pick from."""
+
+    task_ids: List[str]
+
+    def task_id(self, n: int) -> str:
+        return self.task_ids[n % len(self.task_ids)]
+
+
+def _task_path(context: Context, n: int) -> Dict[str, Any]:
+    return {"task_id": context.task_id(n)}
+
+
+def _list(name: str, paged: bool = False, **params) -> Scenario:
+    return Scenario(name, "GET", "/tasks/", params, paged=paged)
+
+
+READ_SCENARIOS = [
+    _list("list"),
+    _list("list_status_done", status_="done"),
+    _list("list_status_undone", status_="undone"),
+    _list("list_category", category=CATEGORIES[0]),
+    _list("list_open_category", status_="undone", category=CATEGORIES[1]),
+    *(
+        _list(f"list_sort_{sort}", sort=sort)
+        for sort in ("priority_asc", "priority_desc", "due_date_asc", "due_date_desc")
+    ),
+    _list(
+        "list_open_category_priority",
+        status_="undone",
+        category=CATEGORIES[2],
+        sort="priority_desc",
+    ),
+    _list("list_search", search=WORDS[0]),
+    _list("list_search_relevance", search=WORDS[1], sort="relevance"),
+    _list("list_max_page", limit=200),
+    Scenario("list_coalesced", "GET", "/tasks/", coalesced=True),
+    _list("list_second_page", paged=True, sort="priority_desc"),
+    Scenario("get_task", "GET", "/tasks/{task_id}", path_args=_task_path),
+    Scenario("changes", "GET", "/tasks/changes"),
+    Scenario("stats", "GET", "/tasks/stats"),
+    Scenario(
+        "top_due_undone",
+        "GET",
+        "/tasks/top",
+        {"sort": "due_date_asc", "limit": 20, "status_": "undone"},
+    ),
+    Scenario(
+        "top_per_category",
+        "GET",
+        "/tasks/top",
+        {"sort": "priority_desc", "limit": 5, "per_category": "true"},
+    ),
+    Scenario(
+        "export_filtered",
+        "GET",
+        "/tasks/export",
+        {"category": CATEGORIES[3], "search": WORDS[2]},
+    ),
+]
+
+WRITE_SCENARIOS = [
+    Scenario(
+        "create_task",
+        "POST",
+        "/tasks/",
+        body=lambda context, n: {"title": f"Bench {n}", "priority": n % 10 + 1},
+        writes=True,
+    ),
+    Scenario(
+        "update_priority",
+        "PATCH",
+        "/tasks/{task_id}/priority",
+        body=lambda context, n: {"priority": n % 10 + 1},
+        path_args=_task_path,
+        writes=True,
+    ),
+    Scenario(
+        "mark_done",
+        "PATCH",
+        "/tasks/{task_id}/done",
+        body=lambda context, n: {"done": n % 2 == 0},
+        path_args=_task_path,
+        writes=True,
+    ),
+    Scenario(
+        "bulk_create",
+        "POST",
+        "/tasks/bulk",
+        body=lambda context, n: [
+            {"title": f"Bulk {n}.{i}", "category": CATEGORIES[i % len(CATEGORIES)]}
+            for i in range(50)
+        ],
+        writes=True,
+    ),
+]
+
+SCENARIOS = READ_SCENARIOS + WRITE_SCENARIOS
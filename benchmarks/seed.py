@@ -0,0 +1,104 @@
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import distinct, func, insert, select, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+from app.db.base import Base
+from app.models.task import Task
+from app.models.task_tombstone import TaskTombstone  # noqa: F401 - registers the table
+
+CATEGORIES = ["work", "home", "errands", "health", "finance", "study", "travel"]
+WORDS = [
+    "report", "invoice", "groceries", "dentist", "budget", "flight", "laundry",
+    "meeting", "review", "deploy", "garden", "exercise", "email", "backup",
+    "taxes", "presentation", "call", "refactor", "birthday", "renew",
+]  # fmt: skip
+BATCH_SIZE = 5000
+
+
+def tenant_names(tenants: int):
+    # The benchmark's requests carry no tenant header, so they hit the default
+    return [settings.default_tenant, *(f"tenant-{i}" for i in range(1, tenants))]
+
+
+def make_rows(count: int, seed: int, tenants: int = 1):
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    names = tenant_names(tenants)
+    for n in range(count):
+        title = " ".join(rng.choices(WORDS, k=3))
+        yield {
+            "id": uuid.UUID(int=rng.getrandbits(128), version=4),
+            "tenant_id": names[n % tenants],
+            "title": title.capitalize(),
+            "description": f"{title} {' '.join(rng.choices(WORDS, k=8))}",
+            "done": rng.random() < 0.3,
+            "priority": rng.randint(1, 10),
+            "category": rng.choice(CATEGORIES),
+            "due_date": now
+            + timedelta(minutes=rng.randint(-60 * 24 * 90, 60 * 24 * 365)),
+            "version": 1,
+            "updated_at": now - timedelta(seconds=rng.randint(60, 60 * 60 * 24 * 30)),
+        }
+
+
+async def prepare_database(engine: AsyncEngine):
+    # Postgres should be migrated beforehand (the stats triggers live in
+    # migrations); this only fills in what's missing, e.g. for SQLite
+    async with engine.begin() as conn:
+        if engine.dialect.name == "postgresql":
+            # The trigram indexes in the model need the extension
+            await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        await conn.run_sync(Base.metadata.create_all)
+
+
+async def reset_sqlite(engine: AsyncEngine):
+    # A database left by an older schema version is simply recreated
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+
+async def seed_tasks(
+    engine: AsyncEngine, count: int, seed: int = 0, tenants: int = 1
+) -> int:
+    """Fill the tasks table with `count` deterministic rows, reusing a match.
+
+    Rows are spread evenly over `tenants` tenants.
+    """
+    await prepare_database(engine)
+    query = select(func.count(), func.count(distinct(Task.tenant_id)))
+    try:
+        async with engine.connect() as conn:
+            # create_all doesn't add columns: reading them all finds an older
+            # schema version
+            for table in Base.metadata.sorted_tables:
+                await conn.execute(select(*table.c).limit(1))
+            existing = tuple((await conn.execute(query)).one())
+    except OperationalError:
+        if engine.dialect.name != "sqlite":
+            raise
+        await reset_sqlite(engine)
+        existing = None
+    if existing == (count, min(count, tenants)):
+        return 0
+
+    async with engine.begin() as conn:
+        await conn.execute(Task.__table__.delete())
+
+        batch = []
+        for row in make_rows(count, seed, tenants):
+            batch.append(row)
+            if len(batch) == BATCH_SIZE:
+                await conn.execute(insert(Task), batch)
+                batch = []
+        if batch:
+            await conn.execute(insert(Task), batch)
+
+        if engine.dialect.name == "postgresql":
+            await conn.execute(text("ANALYZE tasks"))
+    return count
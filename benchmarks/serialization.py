@@ -0,0 +1,66 @@
+"""CPU per row of the list response: ORM + response_model vs plain rows.
+
+python -m benchmarks.serialization --rows 200 --rounds 50
+"""
+
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models.task import Task
+from app.repositories.task_repository import TASK_COLUMNS
+from app.schemas.task import TaskList, TaskOut, task_list_adapter
+from benchmarks.seed import seed_tasks
+
+# What FastAPI does with a returned model: validate against response_model,
+# dump to JSON-able python, then json.dumps
+response_field = TypeAdapter(TaskList)
+
+
+async def orm_response(session: AsyncSession, rows: int) -> bytes:
+    tasks = (await session.scalars(select(Task).limit(rows))).all()
+    result = TaskList(tasks=[TaskOut.model_validate(task) for task in tasks])
+    validated = response_field.validate_python(result, from_attributes=True)
+    return json.dumps(response_field.dump_python(validated, mode="json")).encode()
+
+
+async def row_response(session: AsyncSession, rows: int) -> bytes:
+    result = await session.execute(select(*TASK_COLUMNS).limit(rows))
+    return task_list_adapter.dump_json(
+        {"tasks": [row._asdict() for row in result], "next_cursor": None}
+    )
+
+
+async def main(args):
+    path = Path(tempfile.gettempdir()) / "todo-bench-serialization.sqlite3"
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    await seed_tasks(engine, args.rows)
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    for name, build in (("orm", orm_response), ("rows", row_response)):
+        async with session_factory() as session:
+            await build(session, args.rows)  # warm up
+            started = time.process_time()
+            for _ in range(args.rounds):
+                # A fresh identity map each round, as with one session per request
+                session.expunge_all()
+                await build(session, args.rows)
+            elapsed = time.process_time() - started
+        per_row = elapsed / (args.rounds * args.rows) * 1e6
+        print(f"{name:<6} {per_row:8.2f} us CPU/row")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.serialization")
+    parser.add_argument("--rows", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=50)
+    asyncio.run(main(parser.parse_args()))
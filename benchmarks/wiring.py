@@ -0,0 +1,97 @@
+"""Per-request overhead of the service wiring: before vs after lazy UoWs.
+
+Fetches one task per request through TaskService, the way GET /tasks/{id}
+does on a cache miss:
+
+- before: every repository built up front, and the read committed like a
+  write (BEGIN, SELECT, COMMIT on Postgres)
+- after: only the repository used is built, and the read autocommits
+  (a lone SELECT)
+
+Reports wall time and how long each request held a pooled connection.
+
+python -m benchmarks.wiring --requests 2000
+python -m benchmarks.wiring --database-url postgresql+asyncpg://...
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.db.db import session_opener
+from app.models.task import Task
+from app.services.task_service import TaskService
+from benchmarks.seed import seed_tasks
+
+
+async def before(service: TaskService, task_id):
+    async with service.uow:
+        for name in service.uow._repo_classes:
+            getattr(service.uow, name)
+        return await service.uow.tasks.get_by_id(task_id)
+
+
+async def after(service: TaskService, task_id):
+    async with service.uow.read():
+        return await service.uow.tasks.get_by_id(task_id)
+
+
+class PoolHold:
+    """Sums the time connections spend checked out of the pool."""
+
+    def __init__(self, engine):
+        self.seconds = 0.0
+        event.listen(engine.sync_engine.pool, "checkout", self._checkout)
+        event.listen(engine.sync_engine.pool, "checkin", self._checkin)
+
+    def _checkout(self, dbapi_connection, record, proxy):
+        record.info["checked_out_at"] = time.perf_counter()
+
+    def _checkin(self, dbapi_connection, record):
+        started = record.info.pop("checked_out_at", None)
+        if started is not None:
+            self.seconds += time.perf_counter() - started
+
+
+async def main(args):
+    engine = create_async_engine(args.database_url)
+    await seed_tasks(engine, args.tasks)
+    open_session = session_opener(
+        sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    )
+    async with engine.connect() as conn:
+        task_id = (await conn.execute(select(Task.id).limit(1))).scalar_one()
+    hold = PoolHold(engine)
+
+    for name, fetch in (("before", before), ("after", after)):
+        for _ in range(args.requests // 10):  # warm up
+            await fetch(TaskService(open_session, settings.default_tenant), task_id)
+        hold.seconds = 0.0
+        started = time.perf_counter()
+        for _ in range(args.requests):
+            # A service per request, as get_service builds it
+            await fetch(TaskService(open_session, settings.default_tenant), task_id)
+        elapsed = time.perf_counter() - started
+        print(
+            f"{name:<7} {elapsed / args.requests * 1e6:8.1f} us/request"
+            f"  {hold.seconds / args.requests * 1e6:8.1f} us connection held"
+        )
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.wiring")
+    parser.add_argument(
+        "--database-url",
+        default=f"sqlite+aiosqlite:///{Path(tempfile.gettempdir()) / 'todo-bench-wiring.sqlite3'}",
+    )
+    parser.add_argument("--tasks", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=2000)
+    asyncio.run(main(parser.parse_args()))